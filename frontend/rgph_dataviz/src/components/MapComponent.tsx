@@ -359,9 +359,9 @@ const MapComponent: React.FC = () => {
         }
 
         const [regionsData, depsData, communesData] = await Promise.all([
-          fetch('http://127.0.0.1:8000/api/api/regions/').then(res => res.json()),
-          fetch('http://127.0.0.1:8000/api/api/departments/').then(res => res.json()),
-          fetch('http://127.0.0.1:8000/api/api/communes/').then(res => res.json()),
+          fetch('http://127.0.0.1:8000/api/api/regions/?stream=1').then(res => res.json()),
+          fetch('http://127.0.0.1:8000/api/api/departments/?stream=1').then(res => res.json()),
+          fetch('http://127.0.0.1:8000/api/api/communes/?stream=1').then(res => res.json()),
         ]);
         setRegions(regionsData);
         setDepartements(depsData);
@@ -378,7 +378,7 @@ const MapComponent: React.FC = () => {
     const loadDemographicData = async () => {
       if (selectedYear) {
         try {
-          const response = await fetch(`http://127.0.0.1:8000/api/api/demographics/?year=${selectedYear}`);
+          const response = await fetch(`http://127.0.0.1:8000/api/api/demographics/?year=${selectedYear}&stream=1`);
           const demoData = await response.json();
           setDemographics(demoData);
         } catch (error) {
@@ -49,8 +49,8 @@ const KeyStatsPage: React.FC = () => {
     const fetchData = async () => {
       try {
         const [demoResponse, regionsResponse] = await Promise.all([
-          fetch('http://127.0.0.1:8000/api/api/demographics/'),
-          fetch('http://127.0.0.1:8000/api/api/regions/')
+          fetch('http://127.0.0.1:8000/api/api/demographics/?stream=1'),
+          fetch('http://127.0.0.1:8000/api/api/regions/?stream=1')
         ]);
         
         const demoData = await demoResponse.json();
@@ -87,7 +87,7 @@ const ConceptsDefinitions: React.FC = () => {
   const [loading, setLoading] = useState<boolean>(true);
 
   useEffect(() => {
-    fetch('http://127.0.0.1:8000/api/api/demographics/?year=2023')
+    fetch('http://127.0.0.1:8000/api/api/demographics/?year=2023&stream=1')
       .then(res => res.json())
       .then(data => {
         const total = data
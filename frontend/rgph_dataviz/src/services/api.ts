@@ -92,7 +92,7 @@ const api = {
   // Récupérer toutes les régions
   getRegions: async (): Promise<Region[]> => {
     try {
-      const response = await axios.get(`${API_BASE_URL}/regions/`);
+      const response = await axios.get(`${API_BASE_URL}/regions/`, { params: { stream: 1 } });
       console.log('Raw API response:', response.data);
       console.log('First region geo_json:', response.data[0]?.geo_json);
       if (!response.data || !Array.isArray(response.data)) {
@@ -117,7 +117,7 @@ const api = {
     try {
       const url = regionId 
         ? `${API_BASE_URL}/departments/${regionId}/`
-        : `${API_BASE_URL}/departments/`;
+        : `${API_BASE_URL}/departments/?stream=1`;
       const response = await axios.get(url);
       if (!response.data || !Array.isArray(response.data)) {
         console.error('Invalid response format:', response.data);
@@ -142,7 +142,7 @@ const api = {
     try {
       const url = departmentId 
         ? `${API_BASE_URL}/communes/${departmentId}/`
-        : `${API_BASE_URL}/communes/`;
+        : `${API_BASE_URL}/communes/?stream=1`;
       const response = await axios.get(url);
       if (!response.data || !Array.isArray(response.data)) {
         console.error('Invalid response format:', response.data);
@@ -2,7 +2,7 @@ from django.contrib.admin import AdminSite
 from django.contrib.auth.models import Group, Permission
 from django.contrib.contenttypes.models import ContentType
 from django.urls import path
-from myapp.views import CentralizedImportView, download_template
+from myapp.views import CentralizedImportView, download_template, request_metrics_dashboard
 
 class CustomAdminSite(AdminSite):
     site_header = "Administration des Données Démographiques"
@@ -20,6 +20,9 @@ class CustomAdminSite(AdminSite):
             path('download-all-template/',
                 self.admin_view(download_template),
                 name='download_all_template'),
+            path('request-metrics/',
+                self.admin_view(request_metrics_dashboard),
+                name='request_metrics'),
         ]
         return custom_urls + urls
 
@@ -7,7 +7,8 @@ class MyappConfig(AppConfig):
     
     def ready(self):
         # L'initialisation de l'admin est maintenant gérée par admin.py
-        pass
+        # Signaux d'écriture : incrémentation des versions des données (invalidation des caches)
+        from . import invalidation  # noqa: F401
 
 
 
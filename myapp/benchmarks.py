@@ -0,0 +1,197 @@
+"""Banc de mesures des chemins critiques (API, imports, exports) sur données synthétiques
+
+Chaque échelle est générée dans une base de test vide : la base réelle n'est
+jamais modifiée. Pour chaque cas, le temps retenu est la médiane de `repeat`
+essais, caches de réponses vidés avant chaque essai (mesure à froid). Les
+résultats peuvent être enregistrés comme référence (JSON) puis comparés avec un
+seuil de régression relatif.
+"""
+import csv
+import io
+import json
+import os
+import platform
+import statistics
+import tempfile
+import time
+from contextlib import redirect_stdout
+
+import django
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+
+from . import synthetic
+from .invalidation import suppress_invalidation
+from .models import Census, Country, DataVersion, DemographicData
+from .response_cache import clear_response_cache
+
+DEFAULT_THRESHOLD = 0.25
+# En deçà de cet écart absolu (secondes), une hausse relative n'est pas une régression
+MIN_DELTA = 0.005
+
+
+class BenchmarkError(Exception):
+    pass
+
+
+class Case:
+    def __init__(self, name, run, prepare=None):
+        self.name = name
+        self.run = run
+        self.prepare = prepare
+
+
+def _cold_caches(context):
+    clear_response_cache()
+    cache.clear()
+
+
+def _get(path, **params):
+    def run(context):
+        response = context.client.get(path, params)
+        if response.status_code != 200:
+            raise BenchmarkError(f'GET {path} : statut {response.status_code}')
+        # Les réponses en flux ou servies depuis un fichier sont lues jusqu'au bout
+        return len(b''.join(response.streaming_content) if response.streaming else response.content)
+    return run
+
+
+def _centralized_import(context):
+    upload = io.BytesIO(context.import_file)
+    upload.name = 'import.csv'
+    with redirect_stdout(io.StringIO()):
+        response = context.client.post(reverse('admin:import_all_data'), {
+            'census_year': context.census.pk,
+            'file_format': 'text/csv',
+            'import_file': upload,
+        })
+    if response.status_code != 302:
+        raise BenchmarkError(f'Import centralisé : statut {response.status_code}')
+    return len(context.import_file)
+
+
+def _import_geojson(context):
+    call_command('import_geojson', context.geojson_path, stdout=io.StringIO())
+    return os.path.getsize(context.geojson_path)
+
+
+def get_cases(year):
+    return [
+        Case('api:regions', _get('/api/api/regions/'), _cold_caches),
+        Case('api:departments', _get('/api/api/departments/'), _cold_caches),
+        Case('api:communes', _get('/api/api/communes/'), _cold_caches),
+        Case('api:communes-low', _get('/api/api/communes/', resolution='low'), _cold_caches),
+        Case('api:demographics', _get('/api/api/demographics/', year=year), _cold_caches),
+        Case('export_all_data', _get('/api/export-all-data/', year=year)),
+        Case('download_template', _get(reverse('admin:download_all_template'))),
+        Case('import:centralized', _centralized_import, _cold_caches),
+        Case('import_geojson', _import_geojson, _cold_caches),
+    ]
+
+
+class BenchmarkContext:
+    """Données d'une échelle : client connecté (staff), recensement de référence, fichiers d'import"""
+
+    def __init__(self, scale, censuses, seed, directory):
+        start = time.perf_counter()
+        self.scale = scale
+        with suppress_invalidation():
+            self.censuses = synthetic.create_dataset(scale=scale, censuses=censuses, seed=seed)
+        self.census = self.censuses[0]
+        self.generation_time = time.perf_counter() - start
+
+        user = get_user_model().objects.create_superuser('benchmark', 'benchmark@example.com', 'benchmark')
+        self.client = Client()
+        self.client.force_login(user)
+
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(synthetic.import_table(self.census))
+        self.import_file = buffer.getvalue().encode('utf-8')
+        self.geojson_path = os.path.join(directory, f'boundaries-{scale}x.geojson')
+        with open(self.geojson_path, 'w', encoding='utf-8') as f:
+            json.dump(synthetic.boundary_features(synthetic.boundary_layout(scale)), f)
+
+
+def reset_database():
+    """Vide les tables des données (base de test) entre deux échelles"""
+    Census.objects.all().delete()
+    Country.objects.all().delete()
+    DataVersion.objects.all().delete()
+    get_user_model().objects.filter(username='benchmark').delete()
+
+
+def measure(case, context, repeat):
+    durations = []
+    size = None
+    for _ in range(repeat):
+        if case.prepare:
+            case.prepare(context)
+        start = time.perf_counter()
+        size = case.run(context)
+        durations.append(time.perf_counter() - start)
+    return {
+        'median': statistics.median(durations),
+        'min': min(durations),
+        'max': max(durations),
+        'bytes': size,
+    }
+
+
+def run_benchmarks(scales, repeat=3, censuses_per_scale=None, seed=0, cases=None, report=None):
+    """{"cas@échellex": mesures} pour chaque échelle (générée dans la base courante)"""
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for scale in scales:
+            reset_database()
+            censuses = censuses_per_scale or max(1, int(scale))
+            context = BenchmarkContext(scale, censuses, seed, directory)
+            if report:
+                report(f'{scale}x: {censuses} recensement(s), '
+                       f'{DemographicData.objects.count()} lignes générées en {context.generation_time:.1f} s')
+            for case in get_cases(context.census.year):
+                if cases and case.name not in cases:
+                    continue
+                key = f'{case.name}@{scale:g}x'
+                results[key] = measure(case, context, repeat)
+                if report:
+                    report(f"  {key:<32}{results[key]['median'] * 1000:>10.1f} ms")
+        reset_database()
+    return results
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'database': connection.vendor,
+        'machine': platform.machine(),
+    }
+
+
+def load_baseline(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_baseline(path, results):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'environment': environment(), 'results': results}, f, indent=2, sort_keys=True)
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """[(cas, référence, mesure, rapport, régression)] pour les cas présents dans la référence"""
+    rows = []
+    for key, values in results.items():
+        reference = baseline.get('results', {}).get(key)
+        if reference is None:
+            rows.append((key, None, values['median'], None, False))
+            continue
+        ratio = values['median'] / max(reference['median'], 1e-9)
+        regression = ratio > 1 + threshold and values['median'] - reference['median'] > MIN_DELTA
+        rows.append((key, reference['median'], values['median'], ratio, regression))
+    return rows
@@ -0,0 +1,149 @@
+"""Évolutions entre deux recensements : variations, taux de croissance annuels moyens
+et variations en points de pourcentage, par zone et par niveau
+
+Les résultats sont matérialisés dans CensusDiff pour chaque couple de recensements
+consécutifs, après chaque import (refresh_for_census) ou par la commande
+refresh_census_diffs. Chaque ligne garde les versions des données des deux
+recensements : un couple n'est recalculé que si l'une d'elles a changé depuis.
+Les lectures n'écrivent jamais : un couple non matérialisé ou périmé est calculé
+en mémoire (diff_rows).
+"""
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+
+from .models import Census, CensusDiff, Country, Region, Department, Commune, DemographicData
+from .rollup import WEIGHTED_FIELDS
+
+PERCENT_FIELDS = list(WEIGHTED_FIELDS)
+
+LEVEL_CODES = {
+    'country': (Country, 'code'),
+    'region': (Region, 'adm1_pcode'),
+    'department': (Department, 'adm2_pcode'),
+    'commune': (Commune, 'adm3_pcode'),
+}
+
+
+def _load(census, level=None):
+    rows = DemographicData.objects.filter(census=census)
+    if level is not None:
+        rows = rows.filter(level=level)
+    rows = rows.values(
+        'level', 'country_id', 'region_id', 'department_id', 'commune_id', 'total_population', *PERCENT_FIELDS,
+    )
+    return {(row['level'], row[f"{row['level']}_id"]): row for row in rows}
+
+
+def growth_rate(population_from, population_to, years):
+    """Taux de croissance annuel moyen en %, None s'il n'est pas défini"""
+    if not population_from or not population_to or years <= 0:
+        return None
+    return round(((population_to / population_from) ** (1 / years) - 1) * 100, 4)
+
+
+def compute_diff(from_census, to_census, level=None):
+    """Lignes CensusDiff (non enregistrées) pour les zones présentes dans les deux recensements"""
+    before, after = _load(from_census, level), _load(to_census, level)
+    years = to_census.year - from_census.year
+    codes = {
+        name: dict(model.objects.values_list('pk', field))
+        for name, (model, field) in LEVEL_CODES.items() if level in (None, name)
+    }
+
+    diffs = []
+    for (level, zone_id), old in before.items():
+        new = after.get((level, zone_id))
+        if new is None or zone_id is None:
+            continue
+        diffs.append(CensusDiff(
+            from_census=from_census,
+            to_census=to_census,
+            level=level,
+            zone_id=zone_id,
+            zone_pcode=codes[level].get(zone_id, ''),
+            population_from=old['total_population'],
+            population_to=new['total_population'],
+            population_change=new['total_population'] - old['total_population'],
+            growth_rate=growth_rate(old['total_population'], new['total_population'], years),
+            point_changes={
+                field: round(float(new[field] - old[field]), 2)
+                for field in PERCENT_FIELDS
+                if new[field] is not None and old[field] is not None
+            },
+            from_version=from_census.data_version,
+            to_version=to_census.data_version,
+        ))
+    return diffs
+
+
+def has_common_zones(from_census, to_census):
+    same_zone = DemographicData.objects.filter(
+        census=to_census, level=OuterRef('level'), zone_pcode=OuterRef('zone_pcode'),
+    )
+    return DemographicData.objects.filter(census=from_census).filter(Exists(same_zone)).exists()
+
+
+def is_fresh(from_census, to_census):
+    """Lignes matérialisées à jour (un couple sans zone commune n'a pas de lignes et est toujours à jour)"""
+    versions = CensusDiff.objects.filter(from_census=from_census, to_census=to_census).values_list(
+        'from_version', 'to_version',
+    ).first()
+    if versions is None:
+        return not has_common_zones(from_census, to_census)
+    return versions == (from_census.data_version, to_census.data_version)
+
+
+@transaction.atomic
+def refresh_pair(from_census, to_census, force=False):
+    """Recalcule un couple de recensements si ses données ont changé ; retourne le nombre de lignes"""
+    # Verrou sur les deux recensements : deux rafraîchissements simultanés du couple s'exécutent l'un après l'autre
+    list(Census.objects.select_for_update().filter(pk__in=[from_census.pk, to_census.pk]).order_by('pk'))
+    if not force and is_fresh(from_census, to_census):
+        return None
+    CensusDiff.objects.filter(from_census=from_census, to_census=to_census).delete()
+    diffs = compute_diff(from_census, to_census)
+    CensusDiff.objects.bulk_create(diffs, batch_size=1000, ignore_conflicts=True)
+    return len(diffs)
+
+
+def diff_rows(from_census, to_census, level, pcodes=None):
+    """Évolutions d'un niveau triées par code, lues dans CensusDiff si le couple est à jour, sinon
+    calculées en mémoire (sans écriture)"""
+    fields = ['zone_pcode', 'population_from', 'population_to', 'population_change', 'growth_rate', 'point_changes']
+    if is_fresh(from_census, to_census):
+        queryset = CensusDiff.objects.filter(from_census=from_census, to_census=to_census, level=level)
+        if pcodes:
+            queryset = queryset.filter(zone_pcode__in=pcodes)
+        return list(queryset.order_by('zone_pcode').values(*fields))
+    diffs = [
+        diff for diff in compute_diff(from_census, to_census, level)
+        if not pcodes or diff.zone_pcode in pcodes
+    ]
+    return [
+        {field: getattr(diff, field) for field in fields}
+        for diff in sorted(diffs, key=lambda diff: diff.zone_pcode)
+    ]
+
+
+def consecutive_pairs(censuses=None):
+    censuses = list(censuses if censuses is not None else Census.objects.order_by('year'))
+    return list(zip(censuses, censuses[1:]))
+
+
+def refresh_for_census(census):
+    """Après un import : recalcule les couples consécutifs dont ce recensement fait partie
+
+    Les autres couples déjà matérialisés qui l'incluent sont supprimés (recalculés à la demande).
+    """
+    census.refresh_from_db(fields=['data_version'])
+    refreshed = 0
+    for from_census, to_census in consecutive_pairs():
+        if census.pk in (from_census.pk, to_census.pk):
+            refreshed += refresh_pair(from_census, to_census) or 0
+    CensusDiff.objects.filter(
+        from_census=census,
+    ).exclude(from_version=census.data_version).delete()
+    CensusDiff.objects.filter(
+        to_census=census,
+    ).exclude(to_version=census.data_version).delete()
+    return refreshed
@@ -0,0 +1,58 @@
+"""Arborescence région → département → commune d'un recensement, en une seule réponse
+
+Construite en un nombre fixe de requêtes (trois niveaux de limites sans leurs
+géométries, puis toutes les données démographiques du recensement avec leurs
+niveaux d'études), quel que soit le nombre de zones.
+"""
+from .models import Region, Department, Commune, DemographicData
+from .serializers import DemographicDataSerializer
+
+# Clés de liaison retirées des données d'un nœud (portées par le nœud lui-même)
+LINK_FIELDS = ('census', 'country', 'region', 'department', 'commune', 'level', 'zone_pcode')
+
+
+def get_census_data(census):
+    """Données démographiques sérialisées du recensement, indexées par (niveau, pk)"""
+    rows = list(DemographicData.objects.filter(census=census).select_related('educationlevel').order_by('pk'))
+    data = {}
+    for row, item in zip(rows, DemographicDataSerializer(rows, many=True).data):
+        for field in LINK_FIELDS:
+            item.pop(field, None)
+        data[(row.level, getattr(row, f'{row.level}_id'))] = item
+    return data
+
+
+def build_census_tree(census):
+    data = get_census_data(census)
+
+    communes = {}
+    for commune in Commune.objects.values('id', 'department_id', 'adm3_pcode', 'adm3_en', 'real_name'):
+        communes.setdefault(commune.pop('department_id'), []).append({
+            **commune,
+            'data': data.get(('commune', commune['id'])),
+        })
+
+    departments = {}
+    for department in Department.objects.values('id', 'region_id', 'adm2_pcode', 'adm2_en'):
+        departments.setdefault(department.pop('region_id'), []).append({
+            **department,
+            'data': data.get(('department', department['id'])),
+            'communes': communes.get(department['id'], []),
+        })
+
+    regions = [
+        {
+            **region,
+            'data': data.get(('region', region['id'])),
+            'departments': departments.get(region['id'], []),
+        }
+        for region in Region.objects.values('id', 'adm1_pcode', 'adm1_en')
+    ]
+
+    country = next((item for (level, _), item in data.items() if level == 'country'), None)
+    return {
+        'year': census.year,
+        'is_projection': census.is_projection,
+        'data': country,
+        'regions': regions,
+    }
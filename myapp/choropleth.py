@@ -0,0 +1,170 @@
+"""Cartes choroplèthes : un indicateur par zone d'un niveau administratif, avec ses classes
+
+Les bornes de classes sont calculées côté serveur (quantiles, intervalles égaux
+ou seuils naturels de Jenks) afin que le client n'ait qu'à colorier les zones.
+"""
+from decimal import Decimal
+
+from django.db.models import Case, F, JSONField, Value, When
+
+from .geometry import FULL_RESOLUTION
+from .models import DemographicData
+from .tiles import INDICATOR_FIELDS, LEVELS
+
+METHODS = ('quantile', 'equal', 'jenks')
+DEFAULT_CLASSES = 5
+MIN_CLASSES, MAX_CLASSES = 2, 9
+OUTPUTS = ('map', 'geojson')
+# Nombre de valeurs au-delà duquel Jenks travaille sur un échantillon de la série triée
+JENKS_MAX_VALUES = 500
+
+
+def quantile_breaks(values, classes):
+    import numpy as np
+
+    return np.quantile(values, np.linspace(0, 1, classes + 1)).tolist()
+
+
+def equal_breaks(values, classes):
+    import numpy as np
+
+    return np.linspace(min(values), max(values), classes + 1).tolist()
+
+
+def jenks_breaks(values, classes):
+    """Seuils naturels de Jenks (algorithme exact de Fisher, programmation dynamique)
+
+    Minimise la somme des variances intra-classes. Au-delà de JENKS_MAX_VALUES
+    valeurs, le calcul porte sur autant de valeurs régulièrement espacées de la
+    série triée (min et max inclus) : O(classes × JENKS_MAX_VALUES²), vectorisé.
+    """
+    import numpy as np
+
+    data = np.sort(np.asarray(values, dtype=float))
+    if len(data) > JENKS_MAX_VALUES:
+        data = data[np.linspace(0, len(data) - 1, JENKS_MAX_VALUES).round().astype(int)]
+    n = len(data)
+    classes = min(classes, n)
+    sums = np.concatenate([[0.0], np.cumsum(data)])
+    squares = np.concatenate([[0.0], np.cumsum(data ** 2)])
+
+    # cost[i, j] : somme des écarts au carré des valeurs data[i:j] (infinie si i >= j)
+    starts, ends = np.arange(n + 1)[:, None], np.arange(n + 1)[None, :]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cost = squares[ends] - squares[starts] - (sums[ends] - sums[starts]) ** 2 / (ends - starts)
+    cost[starts >= ends] = np.inf
+
+    # best[k][j] : coût minimal pour ranger data[:j] en k classes ; start : début de la dernière
+    best = np.full((classes + 1, n + 1), np.inf)
+    start = np.zeros((classes + 1, n + 1), dtype=int)
+    best[1] = cost[0]
+    for k in range(2, classes + 1):
+        candidates = best[k - 1][:, None] + cost
+        start[k] = np.argmin(candidates, axis=0)
+        best[k] = candidates[start[k], np.arange(n + 1)]
+
+    breaks = [float(data[-1])]
+    end = n
+    for k in range(classes, 1, -1):
+        end = start[k, end]
+        breaks.append(float(data[end - 1]))
+    breaks.append(float(data[0]))
+    return breaks[::-1]
+
+
+BREAK_METHODS = {'quantile': quantile_breaks, 'equal': equal_breaks, 'jenks': jenks_breaks}
+
+
+def compute_breaks(values, method='quantile', classes=DEFAULT_CLASSES):
+    """Bornes des classes (classes + 1 valeurs croissantes, doublons retirés)"""
+    if not values:
+        return []
+    breaks = BREAK_METHODS[method](values, classes)
+    unique = []
+    for value in breaks:
+        value = round(value, 6)
+        if not unique or value > unique[-1]:
+            unique.append(value)
+    return unique
+
+
+def classify(value, breaks):
+    """Indice de classe (0 à len(breaks) - 2) d'une valeur, None sans valeur
+
+    Chaque borne supérieure appartient à sa classe.
+    """
+    if value is None or len(breaks) < 2:
+        return None
+    for index, upper in enumerate(breaks[1:-1]):
+        if value <= upper:
+            return index
+    return len(breaks) - 2
+
+
+def get_indicator_values(level, census, indicator):
+    """Valeur de l'indicateur par pk de zone"""
+    queryset = DemographicData.objects.filter(census=census, level=level)
+    return {
+        pk: float(value) if isinstance(value, Decimal) else value
+        for pk, value in queryset.values_list(level, indicator)
+    }
+
+
+def build_choropleth(level, census, indicator, method='quantile', classes=DEFAULT_CLASSES,
+                     output='map', resolution=FULL_RESOLUTION, snapshot=None):
+    """Valeurs et classes d'un indicateur ; lues dans `snapshot` (instantané du recensement) s'il est fourni"""
+    config = LEVELS[level]
+    if snapshot is not None:
+        values = snapshot.indicator_values(level, indicator)
+    else:
+        values = get_indicator_values(level, census, indicator) if census else {}
+    breaks = compute_breaks([v for v in values.values() if v is not None], method, classes)
+
+    result = {
+        'level': level,
+        'year': census.year if census else None,
+        'indicator': indicator,
+        'method': method,
+        'breaks': breaks,
+    }
+
+    fields = ['pk', config['pcode'], config['name']]
+    if output == 'geojson':
+        queryset = config['model'].objects.all()
+        if resolution == FULL_RESOLUTION:
+            rows = queryset.values_list(*fields, 'geo_json')
+        else:
+            # Zones sans géométrie simplifiée à cette résolution : géométrie complète lue dans la même requête
+            queryset = queryset.annotate(geo_json_fallback=Case(
+                When(geo_json_simplified__has_key=resolution, then=Value(None, output_field=JSONField())),
+                default=F('geo_json'),
+                output_field=JSONField(),
+            ))
+            rows = (
+                (pk, pcode, name, (simplified or {}).get(resolution) or fallback)
+                for pk, pcode, name, simplified, fallback
+                in queryset.values_list(*fields, 'geo_json_simplified', 'geo_json_fallback')
+            )
+        features = []
+        for pk, pcode, name, geometry in rows:
+            value = values.get(pk)
+            features.append({
+                'type': 'Feature',
+                'id': pk,
+                'geometry': geometry,
+                'properties': {'pcode': pcode, 'name': name, 'value': value, 'class': classify(value, breaks)},
+            })
+        result.update({'type': 'FeatureCollection', 'features': features})
+    else:
+        if snapshot is not None:
+            pcodes = snapshot.zone_pcodes(level)
+        else:
+            pcodes = dict(config['model'].objects.values_list('pk', config['pcode']))
+        result['values'] = {pcodes[pk]: value for pk, value in values.items() if pk in pcodes}
+    return result
+
+
+def validate_indicator(indicator):
+    if indicator not in INDICATOR_FIELDS:
+        raise ValueError(f"Indicateur inconnu '{indicator}'. Valeurs possibles : {', '.join(INDICATOR_FIELDS)}")
+    return indicator
@@ -0,0 +1,172 @@
+"""Exports en colonnes (Parquet, Arrow IPC) des indicateurs d'un recensement
+
+Un fichier par niveau administratif, aux colonnes typées (entiers pour les
+effectifs, flottants pour les taux), avec en option la géométrie de la zone en
+WKB. Les fichiers sont construits par lots depuis l'ORM puis conservés sur
+disque tant que la version des données du recensement (et des limites) ne
+change pas.
+"""
+import os
+import shutil
+import threading
+
+from django.conf import settings
+
+from .geometry import FULL_RESOLUTION
+from .models import DemographicData
+from .rollup import COUNT_FIELDS, EDUCATION_FIELDS, WEIGHTED_FIELDS
+from .versioning import BOUNDARIES, get_version
+
+FORMATS = {
+    'parquet': ('parquet', 'application/vnd.apache.parquet'),
+    'arrow': ('arrow', 'application/vnd.apache.arrow.file'),
+}
+LEVELS = ('country', 'region', 'department', 'commune')
+BATCH_SIZE = 5000
+
+# Niveau → (champ code, champ nom, code du parent, champ géométrie) vus depuis DemographicData
+LEVEL_FIELDS = {
+    'country': ('country__code', 'country__name', None, 'country__geo_json'),
+    'region': ('region__adm1_pcode', 'region__adm1_en', 'country__code', 'region__geo_json'),
+    'department': ('department__adm2_pcode', 'department__adm2_en', 'region__adm1_pcode', 'department__geo_json'),
+    'commune': ('commune__adm3_pcode', 'commune__adm3_en', 'department__adm2_pcode', 'commune__geo_json'),
+}
+
+PERCENT_FIELDS = list(WEIGHTED_FIELDS)
+
+
+def get_export_cache_dir():
+    return getattr(settings, 'EXPORT_CACHE_DIR', os.path.join(settings.BASE_DIR, 'cache', 'exports'))
+
+
+def get_schema(geometry=False):
+    import pyarrow as pa
+
+    fields = [
+        pa.field('census_year', pa.int16()),
+        pa.field('zone_id', pa.int64()),
+        pa.field('pcode', pa.string()),
+        pa.field('name', pa.string()),
+        pa.field('parent_pcode', pa.string()),
+    ]
+    fields += [pa.field(field, pa.int64()) for field in COUNT_FIELDS]
+    fields += [pa.field(field, pa.float64()) for field in PERCENT_FIELDS + EDUCATION_FIELDS]
+    if geometry:
+        fields.append(pa.field('geometry', pa.binary(), metadata={'encoding': 'WKB', 'crs': 'EPSG:4326'}))
+    return pa.schema(fields)
+
+
+def _geometry_column(level, resolution):
+    geometry_field = LEVEL_FIELDS[level][3]
+    # Le pays n'a pas de géométries simplifiées
+    if resolution == FULL_RESOLUTION or level == 'country':
+        return geometry_field
+    return geometry_field.replace('geo_json', 'geo_json_simplified')
+
+
+def iter_batches(census, level, geometry=False, resolution=FULL_RESOLUTION, batch_size=BATCH_SIZE):
+    """RecordBatch Arrow successifs, chacun issu d'un paquet de lignes lues en base"""
+    code_field, name_field, parent_field, _ = LEVEL_FIELDS[level]
+    columns = ['census__year', f'{level}_id', code_field, name_field, parent_field or code_field]
+    columns += COUNT_FIELDS + PERCENT_FIELDS + [f'educationlevel__{field}' for field in EDUCATION_FIELDS]
+    if geometry:
+        columns.append(_geometry_column(level, resolution))
+
+    schema = get_schema(geometry)
+    queryset = DemographicData.objects.filter(census=census, level=level).order_by('pk').values_list(*columns)
+    batch = []
+    for row in queryset.iterator(chunk_size=batch_size):
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield _record_batch(batch, schema, level, geometry, resolution)
+            batch = []
+    if batch:
+        yield _record_batch(batch, schema, level, geometry, resolution)
+
+
+def _record_batch(rows, schema, level, geometry, resolution):
+    import pyarrow as pa
+
+    columns = [list(values) for values in zip(*rows)]
+    if LEVEL_FIELDS[level][2] is None:
+        columns[4] = [None] * len(rows)
+    if geometry:
+        columns[-1] = _to_wkb(columns[-1], FULL_RESOLUTION if level == 'country' else resolution, level, columns[1])
+    numeric_start = 5 + len(COUNT_FIELDS)
+    for index in range(numeric_start, numeric_start + len(PERCENT_FIELDS) + len(EDUCATION_FIELDS)):
+        columns[index] = [float(value) if value is not None else None for value in columns[index]]
+    return pa.RecordBatch.from_arrays(
+        [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+        schema=schema,
+    )
+
+
+def _shape(geometry):
+    """Géométrie shapely d'un objet GeoJSON (Feature et FeatureCollection acceptées)"""
+    import shapely
+    from shapely.geometry import shape
+
+    if geometry.get('type') == 'FeatureCollection':
+        return shapely.union_all([_shape(feature) for feature in geometry.get('features', [])])
+    if geometry.get('type') == 'Feature':
+        return shape(geometry['geometry'])
+    return shape(geometry)
+
+
+def _to_wkb(geometries, resolution, level, zone_ids):
+    import shapely
+
+    if resolution != FULL_RESOLUTION:
+        geometries = [(geometry or {}).get(resolution) for geometry in geometries]
+        # Zones pas encore simplifiées : géométrie complète, comme l'API (une requête par lot)
+        missing = [zone_id for zone_id, geometry in zip(zone_ids, geometries) if not geometry]
+        if missing:
+            model = DemographicData._meta.get_field(level).related_model
+            full = dict(model.objects.filter(pk__in=missing).values_list('pk', 'geo_json'))
+            geometries = [geometry or full.get(zone_id) for zone_id, geometry in zip(zone_ids, geometries)]
+    return [shapely.to_wkb(_shape(geometry)) if geometry else None for geometry in geometries]
+
+
+def export_path(census, level, output_format, geometry=False, resolution=FULL_RESOLUTION):
+    """Chemin du fichier en cache : les versions des données et des limites en font partie"""
+    extension, _ = FORMATS[output_format]
+    parts = [level, f'b{get_version(BOUNDARIES)}']
+    if geometry:
+        parts.append(f'wkb-{resolution}')
+    return os.path.join(
+        get_export_cache_dir(), f'{census.year}', f'v{census.data_version}', f"{'-'.join(parts)}.{extension}",
+    )
+
+
+def write_export(path, census, level, output_format, geometry=False, resolution=FULL_RESOLUTION):
+    import pyarrow as pa
+
+    schema = get_schema(geometry)
+    tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    if output_format == 'parquet':
+        import pyarrow.parquet as pq
+
+        writer = pq.ParquetWriter(tmp_path, schema, compression='zstd')
+    else:
+        writer = pa.ipc.new_file(tmp_path, schema, options=pa.ipc.IpcWriteOptions(compression='zstd'))
+    try:
+        for batch in iter_batches(census, level, geometry, resolution):
+            writer.write_batch(batch)
+    finally:
+        writer.close()
+    os.replace(tmp_path, path)
+
+
+def get_export(census, level, output_format, geometry=False, resolution=FULL_RESOLUTION):
+    """Chemin d'un export à jour, construit si besoin ; les versions précédentes sont supprimées"""
+    path = export_path(census, level, output_format, geometry, resolution)
+    if os.path.exists(path):
+        return path
+    version_dir = os.path.dirname(path)
+    os.makedirs(version_dir, exist_ok=True)
+    census_dir = os.path.dirname(version_dir)
+    for name in os.listdir(census_dir):
+        if name != os.path.basename(version_dir):
+            shutil.rmtree(os.path.join(census_dir, name), ignore_errors=True)
+    write_export(path, census, level, output_format, geometry, resolution)
+    return path
@@ -0,0 +1,38 @@
+"""Cache des résultats des lectures (agrégats, séries, écarts, choroplèthes) dans CACHES
+
+Chaque entrée est rangée sous les espaces de noms des jeux de données dont elle
+dépend : un par recensement, un pour les limites administratives. La version
+courante de chacun fait partie de l'espace de noms ; une écriture l'incrémente
+(voir invalidation.py) et les entrées périmées ne sont plus lues. Elles
+disparaissent avec l'expiration du cache (TIMEOUT) ou l'éviction du backend.
+"""
+from django.core.cache import cache
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+
+from .models import Census
+from .versioning import BOUNDARIES, get_version, make_etag
+
+
+def census_namespace(census_id, version):
+    return f'census:{census_id}:v{version}'
+
+
+def boundaries_namespace(version=None):
+    if version is None:
+        version = get_version(BOUNDARIES)
+    return f'{BOUNDARIES}:v{version}'
+
+
+def all_censuses_namespace():
+    """Espace de noms de l'ensemble des recensements (ajout, suppression ou modification de l'un d'eux)"""
+    versions = Census.objects.order_by('pk').values_list('pk', 'data_version')
+    return 'censuses:' + make_etag(*(f'{pk}.{version}' for pk, version in versions))
+
+
+def cache_key(namespaces, *parts):
+    return 'data:' + '|'.join(namespaces) + ':' + make_etag(*parts)
+
+
+def get_or_compute(namespaces, parts, compute, timeout=DEFAULT_TIMEOUT):
+    """Résultat en cache pour ces versions des données, sinon calculé par compute() et enregistré"""
+    return cache.get_or_set(cache_key(namespaces, *parts), compute, timeout)
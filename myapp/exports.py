@@ -0,0 +1,69 @@
+"""Exports en flux (CSV, NDJSON) des données démographiques avec leurs niveaux d'études
+
+Les lignes sont lues par paquets via un curseur serveur (.iterator) et écrites
+au fur et à mesure : la mémoire reste constante quel que soit le nombre de
+lignes, et l'en-tête CSV part avant même l'exécution de la requête.
+"""
+import csv
+from decimal import Decimal
+
+from .geocoding import Echo
+from .models import DemographicData
+from .renderers import dumps
+from .rollup import COUNT_FIELDS, EDUCATION_FIELDS, WEIGHTED_FIELDS
+
+FORMATS = ('csv', 'ndjson')
+CONTENT_TYPES = {'csv': 'text/csv; charset=utf-8', 'ndjson': 'application/x-ndjson'}
+LEVELS = ('country', 'region', 'department', 'commune')
+CHUNK_SIZE = 2000
+
+DATA_FIELDS = COUNT_FIELDS + list(WEIGHTED_FIELDS)
+COLUMNS = [
+    'id', 'census_year', 'is_projection', 'level',
+    'country_code', 'region_pcode', 'department_pcode', 'commune_pcode', 'zone_name',
+] + DATA_FIELDS + EDUCATION_FIELDS
+
+_QUERY_FIELDS = [
+    'id', 'census__year', 'census__is_projection', 'level',
+    'country__code', 'region__adm1_pcode', 'department__adm2_pcode', 'commune__adm3_pcode',
+    'country__name', 'region__adm1_en', 'department__adm2_en', 'commune__adm3_en',
+] + DATA_FIELDS + [f'educationlevel__{field}' for field in EDUCATION_FIELDS]
+
+
+def export_queryset(census=None, level=None):
+    queryset = DemographicData.objects.all()
+    if census is not None:
+        queryset = queryset.filter(census=census)
+    if level:
+        queryset = queryset.filter(level=level)
+    return queryset.order_by('pk').values_list(*_QUERY_FIELDS)
+
+
+def iter_rows(queryset, chunk_size=CHUNK_SIZE):
+    """Lignes d'export (tuples dans l'ordre de COLUMNS)"""
+    for row in queryset.iterator(chunk_size=chunk_size):
+        # Noms de zone lus dans l'ordre de LEVELS : celui du niveau de la ligne est retenu
+        level, names = row[3], row[8:12]
+        yield row[:8] + (names[LEVELS.index(level)],) + row[12:]
+
+
+def iter_csv(rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(COLUMNS)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def iter_ndjson(rows):
+    for row in rows:
+        yield dumps({
+            column: float(value) if isinstance(value, Decimal) else value
+            for column, value in zip(COLUMNS, row)
+        }) + b'\n'
+
+
+def iter_export(output_format, census=None, level=None):
+    rows = iter_rows(export_queryset(census, level))
+    if output_format == 'ndjson':
+        return iter_ndjson(rows)
+    return iter_csv(rows)
@@ -0,0 +1,172 @@
+"""Géocodage inverse par lots : rattachement de points (CSV, XLSX, GeoJSON) aux communes
+
+Les points sont lus par paquets de CHUNK_SIZE lignes ; chaque paquet est joint
+aux communes en une seule requête vectorisée sur l'index spatial (STRtree), puis
+les lignes enrichies des codes adm3/adm2/adm1 sont émises au fil de l'eau.
+"""
+import csv
+import io
+import json
+import zipfile
+
+from .spatial_index import get_commune_index
+
+CHUNK_SIZE = 10000
+FORMATS = ('csv', 'xlsx', 'geojson')
+OUTPUT_FORMATS = ('csv', 'ndjson')
+OUTPUT_COLUMNS = ['adm3_pcode', 'adm2_pcode', 'adm1_pcode']
+
+LATITUDE_COLUMNS = ['lat', 'latitude', 'y']
+LONGITUDE_COLUMNS = ['lon', 'lng', 'long', 'longitude', 'x']
+
+
+def detect_format(filename):
+    """Déduit le format d'entrée de l'extension du fichier"""
+    extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+    if extension == 'json':
+        return 'geojson'
+    return extension if extension in FORMATS else None
+
+
+def _find_column(headers, candidates, explicit=None):
+    if explicit:
+        if explicit not in headers:
+            raise ValueError(f"Colonne '{explicit}' introuvable dans le fichier.")
+        return explicit
+    normalized = {str(header).strip().lower(): header for header in headers if header is not None}
+    for candidate in candidates:
+        if candidate in normalized:
+            return normalized[candidate]
+    raise ValueError(f"Aucune colonne de coordonnées trouvée parmi : {', '.join(candidates)}.")
+
+
+def _coordinate(value):
+    try:
+        return float(str(value).replace(',', '.'))
+    except (TypeError, ValueError):
+        return float('nan')
+
+
+def read_points(source, file_format, lat_column=None, lon_column=None):
+    """Lit un fichier de points ; retourne (en-têtes, itérateur de lignes, colonne lat, colonne lon)
+
+    Pour le GeoJSON, les propriétés de chaque entité deviennent les colonnes et
+    les coordonnées du Point sont exposées dans les colonnes 'lon' et 'lat'.
+    """
+    if file_format == 'csv':
+        text = io.TextIOWrapper(source, encoding='utf-8-sig', newline='')
+        reader = csv.DictReader(text)
+        headers = reader.fieldnames or []
+        rows = reader
+    elif file_format == 'xlsx':
+        import openpyxl
+        from openpyxl.utils.exceptions import InvalidFileException
+
+        try:
+            workbook = openpyxl.load_workbook(source, read_only=True, data_only=True)
+        except (zipfile.BadZipFile, InvalidFileException, KeyError, OSError):
+            raise ValueError("Fichier XLSX illisible.")
+        sheet_rows = workbook.active.iter_rows(values_only=True)
+        headers = [str(header) if header is not None else '' for header in next(sheet_rows, ())]
+        rows = (dict(zip(headers, values)) for values in sheet_rows if any(v is not None for v in values))
+    elif file_format == 'geojson':
+        features = _geojson_features(json.load(source))
+        headers = []
+        for feature in features:
+            for key in (feature.get('properties') or {}):
+                if key not in headers:
+                    headers.append(key)
+        headers += ['lon', 'lat']
+        rows = (_feature_row(feature) for feature in features)
+        lat_column, lon_column = lat_column or 'lat', lon_column or 'lon'
+    else:
+        raise ValueError(f"Format non supporté : {file_format}. Formats possibles : {', '.join(FORMATS)}.")
+
+    lat_column = _find_column(headers, LATITUDE_COLUMNS, lat_column)
+    lon_column = _find_column(headers, LONGITUDE_COLUMNS, lon_column)
+    return list(headers), rows, lat_column, lon_column
+
+
+def _geojson_features(data):
+    """Entités d'un document GeoJSON (FeatureCollection ou Feature seule), structure vérifiée"""
+    if not isinstance(data, dict):
+        raise ValueError("GeoJSON non valide : objet FeatureCollection ou Feature attendu.")
+    features = data.get('features') if data.get('type') == 'FeatureCollection' else [data]
+    if not isinstance(features, list):
+        raise ValueError("GeoJSON non valide : 'features' doit être une liste.")
+    for feature in features:
+        if not (
+            isinstance(feature, dict)
+            and isinstance(feature.get('properties') or {}, dict)
+            and isinstance(feature.get('geometry') or {}, dict)
+        ):
+            raise ValueError("GeoJSON non valide : chaque entité doit être un objet Feature.")
+    return features
+
+
+def _feature_row(feature):
+    row = dict(feature.get('properties') or {})
+    geometry = feature.get('geometry') or {}
+    coordinates = geometry.get('coordinates') if geometry.get('type') == 'Point' else None
+    if isinstance(coordinates, list) and len(coordinates) >= 2:
+        row['lon'], row['lat'] = coordinates[0], coordinates[1]
+    else:
+        row['lon'], row['lat'] = None, None
+    return row
+
+
+def _chunks(rows, size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def geocode_rows(rows, lat_column, lon_column, chunk_size=CHUNK_SIZE):
+    """Ajoute adm3_pcode/adm2_pcode/adm1_pcode à chaque ligne (None hors du territoire)"""
+    import numpy as np
+
+    index = get_commune_index()
+    for chunk in _chunks(rows, chunk_size):
+        lons = np.array([_coordinate(row.get(lon_column)) for row in chunk])
+        lats = np.array([_coordinate(row.get(lat_column)) for row in chunk])
+        positions = index.locate_many(lons, lats)
+        for row, position in zip(chunk, positions):
+            if position >= 0:
+                zone = index.zone(position)
+                row['adm3_pcode'] = zone['commune']['adm3_pcode']
+                row['adm2_pcode'] = zone['department']['adm2_pcode']
+                row['adm1_pcode'] = zone['region']['adm1_pcode']
+            else:
+                row['adm3_pcode'] = row['adm2_pcode'] = row['adm1_pcode'] = None
+            yield row
+
+
+class Echo:
+    """Pseudo-fichier pour csv.writer : renvoie la ligne écrite au lieu de la stocker"""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(headers, rows):
+    columns = [header for header in headers if header not in OUTPUT_COLUMNS] + OUTPUT_COLUMNS
+    writer = csv.DictWriter(Echo(), fieldnames=columns, extrasaction='ignore')
+    yield writer.writeheader()
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def iter_ndjson(rows):
+    for row in rows:
+        yield json.dumps(row, ensure_ascii=False, default=str) + '\n'
+
+
+def iter_output(headers, rows, output_format):
+    if output_format == 'ndjson':
+        return iter_ndjson(rows)
+    return iter_csv(headers, rows)
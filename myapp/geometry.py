@@ -0,0 +1,146 @@
+"""Outils géométriques pour les limites administratives (simplification par résolution)"""
+from collections import OrderedDict
+
+# Résolution complète : la géométrie d'origine stockée dans geo_json
+FULL_RESOLUTION = 'full'
+
+# Tolérances de simplification (en degrés) et précision des coordonnées (nombre de décimales)
+RESOLUTIONS = OrderedDict([
+    ('low', {'tolerance': 0.05, 'precision': 3}),
+    ('medium', {'tolerance': 0.01, 'precision': 4}),
+    ('high', {'tolerance': 0.002, 'precision': 5}),
+])
+
+# Niveau de zoom (Leaflet/web mercator) maximal servi par chaque résolution
+ZOOM_RESOLUTIONS = [
+    (6, 'low'),
+    (8, 'medium'),
+    (11, 'high'),
+]
+
+
+def resolution_for_zoom(zoom):
+    """Retourne la résolution adaptée à un niveau de zoom"""
+    for max_zoom, resolution in ZOOM_RESOLUTIONS:
+        if zoom <= max_zoom:
+            return resolution
+    return FULL_RESOLUTION
+
+
+def parse_resolution(resolution=None, zoom=None):
+    """Détermine la résolution demandée à partir de ?resolution= ou ?zoom=
+
+    Lève ValueError si la valeur n'est pas reconnue.
+    """
+    if resolution:
+        resolution = resolution.strip().lower()
+        if resolution != FULL_RESOLUTION and resolution not in RESOLUTIONS:
+            raise ValueError(
+                f"Résolution inconnue '{resolution}'. Valeurs possibles : "
+                f"{', '.join(list(RESOLUTIONS) + [FULL_RESOLUTION])}"
+            )
+        return resolution
+    if zoom not in (None, ''):
+        try:
+            zoom = int(zoom)
+        except (TypeError, ValueError):
+            raise ValueError(f"Niveau de zoom non valide '{zoom}' : entier attendu.")
+        return resolution_for_zoom(zoom)
+    return FULL_RESOLUTION
+
+
+def simplify_coverage(geometries, tolerance, precision):
+    """Simplifie un ensemble de géométries voisines en préservant leur topologie
+
+    Les frontières communes à deux zones sont simplifiées une seule fois
+    (shapely.coverage_simplify), ce qui évite les trous et chevauchements entre
+    voisins. Les coordonnées sont ensuite arrondies à `precision` décimales :
+    deux sommets identiques restent identiques après arrondi.
+    """
+    import numpy as np
+    import shapely
+    from shapely.geometry import mapping, shape
+
+    shapes = np.array([shape(geometry) for geometry in geometries], dtype=object)
+    if hasattr(shapely, 'coverage_simplify'):
+        simplified = shapely.coverage_simplify(shapes, tolerance)
+    else:
+        # shapely < 2.1 : simplification géométrie par géométrie
+        simplified = shapely.simplify(shapes, tolerance, preserve_topology=True)
+    simplified = shapely.transform(simplified, lambda coords: np.round(coords, precision))
+
+    results = []
+    for original, geom in zip(geometries, simplified):
+        if geom.is_empty:
+            # Zone trop petite pour la tolérance : on garde la géométrie d'origine
+            results.append(original)
+        else:
+            results.append(mapping(geom))
+    return results
+
+
+def build_simplified_geometries(geometries):
+    """Calcule toutes les résolutions pour une liste de géométries GeoJSON
+
+    Retourne une liste de dictionnaires {résolution: géométrie}, dans l'ordre d'entrée.
+    """
+    results = [{} for _ in geometries]
+    if not geometries:
+        return results
+    for resolution, params in RESOLUTIONS.items():
+        simplified = simplify_coverage(geometries, params['tolerance'], params['precision'])
+        for result, geometry in zip(results, simplified):
+            # mapping() renvoie des tuples : on repasse en listes pour le JSONField
+            result[resolution] = _as_lists(geometry)
+    return results
+
+
+def neighbourhood(geometries, indices, rings=1):
+    """Indices des géométries à `rings` contacts ou moins de celles d'`indices` (elles comprises)"""
+    import shapely
+    from shapely.geometry import shape
+
+    shapes = [shape(geometry) for geometry in geometries]
+    tree = shapely.STRtree(shapes)
+    found = set(indices)
+    frontier = set(indices)
+    for _ in range(rings):
+        if not frontier:
+            break
+        touching = tree.query([shapes[i] for i in frontier], predicate='intersects')[1]
+        frontier = set(touching.tolist()) - found
+        found |= frontier
+    return found
+
+
+def rebuild_simplified_geometries(model, pks=None):
+    """Recalcule geo_json_simplified des lignes d'un modèle de limites
+
+    Chaque table (Region, Department, Commune) est traitée comme une couverture.
+    Avec `pks`, seules ces zones et leurs voisines sont réécrites : la couverture
+    simplifiée est alors limitée aux voisines des voisines, qui portent tous les
+    sommets partagés par les zones réécrites (leurs frontières sortent identiques
+    à celles d'un recalcul complet). Retourne le nombre de lignes mises à jour.
+    """
+    instances = list(model.objects.only('pk', 'geo_json').order_by('pk'))
+    written = instances
+    if pks is not None:
+        pks = set(pks)
+        geometries = [instance.geo_json for instance in instances]
+        saved = [i for i, instance in enumerate(instances) if instance.pk in pks]
+        written = [instances[i] for i in sorted(neighbourhood(geometries, saved))]
+        instances = [instances[i] for i in sorted(neighbourhood(geometries, saved, rings=2))]
+
+    simplified = build_simplified_geometries([instance.geo_json for instance in instances])
+    for instance, geometries in zip(instances, simplified):
+        instance.geo_json_simplified = geometries
+    model.objects.bulk_update(written, ['geo_json_simplified'], batch_size=200)
+    return len(written)
+
+
+def _as_lists(value):
+    if isinstance(value, dict):
+        return {key: _as_lists(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_as_lists(item) for item in value]
+    return value
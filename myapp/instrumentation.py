@@ -0,0 +1,240 @@
+"""Mesures par requête : nombre de requêtes SQL, temps SQL, temps de sérialisation,
+taille de la réponse et latence, agrégées par vue dans un stockage en mémoire
+
+Chaque processus garde, pour chaque vue, les INSTRUMENTATION_WINDOW dernières
+mesures (fenêtre glissante) ; les percentiles sont calculés à la lecture. La
+répétition d'une même requête SQL au sein d'une requête HTTP (motif N+1) est
+comptée. Les requêtes plus lentes que INSTRUMENTATION_SLOW_REQUEST_MS sont
+journalisées avec leur SQL.
+
+Les réponses en flux (StreamingHttpResponse) sont mesurées jusqu'au retour de
+la vue : le SQL exécuté pendant l'envoi du flux n'est pas compté.
+"""
+import logging
+import math
+import threading
+import time
+from collections import Counter, deque
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WINDOW = 1000
+SLOW_REQUESTS_KEPT = 50
+SLOW_QUERIES_LOGGED = 20
+
+
+def percentile(values, fraction):
+    """Percentile par la méthode du rang le plus proche (liste triée en entrée)"""
+    if not values:
+        return None
+    index = min(len(values) - 1, max(0, math.ceil(fraction * len(values)) - 1))
+    return values[index]
+
+
+@contextmanager
+def serialization_timer(request):
+    """Compte la durée du bloc comme temps de sérialisation (rendu fait dans la vue elle-même)"""
+    request = getattr(request, '_request', request)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if hasattr(request, '_serialization_time'):
+            request._serialization_time += time.perf_counter() - start
+
+
+class RequestSample:
+    __slots__ = ('duration', 'queries', 'sql_time', 'serialization_time', 'size', 'repeated', 'status')
+
+    def __init__(self, duration, queries, sql_time, serialization_time, size, repeated, status):
+        self.duration = duration
+        self.queries = queries
+        self.sql_time = sql_time
+        self.serialization_time = serialization_time
+        self.size = size
+        self.repeated = repeated
+        self.status = status
+
+
+class MetricsStore:
+    """Fenêtre glissante de mesures par vue (partagée par les threads du processus)"""
+
+    def __init__(self, window=DEFAULT_WINDOW):
+        self.window = window
+        self._samples = {}
+        self._totals = Counter()
+        self._slow = deque(maxlen=SLOW_REQUESTS_KEPT)
+        self._lock = threading.Lock()
+
+    def record(self, view, sample):
+        with self._lock:
+            samples = self._samples.get(view)
+            if samples is None:
+                samples = self._samples[view] = deque(maxlen=self.window)
+            samples.append(sample)
+            self._totals[view] += 1
+
+    def record_slow(self, entry):
+        with self._lock:
+            self._slow.appendleft(entry)
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._totals.clear()
+            self._slow.clear()
+
+    def slow_requests(self):
+        with self._lock:
+            return list(self._slow)
+
+    def summary(self):
+        """Statistiques par vue, triées par temps total décroissant (durées en ms)"""
+        with self._lock:
+            snapshot = {view: list(samples) for view, samples in self._samples.items()}
+            totals = dict(self._totals)
+
+        rows = []
+        for view, samples in snapshot.items():
+            durations = sorted(sample.duration for sample in samples)
+            sizes = [sample.size for sample in samples if sample.size is not None]
+            count = len(samples)
+            rows.append({
+                'view': view,
+                'requests': totals[view],
+                'window': count,
+                'errors': sum(1 for sample in samples if sample.status >= 500),
+                'queries_avg': round(sum(sample.queries for sample in samples) / count, 1),
+                'queries_max': max(sample.queries for sample in samples),
+                'repeated_max': max(sample.repeated for sample in samples),
+                'sql_ms_avg': round(sum(sample.sql_time for sample in samples) / count * 1000, 2),
+                'serialization_ms_avg': round(sum(sample.serialization_time for sample in samples) / count * 1000, 2),
+                'bytes_avg': int(sum(sizes) / len(sizes)) if sizes else None,
+                'p50_ms': round(percentile(durations, 0.50) * 1000, 2),
+                'p95_ms': round(percentile(durations, 0.95) * 1000, 2),
+                'p99_ms': round(percentile(durations, 0.99) * 1000, 2),
+                'total_ms': round(sum(durations) * 1000, 1),
+            })
+        rows.sort(key=lambda row: row['total_ms'], reverse=True)
+        return rows
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_metrics_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = MetricsStore(getattr(settings, 'INSTRUMENTATION_WINDOW', DEFAULT_WINDOW))
+    return _store
+
+
+class QueryRecorder:
+    """execute_wrapper Django : compte et chronomètre les requêtes SQL d'une requête HTTP"""
+
+    def __init__(self, keep_sql=False):
+        self.count = 0
+        self.time = 0.0
+        self.statements = Counter()
+        self.keep_sql = keep_sql
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            self.count += 1
+            self.time += duration
+            self.statements[sql] += 1
+            if self.keep_sql:
+                self.queries.append((duration, sql, params))
+
+    @property
+    def repeated(self):
+        """Nombre d'exécutions de la requête SQL la plus répétée (N+1 si élevé)"""
+        return max(self.statements.values(), default=0)
+
+
+def view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unresolved'
+    return f'{request.method} {match.view_name or match._func_path}'
+
+
+class RequestMetricsMiddleware:
+    """Enregistre les mesures de chaque requête dans le stockage en mémoire"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, 'INSTRUMENTATION_ENABLED', True)
+        slow_ms = getattr(settings, 'INSTRUMENTATION_SLOW_REQUEST_MS', None)
+        self.slow_threshold = slow_ms / 1000 if slow_ms else None
+
+    def __call__(self, request):
+        if not self.enabled:
+            return self.get_response(request)
+
+        recorder = QueryRecorder(keep_sql=self.slow_threshold is not None)
+        request._serialization_time = 0.0
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(recorder))
+            response = self.get_response(request)
+        duration = time.perf_counter() - start
+
+        if response.streaming:
+            size = response.get('Content-Length')
+            size = int(size) if size else None
+        else:
+            size = len(response.content)
+        view = view_name(request)
+        get_metrics_store().record(view, RequestSample(
+            duration, recorder.count, recorder.time, request._serialization_time,
+            size, recorder.repeated, response.status_code,
+        ))
+        if self.slow_threshold is not None and duration >= self.slow_threshold:
+            self.log_slow_request(request, view, duration, recorder)
+        return response
+
+    def process_template_response(self, request, response):
+        # Le rendu (sérialisation DRF) a lieu juste après les process_template_response ; les réponses
+        # rendues dans la vue (cache de réponses) sont mesurées par serialization_timer
+        started = time.perf_counter()
+
+        def rendered(response):
+            request._serialization_time += time.perf_counter() - started
+
+        response.add_post_render_callback(rendered)
+        return response
+
+    def log_slow_request(self, request, view, duration, recorder):
+        slowest = sorted(recorder.queries, key=lambda query: query[0], reverse=True)[:SLOW_QUERIES_LOGGED]
+        repeated = [(sql, count) for sql, count in recorder.statements.most_common(5) if count > 1]
+        get_metrics_store().record_slow({
+            'view': view,
+            'path': request.get_full_path(),
+            'duration_ms': round(duration * 1000, 1),
+            'queries': recorder.count,
+            'sql_ms': round(recorder.time * 1000, 1),
+            'slowest': [(round(query_time * 1000, 2), sql) for query_time, sql, _ in slowest],
+            'repeated': repeated,
+        })
+        lines = [
+            f'Requête lente {view} {request.get_full_path()} : {duration * 1000:.0f} ms, '
+            f'{recorder.count} requêtes SQL ({recorder.time * 1000:.0f} ms)'
+        ]
+        lines += [f'  {count}x {sql}' for sql, count in repeated]
+        lines += [f'  {query_time * 1000:.2f} ms {sql} {params!r}' for query_time, sql, params in slowest]
+        logger.warning('\n'.join(lines))
+
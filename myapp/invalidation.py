@@ -0,0 +1,140 @@
+"""Invalidation automatique des caches par incrémentation des versions des données
+
+Toute écriture sur les limites administratives, les recensements, DemographicData
+ou EducationLevel (post_save / post_delete : API, admin, shell) incrémente la
+version du jeu de données concerné. Les caches (réponses, résultats, tuiles,
+exports) ont cette version dans leurs clés : rien n'est supprimé explicitement.
+
+Dans une transaction, les jeux de données touchés sont regroupés et incrémentés
+une seule fois, au commit. Les imports en masse s'entourent de
+suppress_invalidation() et incrémentent eux-mêmes les versions à la fin.
+
+Le changement du code d'une zone est reporté sur les lignes qui le recopient
+(DemographicData.zone_pcode, CensusDiff.zone_pcode), dont les recensements
+sont incrémentés, y compris pendant un import. Une géométrie enregistrée hors
+import (API, admin, shell) fait recalculer au commit les géométries simplifiées
+de la zone et de ses voisines (import_geojson recalcule tout lui-même à la fin).
+"""
+import threading
+from contextlib import contextmanager
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Census, CensusDiff, Country, Region, Department, Commune, DemographicData, EducationLevel
+from .geometry import rebuild_simplified_geometries
+from .versioning import BOUNDARIES, bump_scopes, bump_version, census_scope, get_instance_scopes
+
+WATCHED_MODELS = (Country, Region, Department, Commune, Census, DemographicData, EducationLevel)
+
+# Niveau de chaque modèle de limite (code recopié dans DemographicData.zone_pcode)
+ZONE_LEVELS = {Country: 'country', Region: 'region', Department: 'department', Commune: 'commune'}
+
+# Modèles dont les géométries sont simplifiées par résolution (geo_json_simplified)
+GEOMETRY_MODELS = (Region, Department, Commune)
+
+_local = threading.local()
+
+
+def _pending():
+    if not hasattr(_local, 'pending'):
+        _local.pending = set()
+    return _local.pending
+
+
+def _flush():
+    # Les jeux de données d'une transaction annulée restent en attente : incrémentés au commit suivant
+    scopes = set(_pending())
+    _pending().clear()
+    if scopes:
+        bump_scopes(scopes)
+
+
+def invalidate(scopes, using=None):
+    """Incrémente la version des jeux de données au commit (immédiatement hors transaction)"""
+    if not scopes or is_invalidation_suppressed():
+        return
+    _pending().update(scopes)
+    transaction.on_commit(_flush, using=using)
+
+
+def is_invalidation_suppressed():
+    return getattr(_local, 'suppressed', 0) > 0
+
+
+@contextmanager
+def suppress_invalidation():
+    """Ignore les signaux d'écriture du thread courant (imports en masse)
+
+    L'appelant incrémente les versions une fois l'import terminé, avant de
+    recalculer ce qui en dépend (écarts entre recensements…). Utilisable aussi
+    comme décorateur.
+    """
+    _local.suppressed = getattr(_local, 'suppressed', 0) + 1
+    try:
+        yield
+    finally:
+        _local.suppressed -= 1
+
+
+def _is_cascade(sender, origin):
+    """Suppression en cascade depuis un autre modèle (origin : instance ou queryset)"""
+    return origin is not None and getattr(origin, 'model', type(origin)) is not sender
+
+
+@receiver(post_save)
+def invalidate_on_save(sender, instance, using, **kwargs):
+    if sender in WATCHED_MODELS:
+        invalidate(get_instance_scopes(instance), using=using)
+
+
+@receiver(post_delete)
+def invalidate_on_delete(sender, instance, using, origin=None, **kwargs):
+    if sender not in WATCHED_MODELS:
+        return
+    # Niveaux d'études supprimés avec leur ligne démographique : celle-ci porte déjà le recensement
+    if sender is EducationLevel and _is_cascade(sender, origin):
+        return
+    invalidate(get_instance_scopes(instance), using=using)
+
+
+@receiver(post_save)
+def sync_zone_pcode(sender, instance, created, using, raw=False, **kwargs):
+    """Reporte le nouveau code d'une zone sur ses lignes démographiques et ses évolutions"""
+    level = ZONE_LEVELS.get(sender)
+    if level is None or created or raw:
+        return
+    pcode = getattr(instance, DemographicData.ZONE_PCODE_FIELDS[level])
+    rows = DemographicData.objects.using(using).filter(level=level, **{level: instance}).exclude(zone_pcode=pcode)
+    census_ids = set(rows.values_list('census_id', flat=True))
+    if not census_ids:
+        return
+    rows.update(zone_pcode=pcode)
+    CensusDiff.objects.using(using).filter(level=level, zone_id=instance.pk).update(zone_pcode=pcode)
+    _pending().update(census_scope(census_id) for census_id in census_ids)
+    transaction.on_commit(_flush, using=using)
+
+
+def _rebuild_geometries():
+    saved = getattr(_local, 'geometry_pks', {})
+    _local.geometry_pks = {}
+    for model in GEOMETRY_MODELS:
+        if model in saved:
+            rebuild_simplified_geometries(model, saved[model])
+    # Après le recalcul : aucune réponse de la nouvelle version n'est mise en cache avec les anciennes géométries
+    if saved:
+        bump_version(BOUNDARIES)
+
+
+@receiver(post_save)
+def simplify_saved_geometry(sender, instance, using, update_fields=None, raw=False, **kwargs):
+    """Recalcule au commit les géométries simplifiées d'une zone enregistrée et de ses voisines"""
+    if sender not in GEOMETRY_MODELS or raw or is_invalidation_suppressed():
+        return
+    if update_fields is not None and 'geo_json' not in update_fields:
+        return
+    if not hasattr(_local, 'geometry_pks'):
+        _local.geometry_pks = {}
+    _local.geometry_pks.setdefault(sender, set()).add(instance.pk)
+    transaction.on_commit(_rebuild_geometries, using=using)
@@ -0,0 +1,348 @@
+"""Générateur de charge HTTP : sessions de navigation cartographique rejouées en parallèle
+
+Une session est une suite d'étapes {"label", "path", "params", "think"} : chargement
+des limites, changement de niveau, changement d'année, export d'une zone,
+téléchargement de l'export complet. Les sessions sont soit écrites par
+`scripted_session` à partir du catalogue de l'API (années, identifiants des
+zones), soit relues depuis un fichier JSON lines (une session par ligne).
+
+Chaque worker garde sa connexion HTTP (keep-alive) et enchaîne les sessions.
+Les latences sont agrégées par étape (percentiles, histogramme) ; un thread
+échantillonne en parallèle les connexions ouvertes sur la base de données.
+"""
+import gzip
+import http.client
+import json
+import random
+import threading
+import time
+from collections import Counter
+from urllib.parse import urlencode, urlsplit
+
+from django.db import connection
+
+from .instrumentation import percentile
+from .response_cache import brotli_available
+
+# Bornes supérieures (ms) des classes de l'histogramme des latences
+HISTOGRAM_BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+API_PREFIX = '/api/api'
+EXPORT_PREFIX = '/api'
+LEVEL_ENDPOINTS = {'region': 'regions', 'department': 'departments', 'commune': 'communes'}
+RESOLUTIONS = ['low', 'medium', 'high']
+
+
+def decode_body(body, encoding):
+    """Corps décompressé selon l'en-tête Content-Encoding de la réponse"""
+    encoding = (encoding or '').strip().lower()
+    if encoding == 'gzip':
+        return gzip.decompress(body)
+    if encoding == 'br':
+        import brotli
+
+        return brotli.decompress(body)
+    return body
+
+
+class HttpClient:
+    """Connexion keep-alive vers le serveur cible (reconnexion après erreur)
+
+    Les réponses sont demandées compressées, comme par un navigateur (brotli
+    seulement si le module est installé), puis décompressées.
+    """
+
+    def __init__(self, base_url, timeout=60):
+        parts = urlsplit(base_url)
+        self.scheme = parts.scheme
+        self.netloc = parts.netloc
+        self.prefix = parts.path.rstrip('/')
+        self.timeout = timeout
+        self.connection = None
+        self.accept_encoding = 'gzip, br' if brotli_available() else 'gzip'
+
+    def _connect(self):
+        cls = http.client.HTTPSConnection if self.scheme == 'https' else http.client.HTTPConnection
+        return cls(self.netloc, timeout=self.timeout)
+
+    def get(self, path, params=None):
+        """(statut, corps décompressé, octets reçus) ; le corps est lu en entier, flux compris"""
+        url = self.prefix + path + (f'?{urlencode(params)}' if params else '')
+        if self.connection is None:
+            self.connection = self._connect()
+        try:
+            self.connection.request('GET', url, headers={'Accept-Encoding': self.accept_encoding})
+            response = self.connection.getresponse()
+            body = response.read()
+            if response.getheader('Connection', '').lower() == 'close':
+                self.close()
+            return response.status, decode_body(body, response.getheader('Content-Encoding')), len(body)
+        except (OSError, http.client.HTTPException):
+            self.close()
+            raise
+
+    def get_json(self, path, params=None):
+        status, body, _ = self.get(path, params)
+        if status != 200:
+            raise RuntimeError(f'GET {path} : statut {status}')
+        return json.loads(body)
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+
+def discover(base_url):
+    """Catalogue de l'API cible : années de recensement et identifiants des zones par niveau"""
+    client = HttpClient(base_url)
+    try:
+        catalog = {'years': sorted(client.get_json(f'{API_PREFIX}/census-years/'))}
+        for level, endpoint in LEVEL_ENDPOINTS.items():
+            rows = client.get_json(f'{API_PREFIX}/{endpoint}/', {'stream': 1, 'fields': 'id'})
+            catalog[level] = [row['id'] for row in rows]
+    finally:
+        client.close()
+    if not catalog['years']:
+        raise RuntimeError("Aucun recensement sur le serveur cible")
+    return catalog
+
+
+def _step(label, path, params=None, think=0.0):
+    return {'label': label, 'path': path, 'params': params or {}, 'think': think}
+
+
+def scripted_session(rng, catalog, export_all_ratio=0.05, zone_export_ratio=0.3):
+    """Session type d'un utilisateur du tableau de bord"""
+    years = catalog['years']
+    year = years[-1]
+
+    def think():
+        return round(rng.uniform(0.3, 3.0), 2)
+
+    steps = [
+        _step('census-years', f'{API_PREFIX}/census-years/'),
+        _step('regions', f'{API_PREFIX}/regions/', {'stream': 1}),
+        _step('demographics', f'{API_PREFIX}/demographics/', {'year': year, 'stream': 1}, think()),
+    ]
+    for _ in range(rng.randint(1, 4)):
+        action = rng.random()
+        if action < 0.45:
+            level = rng.choice(['department', 'commune'])
+            steps.append(_step(
+                LEVEL_ENDPOINTS[level], f'{API_PREFIX}/{LEVEL_ENDPOINTS[level]}/',
+                {'stream': 1, 'resolution': rng.choice(RESOLUTIONS)}, think(),
+            ))
+        elif action < 0.8 and len(years) > 1:
+            year = rng.choice([y for y in years if y != year])
+            steps.append(_step('demographics', f'{API_PREFIX}/demographics/', {'year': year, 'stream': 1}))
+            steps.append(_step('census-tree', f'{API_PREFIX}/census/{year}/tree/', think=think()))
+        else:
+            steps.append(_step('choropleth', f'{API_PREFIX}/choropleth/', {
+                'year': year, 'level': rng.choice(list(LEVEL_ENDPOINTS)), 'indicator': 'total_population',
+            }, think()))
+
+        if rng.random() < zone_export_ratio:
+            level = rng.choice([level for level in LEVEL_ENDPOINTS if catalog.get(level)])
+            zone_id = rng.choice(catalog[level])
+            steps.append(_step('export-zone-data', f'{EXPORT_PREFIX}/export-zone-data/{zone_id}/{level}/', {'year': year}, think()))
+
+    if rng.random() < export_all_ratio:
+        steps.append(_step('export-all-data', f'{EXPORT_PREFIX}/export-all-data/', {'year': year}, think()))
+    return steps
+
+
+def scripted_sessions(catalog, seed=0, **options):
+    """Suite infinie et reproductible de sessions scriptées"""
+    rng = random.Random(seed)
+    while True:
+        yield scripted_session(rng, catalog, **options)
+
+
+def load_sessions(path):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def save_sessions(path, sessions):
+    with open(path, 'w', encoding='utf-8') as f:
+        for session in sessions:
+            f.write(json.dumps(session, ensure_ascii=False) + '\n')
+
+
+class LoadResults:
+    """Latences, statuts et tailles par étape (partagés par les workers)"""
+
+    def __init__(self):
+        self.latencies = {}
+        self.errors = Counter()
+        self.statuses = Counter()
+        self.bytes = Counter()
+        self.wire_bytes = Counter()
+        self.sessions = 0
+        self.started = time.perf_counter()
+        self.finished = None
+        self._lock = threading.Lock()
+
+    def record(self, label, duration, status, size, wire_size=None):
+        """`size` : corps décompressé ; `wire_size` : octets reçus (compressés)"""
+        with self._lock:
+            self.latencies.setdefault(label, []).append(duration)
+            self.statuses[status] += 1
+            self.bytes[label] += size
+            self.wire_bytes[label] += size if wire_size is None else wire_size
+            if status is None or status >= 400:
+                self.errors[label] += 1
+
+    def session_done(self):
+        with self._lock:
+            self.sessions += 1
+
+    @property
+    def elapsed(self):
+        return (self.finished or time.perf_counter()) - self.started
+
+    def summary(self):
+        rows = []
+        all_latencies = []
+        for label, latencies in sorted(self.latencies.items()):
+            ordered = sorted(latencies)
+            all_latencies.extend(ordered)
+            rows.append({
+                'label': label,
+                'requests': len(ordered),
+                'errors': self.errors[label],
+                'p50_ms': round(percentile(ordered, 0.50) * 1000, 1),
+                'p95_ms': round(percentile(ordered, 0.95) * 1000, 1),
+                'p99_ms': round(percentile(ordered, 0.99) * 1000, 1),
+                'max_ms': round(ordered[-1] * 1000, 1),
+                'avg_kb': round(self.bytes[label] / len(ordered) / 1024, 1),
+                'avg_wire_kb': round(self.wire_bytes[label] / len(ordered) / 1024, 1),
+            })
+        all_latencies.sort()
+        total = len(all_latencies)
+        errors = sum(self.errors.values())
+        return {
+            'duration_s': round(self.elapsed, 1),
+            'sessions': self.sessions,
+            'requests': total,
+            'throughput_rps': round(total / max(self.elapsed, 1e-9), 1),
+            'errors': errors,
+            'error_rate': round(errors / total, 4) if total else 0,
+            'statuses': {str(status): count for status, count in self.statuses.items()},
+            'p50_ms': round(percentile(all_latencies, 0.50) * 1000, 1) if total else None,
+            'p95_ms': round(percentile(all_latencies, 0.95) * 1000, 1) if total else None,
+            'p99_ms': round(percentile(all_latencies, 0.99) * 1000, 1) if total else None,
+            'histogram': histogram(all_latencies),
+            'endpoints': rows,
+        }
+
+
+def histogram(latencies):
+    """[(borne supérieure en ms ou None pour la dernière classe, effectif)]"""
+    counts = [0] * (len(HISTOGRAM_BUCKETS_MS) + 1)
+    for latency in latencies:
+        ms = latency * 1000
+        index = next((i for i, bound in enumerate(HISTOGRAM_BUCKETS_MS) if ms <= bound), len(HISTOGRAM_BUCKETS_MS))
+        counts[index] += 1
+    return list(zip(HISTOGRAM_BUCKETS_MS + [None], counts))
+
+
+class ConnectionSampler(threading.Thread):
+    """Échantillonne le nombre de connexions ouvertes (et actives) sur la base de données
+
+    PostgreSQL : pg_stat_activity ; MySQL : Threads_connected ; SQLite : non mesurable.
+    La connexion de l'échantillonneur lui-même est exclue.
+    """
+
+    def __init__(self, interval=0.5):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.samples = []
+        self.stop_event = threading.Event()
+
+    def sample(self):
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute(
+                    "SELECT count(*), count(*) FILTER (WHERE state = 'active') FROM pg_stat_activity "
+                    "WHERE datname = current_database() AND pid <> pg_backend_pid()"
+                )
+                return cursor.fetchone()
+            if connection.vendor == 'mysql':
+                cursor.execute("SHOW STATUS WHERE Variable_name IN ('Threads_connected', 'Threads_running')")
+                values = dict(cursor.fetchall())
+                return int(values['Threads_connected']) - 1, int(values['Threads_running']) - 1
+        return None
+
+    def run(self):
+        try:
+            while not self.stop_event.is_set():
+                sample = self.sample()
+                if sample is None:
+                    return
+                self.samples.append(sample)
+                self.stop_event.wait(self.interval)
+        finally:
+            connection.close()
+
+    def stop(self):
+        self.stop_event.set()
+        self.join()
+
+    def summary(self):
+        if not self.samples:
+            return None
+        totals = [total for total, _ in self.samples]
+        active = [running for _, running in self.samples]
+        return {
+            'samples': len(self.samples),
+            'max_connections': max(totals),
+            'avg_connections': round(sum(totals) / len(totals), 1),
+            'max_active': max(active),
+            'avg_active': round(sum(active) / len(active), 1),
+        }
+
+
+def run_load(base_url, sessions, concurrency=10, duration=None, think_factor=1.0):
+    """Rejoue les sessions avec `concurrency` workers, jusqu'à épuisement ou `duration` secondes"""
+    results = LoadResults()
+    deadline = time.perf_counter() + duration if duration else None
+    sessions = iter(sessions)
+    sessions_lock = threading.Lock()
+    stop = threading.Event()
+
+    def next_session():
+        with sessions_lock:
+            return next(sessions, None)
+
+    def worker():
+        client = HttpClient(base_url)
+        try:
+            while not stop.is_set():
+                session = next_session()
+                if session is None:
+                    return
+                for step in session:
+                    if stop.is_set() or (deadline and time.perf_counter() >= deadline):
+                        stop.set()
+                        return
+                    start = time.perf_counter()
+                    try:
+                        status, body, wire_size = client.get(step['path'], step.get('params'))
+                    except (OSError, http.client.HTTPException):
+                        status, body, wire_size = None, b'', 0
+                    results.record(step['label'], time.perf_counter() - start, status, len(body), wire_size)
+                    if think_factor and step.get('think'):
+                        stop.wait(step['think'] * think_factor)
+                results.session_done()
+        finally:
+            client.close()
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    results.finished = time.perf_counter()
+    return results
@@ -0,0 +1,72 @@
+import time
+
+from django.core.management.base import BaseCommand
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from myapp.models import Census, Region, Department, Commune, DemographicData
+from myapp.parsers import FastJSONParser
+from myapp.renderers import FastJSONRenderer
+from myapp.serializers import RegionSerializer, DepartmentSerializer, CommuneSerializer, DemographicDataSerializer
+from io import BytesIO
+
+class Command(BaseCommand):
+    help = 'Compare DRF JSON rendering/parsing with the orjson-based renderer and parser on the API datasets'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=5, help='Number of runs per measure (best time is kept)')
+        parser.add_argument('--year', type=int, help='Census year for the demographics dataset (default: latest)')
+
+    def best_time(self, func, repeat):
+        best = None
+        result = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = func()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best, result
+
+    def get_datasets(self, year):
+        census = Census.objects.filter(year=year).first() if year else Census.objects.order_by('-year').first()
+        demographics = DemographicData.objects.select_related('educationlevel')
+        if census:
+            demographics = demographics.filter(census=census)
+        return [
+            ('demographics', DemographicDataSerializer, demographics, {}),
+            ('regions', RegionSerializer, Region.objects.all(), {}),
+            ('departments', DepartmentSerializer, Department.objects.all(), {}),
+            ('communes', CommuneSerializer, Commune.objects.all(), {}),
+            ('communes (low)', CommuneSerializer, Commune.objects.all(), {'resolution': 'low'}),
+        ]
+
+    def handle(self, *args, **options):
+        try:
+            import orjson  # noqa: F401
+        except ImportError:
+            self.stdout.write(self.style.WARNING('orjson is not installed: the fast renderer falls back to DRF'))
+
+        repeat = options['repeat']
+        header = f"{'dataset':<16}{'rows':>7}{'size KB':>10}{'serialize':>11}{'drf render':>12}{'fast render':>13}{'drf parse':>11}{'fast parse':>12}{'speedup':>9}"
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+
+        for name, serializer_class, queryset, context in self.get_datasets(options['year']):
+            instances = list(queryset)
+            serialize_time, data = self.best_time(
+                lambda: serializer_class(instances, many=True, context=context).data, repeat
+            )
+            drf_render, content = self.best_time(lambda: JSONRenderer().render(data), repeat)
+            fast_render, fast_content = self.best_time(lambda: FastJSONRenderer().render(data), repeat)
+            drf_parse, parsed = self.best_time(lambda: JSONParser().parse(BytesIO(content)), repeat)
+            fast_parse, fast_parsed = self.best_time(lambda: FastJSONParser().parse(BytesIO(fast_content)), repeat)
+            if parsed != fast_parsed:
+                self.stdout.write(self.style.ERROR(f'{name}: rendered documents differ'))
+
+            speedup = (drf_render + drf_parse) / max(fast_render + fast_parse, 1e-9)
+            self.stdout.write(
+                f"{name:<16}{len(instances):>7}{len(content) / 1024:>10.0f}"
+                f"{serialize_time * 1000:>9.1f}ms{drf_render * 1000:>10.1f}ms{fast_render * 1000:>11.1f}ms"
+                f"{drf_parse * 1000:>9.1f}ms{fast_parse * 1000:>10.1f}ms{speedup:>8.1f}x"
+            )
+
+        self.stdout.write(self.style.SUCCESS('Benchmark finished'))
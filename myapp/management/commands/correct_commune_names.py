@@ -1,10 +1,13 @@
 from django.core.management.base import BaseCommand
 from django.db import transaction
 from myapp.models import Commune
+from myapp.versioning import BOUNDARIES, bump_version
+from myapp.invalidation import suppress_invalidation
 
 class Command(BaseCommand):
     help = 'Corriger les noms des communes'
 
+    @suppress_invalidation()
     def handle(self, *args, **options):
         with transaction.atomic():
             # Dictionnaire des corrections pour les communes
@@ -77,4 +80,5 @@ class Command(BaseCommand):
                         f'Commune mise à jour: {old_name} -> {commune.adm3_en}'
                     ))
 
+            bump_version(BOUNDARIES)
             self.stdout.write(self.style.SUCCESS('Correction des noms des communes terminée')) 
\ No newline at end of file
@@ -1,10 +1,13 @@
 from django.core.management.base import BaseCommand
 from django.db import transaction
 from myapp.models import Region, Department, Commune
+from myapp.versioning import BOUNDARIES, bump_version
+from myapp.invalidation import suppress_invalidation
 
 class Command(BaseCommand):
     help = 'Corriger les noms des régions, départements et communes'
 
+    @suppress_invalidation()
     def handle(self, *args, **options):
         with transaction.atomic():
             # Corrections pour les régions
@@ -129,4 +132,5 @@ class Command(BaseCommand):
 
             self.stdout.write(self.style.SUCCESS('Correction des noms des départements terminée'))
 
+            bump_version(BOUNDARIES)
             self.stdout.write(self.style.SUCCESS('Correction des noms terminée')) 
\ No newline at end of file
@@ -0,0 +1,57 @@
+from django.core import serializers
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from myapp.models import DemographicData, EducationLevel
+
+class Command(BaseCommand):
+    help = ('Delete duplicate demographic rows (same census and zone), keeping the most recent one. '
+            'Required before migration 0021 when older imports created duplicates.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--backup', help='Write the deleted rows and their education levels to this fixture (loaddata format)')
+        parser.add_argument('--dry-run', action='store_true', help='Only list the duplicate rows')
+
+    def find_duplicates(self):
+        """{niveau: [pk]} des lignes à supprimer ; niveau déduit des liens (la colonne level peut être vide)"""
+        duplicates = {}
+        seen = set()
+        rows = DemographicData.objects.order_by('-pk').values_list(
+            'pk', 'census_id', *(f'{field}_id' for field in DemographicData.ZONE_FIELDS),
+        )
+        for pk, census_id, *zone_ids in rows:
+            links = [(field, zone_id) for field, zone_id in zip(DemographicData.ZONE_FIELDS, zone_ids) if zone_id]
+            if not links:
+                continue
+            # Zone la plus fine liée, comme DemographicData.get_level() ; la ligne la plus récente est gardée
+            key = (census_id, *links[-1])
+            if key in seen:
+                duplicates.setdefault(links[-1][0], []).append(pk)
+            seen.add(key)
+        return duplicates
+
+    def backup(self, path, pks):
+        objects = []
+        for model, lookup in ((DemographicData, 'pk__in'), (EducationLevel, 'demographic_data__in')):
+            for start in range(0, len(pks), 1000):
+                objects += model.objects.filter(**{lookup: pks[start:start + 1000]}).order_by('pk')
+        with open(path, 'w', encoding='utf-8') as f:
+            serializers.serialize('json', objects, stream=f, indent=2)
+        self.stdout.write(f'{len(pks)} rows saved to {path}')
+
+    def handle(self, *args, **options):
+        duplicates = self.find_duplicates()
+        if not duplicates:
+            self.stdout.write(self.style.SUCCESS('No duplicate demographic rows'))
+            return
+        for level, pks in duplicates.items():
+            self.stdout.write(f"{level}: {len(pks)} duplicate rows (pk {', '.join(map(str, sorted(pks)))})")
+        if options['dry_run']:
+            return
+
+        pks = sorted(pk for level_pks in duplicates.values() for pk in level_pks)
+        if options['backup']:
+            self.backup(options['backup'], pks)
+        with transaction.atomic():
+            for start in range(0, len(pks), 1000):
+                DemographicData.objects.filter(pk__in=pks[start:start + 1000]).delete()
+        self.stdout.write(self.style.SUCCESS(f'Successfully deleted {len(pks)} duplicate demographic rows'))
@@ -0,0 +1,82 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from myapp import synthetic
+from myapp.census_diff import consecutive_pairs, refresh_pair
+from myapp.models import Census, Commune, DemographicData
+from myapp.response_cache import clear_response_cache
+from myapp.tiles import clear_tile_cache
+from myapp.versioning import BOUNDARIES, bump_census_version, bump_version
+from myapp.invalidation import suppress_invalidation
+
+class Command(BaseCommand):
+    help = 'Generate synthetic censuses, demographic data, education levels and boundaries for load and scale testing'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=float, default=1, help='Commune count factor (10 = a 10x finer commune grid)')
+        parser.add_argument('--censuses', type=int, default=1, help='Number of censuses to generate')
+        parser.add_argument('--start-year', type=int, default=synthetic.BASE_YEAR, help='Year of the first census')
+        parser.add_argument('--step', type=int, default=1, help='Years between two censuses (1 = yearly)')
+        parser.add_argument('--projections-after', type=int, default=synthetic.BASE_YEAR,
+                            help='Censuses after this year are marked as projections')
+        parser.add_argument('--boundaries', choices=['grid', 'existing'], default='grid',
+                            help='grid: nested synthetic tiles over Mauritania; existing: subdivide the current communes')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed (same seed, same data)')
+        parser.add_argument('--batch-size', type=int, default=synthetic.BATCH_SIZE, help='Rows per bulk insert')
+        parser.add_argument('--no-rollup', action='store_true', help='Only generate commune rows')
+        parser.add_argument('--skip-diffs', action='store_true',
+                            help='Do not materialize census differences (run refresh_census_diffs later)')
+        parser.add_argument('--flush', action='store_true',
+                            help='Delete ALL existing censuses, demographic data and boundaries first')
+
+    @suppress_invalidation()
+    def handle(self, *args, **options):
+        if options['scale'] <= 0 or options['censuses'] < 1:
+            raise CommandError('--scale must be positive and --censuses at least 1')
+        if not options['flush'] and (Census.objects.exists() or Commune.objects.exists()):
+            raise CommandError('The database already contains data: use --flush to replace it')
+
+        layout = None
+        if options['boundaries'] == 'existing':
+            if not Commune.objects.exists():
+                raise CommandError('No boundaries to subdivide: import them first or use --boundaries grid')
+            layout = synthetic.existing_layout(options['scale'])
+
+        start = time.perf_counter()
+        if options['flush']:
+            synthetic.flush_data()
+            self.stdout.write(f'Existing data deleted in {time.perf_counter() - start:.1f}s')
+
+        def report(census):
+            rows = DemographicData.objects.filter(census=census).count()
+            elapsed = time.perf_counter() - start
+            self.stdout.write(f"{census.year}{' (projection)' if census.is_projection else ''}: {rows} rows ({elapsed:.1f}s)")
+
+        censuses = synthetic.create_dataset(
+            scale=options['scale'],
+            layout=layout,
+            years=synthetic.census_years(options['censuses'], options['start_year'], options['step']),
+            projections_after=options['projections_after'],
+            seed=options['seed'],
+            rollup=not options['no_rollup'],
+            batch_size=options['batch_size'],
+            report=report,
+        )
+
+        # Les pk peuvent être réutilisés après --flush : caches vidés en plus des versions
+        bump_version(BOUNDARIES)
+        bump_census_version(*censuses)
+        clear_response_cache()
+        clear_tile_cache()
+        if not options['skip_diffs']:
+            # Base vide au départ : chaque couple consécutif n'est calculé qu'une fois
+            for from_census, to_census in consecutive_pairs():
+                refresh_pair(from_census, to_census)
+            self.stdout.write(f'Census differences refreshed ({time.perf_counter() - start:.1f}s)')
+
+        total = DemographicData.objects.count()
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f'Successfully generated {len(censuses)} census(es), {Commune.objects.count()} communes '
+            f'and {total} demographic rows in {elapsed:.1f}s ({total / max(elapsed, 1e-9):.0f} rows/s)'
+        ))
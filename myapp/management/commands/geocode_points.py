@@ -0,0 +1,44 @@
+import sys
+from django.core.management.base import BaseCommand, CommandError
+from myapp import geocoding
+
+class Command(BaseCommand):
+    help = 'Assign commune, department and region pcodes to a CSV, XLSX or GeoJSON file of points'
+
+    def add_arguments(self, parser):
+        parser.add_argument('input_file', type=str, help='Points file (.csv, .xlsx, .geojson)')
+        parser.add_argument('--output', type=str, help='Output file (defaults to stdout)')
+        parser.add_argument('--format', choices=geocoding.FORMATS, help='Input format (guessed from the extension)')
+        parser.add_argument('--output-format', choices=geocoding.OUTPUT_FORMATS, default='csv')
+        parser.add_argument('--lat-column', type=str, help='Latitude column name')
+        parser.add_argument('--lon-column', type=str, help='Longitude column name')
+
+    def handle(self, *args, **options):
+        file_format = options['format'] or geocoding.detect_format(options['input_file'])
+        counts = {'total': 0, 'matched': 0}
+
+        def counted(rows):
+            for row in rows:
+                counts['total'] += 1
+                if row['adm3_pcode']:
+                    counts['matched'] += 1
+                yield row
+
+        output = open(options['output'], 'w', encoding='utf-8', newline='') if options['output'] else sys.stdout
+        try:
+            with open(options['input_file'], 'rb') as source:
+                headers, rows, lat_column, lon_column = geocoding.read_points(
+                    source, file_format, options['lat_column'], options['lon_column']
+                )
+                rows = counted(geocoding.geocode_rows(rows, lat_column, lon_column))
+                for chunk in geocoding.iter_output(headers, rows, options['output_format']):
+                    output.write(chunk)
+        except ValueError as e:
+            raise CommandError(str(e))
+        finally:
+            if options['output']:
+                output.close()
+
+        self.stderr.write(self.style.SUCCESS(
+            f"{counts['matched']} of {counts['total']} points matched to a commune"
+        ))
@@ -4,6 +4,9 @@ from django.db import transaction
 from myapp.models import Census, DemographicData, EducationLevel, Region, Department, Commune
 from decimal import Decimal
 from .demographic_data import DEMOGRAPHIC_DATA
+from myapp.versioning import bump_census_version
+from myapp.invalidation import suppress_invalidation
+from myapp.census_diff import refresh_for_census
 
 class Command(BaseCommand):
     help = 'Import demographic data from the 2023 census'
@@ -12,6 +15,7 @@ class Command(BaseCommand):
         parser.add_argument('--year', type=int, default=2023)
         parser.add_argument('--force', action='store_true', help='Force reimport by deleting existing data')
 
+    @suppress_invalidation()
     def handle(self, *args, **options):
         year = options['year']
         force = options['force']
@@ -96,6 +100,8 @@ class Command(BaseCommand):
                     except Exception as e:
                         self.stdout.write(self.style.ERROR(f'Error importing region {region_code}: {str(e)}'))
 
+                bump_census_version(census)
+                refresh_for_census(census)
                 self.stdout.write(self.style.SUCCESS('Successfully imported demographic data'))
 
         except Exception as e:
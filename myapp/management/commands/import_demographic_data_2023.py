@@ -2,10 +2,14 @@ from django.core.management.base import BaseCommand
 from django.db import transaction
 from myapp.models import Region, Department, Commune, Census, DemographicData, EducationLevel, Country
 from decimal import Decimal
+from myapp.versioning import bump_census_version
+from myapp.invalidation import suppress_invalidation
+from myapp.census_diff import refresh_for_census
 
 class Command(BaseCommand):
     help = 'Import demographic data from the 2023 census'
 
+    @suppress_invalidation()
     def handle(self, *args, **options):
         # Créer ou récupérer le recensement 2023
         census, created = Census.objects.get_or_create(
@@ -230,6 +234,8 @@ class Command(BaseCommand):
                 else:
                     self.stdout.write(self.style.WARNING(f'No data found for commune {commune.real_name}'))
 
+        bump_census_version(census)
+        refresh_for_census(census)
         self.stdout.write(self.style.SUCCESS('Successfully imported demographic data'))
 
     def get_region_data(self, region_code):
@@ -2,6 +2,9 @@ import pandas as pd
 from decimal import Decimal
 from django.core.management.base import BaseCommand
 from myapp.models import Census, DemographicData, EducationLevel, Region, Department, Commune
+from myapp.versioning import bump_census_version
+from myapp.invalidation import suppress_invalidation
+from myapp.census_diff import refresh_for_census
 
 class Command(BaseCommand):
     help = 'Import demographic data from Excel file'
@@ -10,6 +13,7 @@ class Command(BaseCommand):
         parser.add_argument('excel_file', type=str, help='Path to the Excel file')
         parser.add_argument('--year', type=int, default=2023, help='Census year')
 
+    @suppress_invalidation()
     def handle(self, *args, **options):
         excel_file = options['excel_file']
         year = options['year']
@@ -94,5 +98,8 @@ class Command(BaseCommand):
                         f'Error importing row {index}: {str(e)}\nRow data: {row.to_dict()}'
                     ))
 
+            bump_census_version(census)
+            refresh_for_census(census)
+
         except Exception as e:
             self.stdout.write(self.style.ERROR(f'Error reading Excel file: {str(e)}')) 
\ No newline at end of file
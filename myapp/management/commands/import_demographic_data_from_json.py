@@ -2,12 +2,16 @@ from django.core.management.base import BaseCommand
 from django.db import transaction
 from myapp.models import Region, Department, Commune, Census, DemographicData
 from decimal import Decimal
+from myapp.versioning import bump_census_version
+from myapp.invalidation import suppress_invalidation
+from myapp.census_diff import refresh_for_census
 import json
 import os
 
 class Command(BaseCommand):
     help = 'Import demographic data from JSON file'
 
+    @suppress_invalidation()
     def handle(self, *args, **options):
         # Chemin vers le fichier JSON
         json_file = os.path.join(os.path.dirname(__file__), 'demographic_data_structured.json')
@@ -88,4 +92,6 @@ class Command(BaseCommand):
                 except Exception as e:
                     self.stdout.write(self.style.ERROR(f'Error importing data for code {code}: {str(e)}'))
 
+        bump_census_version(census)
+        refresh_for_census(census)
         self.stdout.write(self.style.SUCCESS('Successfully imported all demographic data')) 
\ No newline at end of file
@@ -1,7 +1,10 @@
 import json
+from django.core.management import call_command
 from django.core.management.base import BaseCommand
 from django.db import transaction
 from myapp.models import Country, Region, Department, Commune
+from myapp.tiles import clear_tile_cache
+from myapp.invalidation import suppress_invalidation
 from datetime import datetime
 
 class Command(BaseCommand):
@@ -10,6 +13,7 @@ class Command(BaseCommand):
     def add_arguments(self, parser):
         parser.add_argument('geojson_file', type=str, help='mauritania_regions.geojson')
 
+    @suppress_invalidation()
     def handle(self, *args, **options):
         with open(options['geojson_file'], 'r', encoding='utf-8') as f:
             data = json.load(f)
@@ -83,4 +87,9 @@ class Command(BaseCommand):
                     }
                 )
 
-        self.stdout.write(self.style.SUCCESS('Successfully imported GeoJSON data'))
\ No newline at end of file
+        self.stdout.write(self.style.SUCCESS('Successfully imported GeoJSON data'))
+
+        # Régénérer les géométries simplifiées servies selon le niveau de zoom ; la commande
+        # incrémente la version des limites une fois les géométries simplifiées enregistrées
+        call_command('simplify_geometries', stdout=self.stdout)
+        clear_tile_cache()
\ No newline at end of file
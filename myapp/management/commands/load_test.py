@@ -0,0 +1,139 @@
+import http.client
+import itertools
+import json
+import os
+import shlex
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from myapp import loadtest
+
+class Command(BaseCommand):
+    help = 'Replay scripted or recorded map sessions against a local server and report latencies, errors and DB connections'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000', help='Base URL of the target server')
+        parser.add_argument('--start-server', action='store_true', help='Start a local server on --url for the run')
+        parser.add_argument('--server-command', help='Server command line (default: manage.py runserver --noreload)')
+        parser.add_argument('--concurrency', type=int, default=10, help='Number of simulated users')
+        parser.add_argument('--duration', type=float, help='Stop after this many seconds')
+        parser.add_argument('--sessions', type=int, help='Number of sessions to replay')
+        parser.add_argument('--replay', help='JSON lines file of recorded sessions (one session per line)')
+        parser.add_argument('--save-sessions', help='Write the scripted sessions to this file, then exit')
+        parser.add_argument('--think-factor', type=float, default=1.0, help='Multiplier of think times (0 = no pause)')
+        parser.add_argument('--export-all-ratio', type=float, default=0.05, help='Share of sessions downloading export-all-data')
+        parser.add_argument('--zone-export-ratio', type=float, default=0.3, help='Probability of a zone export after each action')
+        parser.add_argument('--seed', type=int, default=0, help='Seed of the scripted sessions')
+        parser.add_argument('--json', help='Also write the report to this JSON file')
+
+    def handle(self, *args, **options):
+        if not options['duration'] and not options['sessions'] and not options['replay']:
+            raise CommandError('Give --duration, --sessions or --replay')
+
+        server = self.start_server(options) if options['start_server'] else None
+        try:
+            sessions = self.get_sessions(options)
+            if options['save_sessions']:
+                loadtest.save_sessions(options['save_sessions'], list(sessions))
+                self.stdout.write(self.style.SUCCESS(f"Sessions written to {options['save_sessions']}"))
+                return
+
+            sampler = loadtest.ConnectionSampler()
+            sampler.start()
+            self.stdout.write(f"Running {options['concurrency']} users against {options['url']}...")
+            results = loadtest.run_load(
+                options['url'], sessions, concurrency=options['concurrency'],
+                duration=options['duration'], think_factor=options['think_factor'],
+            )
+            sampler.stop()
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait(timeout=10)
+
+        report = results.summary()
+        report['database_connections'] = sampler.summary()
+        self.print_report(report)
+        if options['json']:
+            with open(options['json'], 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+
+    def get_sessions(self, options):
+        if options['replay']:
+            sessions = loadtest.load_sessions(options['replay'])
+        else:
+            try:
+                catalog = loadtest.discover(options['url'])
+            except (OSError, RuntimeError) as e:
+                raise CommandError(f"Cannot read the API catalog from {options['url']}: {e}")
+            sessions = loadtest.scripted_sessions(
+                catalog, seed=options['seed'],
+                export_all_ratio=options['export_all_ratio'], zone_export_ratio=options['zone_export_ratio'],
+            )
+        if options['sessions']:
+            sessions = itertools.islice(sessions, options['sessions'])
+        elif options['save_sessions']:
+            raise CommandError('--save-sessions needs --sessions')
+        return sessions
+
+    def start_server(self, options):
+        address = options['url'].split('://', 1)[-1].rstrip('/')
+        command = shlex.split(options['server_command']) if options['server_command'] else [
+            sys.executable, os.path.join(settings.BASE_DIR, 'manage.py'), 'runserver', address, '--noreload',
+        ]
+        server = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        client = loadtest.HttpClient(options['url'], timeout=2)
+        for _ in range(60):
+            try:
+                status, _ = client.get(f'{loadtest.API_PREFIX}/census-years/')
+                if status == 200:
+                    client.close()
+                    self.stdout.write(f'Server started ({" ".join(command)})')
+                    return server
+            except (OSError, http.client.HTTPException):
+                client.close()
+            if server.poll() is not None:
+                break
+            time.sleep(0.5)
+        server.terminate()
+        raise CommandError(f'The server did not start: {" ".join(command)}')
+
+    def print_report(self, report):
+        self.stdout.write('')
+        self.stdout.write(
+            f"{report['sessions']} sessions, {report['requests']} requests in {report['duration_s']}s: "
+            f"{report['throughput_rps']} req/s, error rate {report['error_rate']:.2%}, "
+            f"p50 {report['p50_ms']} ms, p95 {report['p95_ms']} ms, p99 {report['p99_ms']} ms"
+        )
+        self.stdout.write(f"Status codes: {', '.join(f'{status}: {count}' for status, count in sorted(report['statuses'].items()))}")
+
+        header = f"{'endpoint':<20}{'requests':>9}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}{'avg KB':>10}{'wire KB':>10}"
+        self.stdout.write('')
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        for row in report['endpoints']:
+            line = (
+                f"{row['label']:<20}{row['requests']:>9}{row['errors']:>8}{row['p50_ms']:>10}"
+                f"{row['p95_ms']:>10}{row['p99_ms']:>10}{row['max_ms']:>10}{row['avg_kb']:>10}{row['avg_wire_kb']:>10}"
+            )
+            self.stdout.write(self.style.ERROR(line) if row['errors'] else line)
+
+        self.stdout.write('')
+        self.stdout.write('Latency histogram')
+        largest = max((count for _, count in report['histogram']), default=0) or 1
+        for bound, count in report['histogram']:
+            label = f'<= {bound} ms' if bound is not None else f'> {loadtest.HISTOGRAM_BUCKETS_MS[-1]} ms'
+            self.stdout.write(f"{label:>12} {'#' * round(40 * count / largest):<40} {count}")
+
+        connections = report['database_connections']
+        self.stdout.write('')
+        if connections:
+            self.stdout.write(
+                f"DB connections: max {connections['max_connections']} (avg {connections['avg_connections']}), "
+                f"active max {connections['max_active']} (avg {connections['avg_active']})"
+            )
+        else:
+            self.stdout.write('DB connections: not measurable on this database backend')
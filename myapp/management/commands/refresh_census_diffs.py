@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from myapp.census_diff import consecutive_pairs, refresh_pair
+
+class Command(BaseCommand):
+    help = 'Refresh the materialized per-zone differences between consecutive censuses'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Recompute pairs even if their data did not change')
+
+    def handle(self, *args, **options):
+        for from_census, to_census in consecutive_pairs():
+            count = refresh_pair(from_census, to_census, force=options['force'])
+            if count is None:
+                self.stdout.write(f'{from_census.year} -> {to_census.year}: up to date')
+            else:
+                self.stdout.write(f'{from_census.year} -> {to_census.year}: {count} zones')
+        self.stdout.write(self.style.SUCCESS('Successfully refreshed census differences'))
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+from myapp.models import Census
+from myapp.rollup import LEVELS, apply_rollup, compare_rollup, rollup_census
+from myapp.versioning import bump_census_version
+from myapp.invalidation import suppress_invalidation
+from myapp.census_diff import refresh_for_census
+
+class Command(BaseCommand):
+    help = 'Recompute department, region and country demographic data from commune rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--year', type=int, action='append', help='Census year (repeatable, default: all censuses)')
+        parser.add_argument('--levels', nargs='+', choices=LEVELS, default=list(LEVELS), help='Levels to recompute')
+        parser.add_argument('--dry-run', action='store_true', help='Only report differences with the stored rows')
+
+    @suppress_invalidation()
+    def handle(self, *args, **options):
+        censuses = Census.objects.all()
+        if options['year']:
+            censuses = censuses.filter(year__in=options['year'])
+            missing = set(options['year']) - set(censuses.values_list('year', flat=True))
+            if missing:
+                raise CommandError(f"Census not found for year(s): {', '.join(map(str, sorted(missing)))}")
+
+        for census in censuses:
+            rollups = rollup_census(census, options['levels'])
+            for level, differences in compare_rollup(census, rollups).items():
+                if differences:
+                    worst = ', '.join(f'{field} {delta:+.2f}' for field, delta in sorted(differences.items()))
+                    self.stdout.write(self.style.WARNING(f'{census.year} {level}: stored rows differ ({worst})'))
+
+            if options['dry_run']:
+                continue
+            for level, (created, updated) in apply_rollup(census, rollups).items():
+                self.stdout.write(f'{census.year} {level}: {created} created, {updated} updated')
+            bump_census_version(census)
+            refresh_for_census(census)
+
+        self.stdout.write(self.style.SUCCESS('Successfully rolled up demographic data'))
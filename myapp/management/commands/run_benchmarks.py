@@ -0,0 +1,89 @@
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+from myapp import benchmarks
+
+class Command(BaseCommand):
+    help = 'Benchmark the API, import and export hot paths on synthetic data and compare with a stored baseline'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scales', default='1,10', help='Comma-separated scale factors for communes and censuses (e.g. 1,10,100)')
+        parser.add_argument('--censuses', type=int, help='Number of censuses per scale (default: the scale factor)')
+        parser.add_argument('--repeat', type=int, default=3, help='Runs per case (the median is kept)')
+        parser.add_argument('--seed', type=int, default=0, help='Seed of the synthetic data')
+        parser.add_argument('--case', action='append', dest='cases', help='Only run this case (repeatable)')
+        parser.add_argument('--baseline', default=os.path.join(settings.BASE_DIR, 'benchmarks', 'baseline.json'),
+                            help='Baseline JSON file')
+        parser.add_argument('--save-baseline', action='store_true', help='Store the results as the new baseline')
+        parser.add_argument('--threshold', type=float, default=benchmarks.DEFAULT_THRESHOLD,
+                            help='Relative slowdown reported as a regression (0.25 = 25%%)')
+
+    def handle(self, *args, **options):
+        try:
+            scales = [float(scale) if '.' in scale else int(scale) for scale in options['scales'].split(',')]
+        except ValueError:
+            raise CommandError(f"Invalid --scales value: {options['scales']}")
+
+        # Base de test dédiée et caches isolés : les données réelles ne sont pas touchées
+        old_name = connection.settings_dict['NAME']
+        setup_test_environment()
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            with tempfile.TemporaryDirectory() as cache_dir, override_settings(
+                RESPONSE_CACHE_DIR=os.path.join(cache_dir, 'responses'),
+                TILE_CACHE_DIR=os.path.join(cache_dir, 'tiles'),
+                EXPORT_CACHE_DIR=os.path.join(cache_dir, 'exports'),
+                CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+            ):
+                try:
+                    results = benchmarks.run_benchmarks(
+                        scales, repeat=options['repeat'], censuses_per_scale=options['censuses'],
+                        seed=options['seed'], cases=options['cases'], report=self.stdout.write,
+                    )
+                except benchmarks.BenchmarkError as e:
+                    raise CommandError(str(e))
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        if options['save_baseline']:
+            benchmarks.save_baseline(options['baseline'], results)
+            self.stdout.write(self.style.SUCCESS(f"Baseline saved to {options['baseline']}"))
+            return
+
+        if not os.path.exists(options['baseline']):
+            self.stdout.write(self.style.WARNING(f"No baseline at {options['baseline']} (use --save-baseline)"))
+            return
+
+        baseline = benchmarks.load_baseline(options['baseline'])
+        current = benchmarks.environment()
+        differences = [
+            f"{key}: {baseline.get('environment', {}).get(key)} -> {current[key]}"
+            for key in ('database', 'machine', 'python', 'django')
+            if baseline.get('environment', {}).get(key) != current[key]
+        ]
+        if differences:
+            self.stdout.write(self.style.WARNING(
+                f"Baseline recorded in another environment ({', '.join(differences)}): "
+                "ratios are indicative only, re-record it with --save-baseline"
+            ))
+
+        rows = benchmarks.compare(results, baseline, options['threshold'])
+        header = f"{'case':<32}{'baseline':>12}{'current':>12}{'ratio':>8}"
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        for key, reference, current, ratio, regression in rows:
+            line = (
+                f"{key:<32}{'-' if reference is None else f'{reference * 1000:.1f} ms':>12}"
+                f"{current * 1000:>9.1f} ms{'-' if ratio is None else f'{ratio:.2f}x':>8}"
+            )
+            self.stdout.write(self.style.ERROR(line) if regression else line)
+
+        regressions = [row[0] for row in rows if row[4]]
+        if regressions:
+            raise CommandError(f"Performance regression (>{options['threshold']:.0%}): {', '.join(regressions)}")
+        self.stdout.write(self.style.SUCCESS('No regression'))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from myapp.geometry import RESOLUTIONS, rebuild_simplified_geometries
+from myapp.models import Region, Department, Commune
+from myapp.versioning import BOUNDARIES, bump_version
+
+class Command(BaseCommand):
+    help = 'Precompute simplified boundary geometries for each map resolution'
+
+    def handle(self, *args, **options):
+        for model in (Region, Department, Commune):
+            count = rebuild_simplified_geometries(model)
+            self.stdout.write(
+                f"{model._meta.verbose_name_plural}: {count} geometries simplified "
+                f"({', '.join(RESOLUTIONS)})"
+            )
+        bump_version(BOUNDARIES)
+        self.stdout.write(self.style.SUCCESS('Successfully simplified boundary geometries'))
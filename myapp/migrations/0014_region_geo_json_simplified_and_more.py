@@ -0,0 +1,28 @@
+# Generated by Django 5.2 on 2025-07-02 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0013_remove_dynamicdata_created_at_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='region',
+            name='geo_json_simplified',
+            field=models.JSONField(blank=True, default=dict, help_text='Simplified GeoJSON geometries keyed by resolution (low, medium, high)', verbose_name='Simplified Geometry Data'),
+        ),
+        migrations.AddField(
+            model_name='department',
+            name='geo_json_simplified',
+            field=models.JSONField(blank=True, default=dict, help_text='Simplified GeoJSON geometries keyed by resolution (low, medium, high)', verbose_name='Simplified Geometry Data'),
+        ),
+        migrations.AddField(
+            model_name='commune',
+            name='geo_json_simplified',
+            field=models.JSONField(blank=True, default=dict, help_text='Simplified GeoJSON geometries keyed by resolution (low, medium, high)', verbose_name='Simplified Geometry Data'),
+        ),
+    ]
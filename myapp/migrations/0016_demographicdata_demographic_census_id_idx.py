@@ -0,0 +1,17 @@
+# Generated by Django 5.2 on 2025-07-03 09:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0015_dataversion'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='demographicdata',
+            index=models.Index(fields=['census', 'id'], name='demographic_census_id_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2025-07-03 15:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0016_demographicdata_demographic_census_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='census',
+            name='data_version',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Version des données'),
+        ),
+        migrations.AddField(
+            model_name='census',
+            name='data_updated_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Données modifiées le'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2 on 2025-07-04 10:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0017_census_data_version_census_data_updated_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='region',
+            name='adm1_pcode',
+            field=models.CharField(db_index=True, max_length=10, verbose_name='Region Code'),
+        ),
+        migrations.AlterField(
+            model_name='department',
+            name='adm2_pcode',
+            field=models.CharField(db_index=True, max_length=10, verbose_name='Department Code'),
+        ),
+        migrations.AlterField(
+            model_name='commune',
+            name='adm3_pcode',
+            field=models.CharField(db_index=True, max_length=10, verbose_name='Commune Code'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2 on 2025-07-04 16:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0018_pcode_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CensusDiff',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('level', models.CharField(choices=[('country', 'Pays'), ('region', 'Région'), ('department', 'Département'), ('commune', 'Commune')], max_length=20, verbose_name='Niveau')),
+                ('zone_id', models.IntegerField(verbose_name='Zone')),
+                ('zone_pcode', models.CharField(max_length=10, verbose_name='Code de la zone')),
+                ('population_from', models.IntegerField(verbose_name='Population de départ')),
+                ('population_to', models.IntegerField(verbose_name="Population d'arrivée")),
+                ('population_change', models.IntegerField(verbose_name='Variation de population')),
+                ('growth_rate', models.FloatField(blank=True, null=True, verbose_name='Taux de croissance annuel moyen (%)')),
+                ('point_changes', models.JSONField(default=dict, verbose_name='Variations (points)')),
+                ('from_version', models.PositiveIntegerField(verbose_name='Version de départ')),
+                ('to_version', models.PositiveIntegerField(verbose_name="Version d'arrivée")),
+                ('from_census', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='diffs_from', to='myapp.census', verbose_name='Recensement de départ')),
+                ('to_census', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='diffs_to', to='myapp.census', verbose_name="Recensement d'arrivée")),
+            ],
+            options={
+                'verbose_name': 'Évolution intercensitaire',
+                'verbose_name_plural': 'Évolutions intercensitaires',
+                'unique_together': {('from_census', 'to_census', 'level', 'zone_id')},
+                'indexes': [models.Index(fields=['from_census', 'to_census', 'level', 'zone_pcode'], name='censusdiff_pair_zone_idx')],
+            },
+        ),
+    ]
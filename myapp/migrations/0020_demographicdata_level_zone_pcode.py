@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0019_censusdiff'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='demographicdata',
+            unique_together=set(),
+        ),
+        migrations.AddField(
+            model_name='demographicdata',
+            name='level',
+            field=models.CharField(choices=[('country', 'Pays'), ('region', 'Région'), ('department', 'Département'), ('commune', 'Commune')], default='', editable=False, max_length=20, verbose_name='Niveau'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='demographicdata',
+            name='zone_pcode',
+            field=models.CharField(default='', editable=False, max_length=10, verbose_name='Code de la zone'),
+            preserve_default=False,
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:55
+
+from django.db import IntegrityError, migrations
+from django.db.models import Count, F, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+
+# Niveau → (condition sur les liens, modèle de la zone, champ du code)
+LEVELS = {
+    'commune': (Q(commune__isnull=False), 'Commune', 'adm3_pcode'),
+    'department': (Q(department__isnull=False, commune__isnull=True), 'Department', 'adm2_pcode'),
+    'region': (Q(region__isnull=False, department__isnull=True, commune__isnull=True), 'Region', 'adm1_pcode'),
+    'country': (Q(region__isnull=True, department__isnull=True, commune__isnull=True), 'Country', 'code'),
+}
+
+
+def populate_levels(apps, schema_editor):
+    DemographicData = apps.get_model('myapp', 'DemographicData')
+    Census = apps.get_model('myapp', 'Census')
+
+    for level, (condition, model_name, field) in LEVELS.items():
+        zones = apps.get_model('myapp', model_name).objects.filter(pk=OuterRef(f'{level}_id')).values(field)[:1]
+        DemographicData.objects.filter(condition).update(
+            level=level, zone_pcode=Coalesce(Subquery(zones), Value('')),
+        )
+
+    # Doublons (recensement, zone) laissés passer par l'ancien unique_together : les contraintes de 0022
+    # échoueraient. Leur suppression est laissée à la commande dedupe_demographics, lancée explicitement.
+    duplicates = {}
+    for level in LEVELS:
+        rows = DemographicData.objects.filter(level=level).exclude(**{level: None})
+        count = rows.values('census', level).annotate(total=Count('pk')).filter(total__gt=1).count()
+        if count:
+            duplicates[level] = count
+    if duplicates:
+        raise IntegrityError(
+            "Lignes DemographicData en double (même recensement et même zone) : "
+            f"{', '.join(f'{level} : {count}' for level, count in duplicates.items())}. "
+            "Lancer « manage.py dedupe_demographics --backup <fichier.json> » puis relancer migrate."
+        )
+
+    # Nouveaux champs dans les réponses : les caches des versions précédentes ne doivent plus servir
+    Census.objects.update(data_version=F('data_version') + 1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0020_demographicdata_level_zone_pcode'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_levels, migrations.RunPython.noop),
+    ]
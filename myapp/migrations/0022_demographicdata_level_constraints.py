@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0021_populate_demographicdata_level'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='demographicdata',
+            index=models.Index(fields=['census', 'level', 'zone_pcode'], name='demographic_level_zone_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='demographicdata',
+            constraint=models.UniqueConstraint(condition=models.Q(('level', 'country')), fields=('census', 'country'), name='demographic_unique_country'),
+        ),
+        migrations.AddConstraint(
+            model_name='demographicdata',
+            constraint=models.UniqueConstraint(condition=models.Q(('level', 'region')), fields=('census', 'region'), name='demographic_unique_region'),
+        ),
+        migrations.AddConstraint(
+            model_name='demographicdata',
+            constraint=models.UniqueConstraint(condition=models.Q(('level', 'department')), fields=('census', 'department'), name='demographic_unique_department'),
+        ),
+        migrations.AddConstraint(
+            model_name='demographicdata',
+            constraint=models.UniqueConstraint(condition=models.Q(('level', 'commune')), fields=('census', 'commune'), name='demographic_unique_commune'),
+        ),
+    ]
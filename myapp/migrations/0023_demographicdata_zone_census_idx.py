@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0022_demographicdata_level_constraints'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='demographicdata',
+            index=models.Index(fields=['zone_pcode', 'census'], name='demographic_zone_census_idx'),
+        ),
+    ]
@@ -0,0 +1,206 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Case, F, JSONField, Value, When
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import http_date
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+
+from .geometry import FULL_RESOLUTION, parse_resolution
+from .versioning import BOUNDARIES, get_version_state, make_etag
+
+
+class ConditionalGetMixin:
+    """ETag / Last-Modified dérivés de la version des données
+
+    Les requêtes conditionnelles (If-None-Match / If-Modified-Since) reçoivent
+    un 304 après une seule lecture de la version, sans requête sur les données.
+    La vue déclare le jeu de données dans `data_version_scope` (clé de
+    DataVersion), ou redéfinit get_data_version() lorsqu'il dépend de la
+    requête (recensement demandé).
+    """
+    data_version_scope = None
+
+    def get_data_version(self):
+        """Retourne (jeu de données, version, date de modification) ou None"""
+        assert self.data_version_scope is not None, (
+            f"{type(self).__name__} doit définir data_version_scope ou redéfinir get_data_version()."
+        )
+        return (self.data_version_scope, *get_version_state(self.data_version_scope))
+
+    def conditional(self, handler, request, *args, **kwargs):
+        state = self.get_data_version()
+        if state is None:
+            return handler(request, *args, **kwargs)
+        scope, version, last_modified = state
+        etag = quote_etag(make_etag(scope, version, request.get_full_path(), request.accepted_renderer.format))
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+        response = get_conditional_response(request._request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = self.get_fresh_response(state, handler, request, *args, **kwargs)
+            if response.status_code == 200:
+                response['ETag'] = etag
+                if timestamp:
+                    response['Last-Modified'] = http_date(timestamp)
+        return response
+
+    def get_fresh_response(self, state, handler, request, *args, **kwargs):
+        """Réponse complète lorsque le client n'a pas la version courante"""
+        return handler(request, *args, **kwargs)
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional(super().retrieve, request, *args, **kwargs)
+
+
+class BoundaryVersionMixin(ConditionalGetMixin):
+    """Versionnage des vues de limites administratives (pays, régions, départements, communes)"""
+    data_version_scope = BOUNDARIES
+
+
+def parse_field_list(value):
+    """Découpe un paramètre de type 'a,b,c' en liste de noms de champs"""
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+MAX_BULK_PCODES = 1000
+
+
+def get_bulk_pcodes(request, limit=MAX_BULK_PCODES):
+    """Codes demandés : ?pcodes=a,b,c ou corps POST {"pcodes": [...]} (ou liste seule)"""
+    if request.method == 'POST':
+        data = request.data
+        pcodes = data.get('pcodes') if hasattr(data, 'get') else data
+        if isinstance(pcodes, str):
+            pcodes = parse_field_list(pcodes)
+    else:
+        pcodes = parse_field_list(request.query_params.get('pcodes', ''))
+    if not pcodes or not isinstance(pcodes, list) or not all(isinstance(pcode, str) for pcode in pcodes):
+        raise ValidationError({'pcodes': "Liste de codes requise (?pcodes=a,b ou {\"pcodes\": [...]})."})
+    if len(pcodes) > limit:
+        raise ValidationError({'pcodes': f"{limit} codes au maximum par requête."})
+    return list(dict.fromkeys(pcode.strip() for pcode in pcodes))
+
+
+class ReadRequestMixin:
+
+    def is_read_request(self):
+        """Requête de lecture : les paramètres de sélection de la chaîne de requête s'appliquent"""
+        return self.request is not None and self.request.method in ('GET', 'HEAD')
+
+
+class SparseFieldsetMixin(ReadRequestMixin):
+    """Sélection des champs via ?fields= / ?omit= ; seules les colonnes utiles sont lues en base"""
+
+    def get_field_selection(self):
+        if not hasattr(self, '_field_selection'):
+            fields = omit = None
+            if self.is_read_request():
+                params = self.request.query_params
+                fields = parse_field_list(params['fields']) if 'fields' in params else None
+                omit = parse_field_list(params.get('omit', '')) or None
+                available = set(self.get_serializer_class()().fields)
+                unknown = sorted((set(fields or []) | set(omit or [])) - available)
+                if unknown:
+                    raise ValidationError({
+                        'fields': f"Champs inconnus : {', '.join(unknown)}. "
+                                  f"Champs disponibles : {', '.join(sorted(available))}"
+                    })
+            self._field_selection = (fields, omit)
+        return self._field_selection
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        fields, omit = self.get_field_selection()
+        if fields is None and omit is None:
+            return queryset
+
+        serializer_fields = self.get_serializer_class()().fields
+        selected = [
+            name for name in serializer_fields
+            if (fields is None or name in fields) and name not in (omit or ())
+        ]
+        model = queryset.model
+        columns = {model._meta.pk.name}
+        for name in selected:
+            field = serializer_fields[name]
+            for source in getattr(field, 'source_fields', None) or (field.source,):
+                source = source.split('.')[0]
+                try:
+                    if model._meta.get_field(source).concrete:
+                        columns.add(source)
+                except FieldDoesNotExist:
+                    pass
+        return queryset.only(*columns)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['fields'], context['omit'] = self.get_field_selection()
+        return context
+
+
+class SimplifiedGeometryMixin(ReadRequestMixin):
+    """Sert les géométries simplifiées selon ?resolution= (low/medium/high/full) ou ?zoom="""
+
+    def get_resolution(self):
+        if not hasattr(self, '_resolution'):
+            try:
+                self._resolution = parse_resolution(
+                    self.request.query_params.get('resolution'),
+                    self.request.query_params.get('zoom'),
+                )
+            except ValueError as e:
+                raise ValidationError({'resolution': str(e)})
+        return self._resolution
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if not self.is_read_request():
+            return queryset
+        # Ne lire en base que la colonne géométrique réellement servie
+        resolution = self.get_resolution()
+        if resolution == FULL_RESOLUTION:
+            return queryset.defer('geo_json_simplified')
+        queryset = queryset.defer('geo_json')
+        if not self.serves_geometry():
+            return queryset
+        # Zones sans géométrie simplifiée à cette résolution : géométrie complète lue dans la même requête
+        return queryset.annotate(geo_json_fallback=Case(
+            When(geo_json_simplified__has_key=resolution, then=Value(None, output_field=JSONField())),
+            default=F('geo_json'),
+            output_field=JSONField(),
+        ))
+
+    def serves_geometry(self):
+        if not hasattr(self, 'get_field_selection'):
+            return True
+        fields, omit = self.get_field_selection()
+        return (fields is None or 'geo_json' in fields) and 'geo_json' not in (omit or ())
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.is_read_request():
+            context['resolution'] = self.get_resolution()
+        return context
+
+
+class PcodeLookupMixin:
+    """Recherche groupée par codes sur <liste>/bulk/ : GET ?pcodes=a,b ou POST {"pcodes": [...]}
+
+    Une seule requête IN sur la colonne indexée `pcode_field` ; ?fields=, ?omit=
+    et ?resolution= s'appliquent comme sur la liste.
+    """
+    pcode_field = None
+
+    def is_read_request(self):
+        return getattr(self, 'action', None) == 'bulk' or super().is_read_request()
+
+    @action(detail=False, methods=['get', 'post'], permission_classes=[AllowAny])
+    def bulk(self, request):
+        pcodes = get_bulk_pcodes(request)
+        queryset = self.filter_queryset(self.get_queryset()).filter(**{f'{self.pcode_field}__in': pcodes})
+        return Response(self.get_serializer(queryset, many=True).data)
+
@@ -38,11 +38,17 @@ class Region(models.Model):
     adm0_en = models.CharField(max_length=100, verbose_name="Country Name")
     adm0_pcode = models.CharField(max_length=10, verbose_name="Country Code")
     adm1_en = models.CharField(max_length=100, verbose_name="Region Name")
-    adm1_pcode = models.CharField(max_length=10, verbose_name="Region Code")
+    adm1_pcode = models.CharField(max_length=10, db_index=True, verbose_name="Region Code")
     geo_json = models.JSONField(
         verbose_name="Geometry Data",
         help_text="GeoJSON MultiPolygon format"
     )
+    geo_json_simplified = models.JSONField(
+        verbose_name="Simplified Geometry Data",
+        default=dict,
+        blank=True,
+        help_text="Simplified GeoJSON geometries keyed by resolution (low, medium, high)"
+    )
     date = models.DateField(verbose_name="Date of data")
     valid_on = models.DateField(verbose_name="Valid from")
     valid_to = models.DateField(null=True, blank=True, verbose_name="Valid to")
@@ -67,11 +73,17 @@ class Department(models.Model):
     """Modèle pour les départements administratifs de niveau 2 (ADM2)"""
     region = models.ForeignKey(Region, on_delete=models.CASCADE, related_name='departments')
     adm2_en = models.CharField(max_length=100, verbose_name="Department Name")
-    adm2_pcode = models.CharField(max_length=10, verbose_name="Department Code")
+    adm2_pcode = models.CharField(max_length=10, db_index=True, verbose_name="Department Code")
     geo_json = models.JSONField(
         verbose_name="Geometry Data",
         help_text="GeoJSON MultiPolygon format"
     )
+    geo_json_simplified = models.JSONField(
+        verbose_name="Simplified Geometry Data",
+        default=dict,
+        blank=True,
+        help_text="Simplified GeoJSON geometries keyed by resolution (low, medium, high)"
+    )
     date = models.DateField(verbose_name="Date of data")
     valid_on = models.DateField(verbose_name="Valid from")
     valid_to = models.DateField(null=True, blank=True, verbose_name="Valid to")
@@ -89,13 +101,19 @@ class Commune(models.Model):
     """Modèle pour les communes administratives de niveau 3 (ADM3)"""
     department = models.ForeignKey(Department, on_delete=models.CASCADE, related_name='communes')
     adm3_en = models.CharField(max_length=100, verbose_name="Commune Name")
-    adm3_pcode = models.CharField(max_length=10, verbose_name="Commune Code")
+    adm3_pcode = models.CharField(max_length=10, db_index=True, verbose_name="Commune Code")
     adm3_ref = models.CharField(max_length=100, null=True, blank=True, verbose_name="Commune Reference")
     real_name = models.CharField(max_length=100, verbose_name="Real Name")
     geo_json = models.JSONField(
         verbose_name="Geometry Data",
         help_text="GeoJSON MultiPolygon format"
     )
+    geo_json_simplified = models.JSONField(
+        verbose_name="Simplified Geometry Data",
+        default=dict,
+        blank=True,
+        help_text="Simplified GeoJSON geometries keyed by resolution (low, medium, high)"
+    )
     date = models.DateField(verbose_name="Date of data")
     valid_on = models.DateField(verbose_name="Valid from")
     valid_to = models.DateField(null=True, blank=True, verbose_name="Valid to")
@@ -134,6 +152,9 @@ class Census(models.Model):
     """Données de recensement"""
     year = models.IntegerField(verbose_name="Année")
     is_projection = models.BooleanField(default=False, verbose_name="Est une projection")
+    # Incrémentée à chaque import/modification des données du recensement (ETag, caches)
+    data_version = models.PositiveIntegerField(default=0, editable=False, verbose_name="Version des données")
+    data_updated_at = models.DateTimeField(null=True, blank=True, editable=False, verbose_name="Données modifiées le")
     
     class Meta:
         verbose_name = "Recensement"
@@ -145,12 +166,26 @@ class Census(models.Model):
 
 class DemographicData(models.Model):
     """Données démographiques par zone administrative"""
+    LEVEL_CHOICES = [
+        ('country', 'Pays'),
+        ('region', 'Région'),
+        ('department', 'Département'),
+        ('commune', 'Commune'),
+    ]
+    # Liens vers les zones, du plus large au plus fin
+    ZONE_FIELDS = ('country', 'region', 'department', 'commune')
+    # Champ du code de la zone sur le modèle de chaque niveau
+    ZONE_PCODE_FIELDS = {'country': 'code', 'region': 'adm1_pcode', 'department': 'adm2_pcode', 'commune': 'adm3_pcode'}
+
     census = models.ForeignKey(Census, on_delete=models.CASCADE, verbose_name="Recensement")
     # Liens vers les différents niveaux administratifs (un seul sera non-null)
     country = models.ForeignKey(Country, null=True, blank=True, on_delete=models.CASCADE, verbose_name="Pays")
     region = models.ForeignKey(Region, null=True, blank=True, on_delete=models.CASCADE, verbose_name="Région")
     department = models.ForeignKey(Department, null=True, blank=True, on_delete=models.CASCADE, verbose_name="Département")
     commune = models.ForeignKey(Commune, null=True, blank=True, on_delete=models.CASCADE, verbose_name="Commune")
+    # Niveau et code de la zone, déduits des liens ci-dessus à l'enregistrement (voir set_zone)
+    level = models.CharField(max_length=20, choices=LEVEL_CHOICES, editable=False, verbose_name="Niveau")
+    zone_pcode = models.CharField(max_length=10, editable=False, verbose_name="Code de la zone")
     
     # Données démographiques
     total_population = models.IntegerField(verbose_name="Population totale")
@@ -175,9 +210,76 @@ class DemographicData(models.Model):
     class Meta:
         verbose_name = "Données démographiques"
         verbose_name_plural = "Données démographiques"
-        unique_together = [
-            ('census', 'country', 'region', 'department', 'commune')
+        # Une ligne par zone et par recensement : index uniques partiels par niveau
+        # (un unique_together sur les quatre liens n'empêche rien, NULL n'étant jamais égal à NULL)
+        constraints = [
+            models.UniqueConstraint(
+                fields=['census', level], condition=models.Q(level=level), name=f'demographic_unique_{level}',
+            )
+            for level in ('country', 'region', 'department', 'commune')
         ]
+        indexes = [
+            # Pagination par curseur des données d'un recensement (WHERE census_id = … ORDER BY id)
+            models.Index(fields=['census', 'id'], name='demographic_census_id_idx'),
+            # Toutes les zones d'un niveau, ou une zone par son code, pour un recensement
+            models.Index(fields=['census', 'level', 'zone_pcode'], name='demographic_level_zone_idx'),
+            # Zones désignées par leurs codes, tous niveaux et tous recensements (séries, lots)
+            models.Index(fields=['zone_pcode', 'census'], name='demographic_zone_census_idx'),
+        ]
+
+    def get_level(self):
+        if self.commune_id:
+            return 'commune'
+        if self.department_id:
+            return 'department'
+        if self.region_id:
+            return 'region'
+        return 'country'
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_zone = instance.get_zone_ids()
+        return instance
+
+    def get_zone_ids(self):
+        """Clés des zones liées, None si l'une d'elles n'a pas été chargée (only/defer)"""
+        attnames = [f'{field}_id' for field in self.ZONE_FIELDS]
+        if any(attname not in self.__dict__ for attname in attnames):
+            return None
+        return tuple(self.__dict__[attname] for attname in attnames)
+
+    def set_zone(self):
+        """Renseigne level et zone_pcode d'après la zone la plus fine liée
+
+        Sans requête si les liens n'ont pas changé depuis le chargement (les
+        renommages de codes sont reportés par le signal sync_zone_pcode) ou si
+        la zone liée est déjà chargée ; sinon, lecture du seul code de la zone.
+        """
+        zone_ids = self.get_zone_ids()
+        if zone_ids is not None and zone_ids == getattr(self, '_loaded_zone', None) and self.level:
+            return
+        self.level = self.get_level()
+        field = self._meta.get_field(self.level)
+        pcode_field = self.ZONE_PCODE_FIELDS[self.level]
+        zone_id = getattr(self, field.attname)
+        if zone_id is None:
+            self.zone_pcode = ''
+        elif field.is_cached(self):
+            self.zone_pcode = getattr(getattr(self, self.level), pcode_field)
+        else:
+            pcodes = field.related_model.objects.filter(pk=zone_id).values_list(pcode_field, flat=True)
+            self.zone_pcode = pcodes.first() or ''
+
+    def save(self, *args, **kwargs):
+        # bulk_create et update() ne passent pas ici : renseigner level et zone_pcode soi-même
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or set(self.ZONE_FIELDS) & set(update_fields):
+            self.set_zone()
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'level', 'zone_pcode'}
+        super().save(*args, **kwargs)
+        self._loaded_zone = self.get_zone_ids()
 
     def __str__(self):
         if self.country:
@@ -204,4 +306,47 @@ class EducationLevel(models.Model):
         verbose_name_plural = "Niveaux d'éducation"
 
     def __str__(self):
-        return f"Niveaux d'éducation - {self.demographic_data}"
\ No newline at end of file
+        return f"Niveaux d'éducation - {self.demographic_data}"
+
+class DataVersion(models.Model):
+    """Version des données, incrémentée à chaque modification pour invalider les caches"""
+    key = models.CharField(max_length=50, unique=True, verbose_name="Clé")
+    version = models.PositiveIntegerField(default=0, verbose_name="Version")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Mis à jour le")
+
+    class Meta:
+        verbose_name = "Version des données"
+        verbose_name_plural = "Versions des données"
+
+    def __str__(self):
+        return f"{self.key} (v{self.version})"
+
+class CensusDiff(models.Model):
+    """Évolution d'une zone entre deux recensements (table matérialisée, voir census_diff.py)"""
+    LEVEL_CHOICES = DemographicData.LEVEL_CHOICES
+    from_census = models.ForeignKey(Census, on_delete=models.CASCADE, related_name='diffs_from', verbose_name="Recensement de départ")
+    to_census = models.ForeignKey(Census, on_delete=models.CASCADE, related_name='diffs_to', verbose_name="Recensement d'arrivée")
+    level = models.CharField(max_length=20, choices=LEVEL_CHOICES, verbose_name="Niveau")
+    zone_id = models.IntegerField(verbose_name="Zone")
+    zone_pcode = models.CharField(max_length=10, verbose_name="Code de la zone")
+    population_from = models.IntegerField(verbose_name="Population de départ")
+    population_to = models.IntegerField(verbose_name="Population d'arrivée")
+    population_change = models.IntegerField(verbose_name="Variation de population")
+    growth_rate = models.FloatField(null=True, blank=True, verbose_name="Taux de croissance annuel moyen (%)")
+    # Variations en points de pourcentage des taux et pourcentages
+    point_changes = models.JSONField(default=dict, verbose_name="Variations (points)")
+    # Versions des données des deux recensements au moment du calcul
+    from_version = models.PositiveIntegerField(verbose_name="Version de départ")
+    to_version = models.PositiveIntegerField(verbose_name="Version d'arrivée")
+
+    class Meta:
+        verbose_name = "Évolution intercensitaire"
+        verbose_name_plural = "Évolutions intercensitaires"
+        unique_together = [('from_census', 'to_census', 'level', 'zone_id')]
+        indexes = [
+            models.Index(fields=['from_census', 'to_census', 'level', 'zone_pcode'], name='censusdiff_pair_zone_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.zone_pcode} {self.from_census.year} → {self.to_census.year}"
+
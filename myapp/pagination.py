@@ -0,0 +1,58 @@
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from rest_framework.pagination import CursorPagination
+
+from .renderers import dumps
+
+# Paramètre activant le mode « tout en flux » (?stream=1) sur les listes
+STREAM_PARAM = 'stream'
+
+
+class KeysetPagination(CursorPagination):
+    """Pagination par curseur sur la clé primaire : le coût d'une page reste
+    constant quelle que soit la profondeur de lecture (WHERE id > … LIMIT n)"""
+    ordering = 'id'
+    page_size_query_param = 'page_size'
+    max_page_size = getattr(settings, 'API_MAX_PAGE_SIZE', 1000)
+    # Formats qui ont besoin de la collection complète (une topologie ne se découpe pas)
+    unpaginated_formats = ('topojson',)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        renderer = getattr(request, 'accepted_renderer', None)
+        if renderer is not None and renderer.format in self.unpaginated_formats:
+            return None
+        return super().paginate_queryset(queryset, request, view)
+
+
+def wants_stream(request):
+    return request.query_params.get(STREAM_PARAM, '').lower() in ('1', 'true', 'yes')
+
+
+class StreamingListMixin:
+    """Mode opt-in ?stream=1 : toutes les lignes, lues par paquets via un curseur
+    serveur et envoyées au fil de l'eau dans un tableau JSON non paginé"""
+    stream_chunk_size = 2000
+
+    def list(self, request, *args, **kwargs):
+        if not wants_stream(request) or request.accepted_renderer.format != 'json':
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset()).order_by('pk')
+        return StreamingHttpResponse(self.stream_rows(queryset), content_type='application/json')
+
+    def stream_rows(self, queryset):
+        yield b'['
+        separator = b''
+        chunk = []
+        for instance in queryset.iterator(chunk_size=self.stream_chunk_size):
+            chunk.append(instance)
+            if len(chunk) >= self.stream_chunk_size:
+                yield separator + self.encode_chunk(chunk)
+                separator, chunk = b',', []
+        if chunk:
+            yield separator + self.encode_chunk(chunk)
+        yield b']'
+
+    def encode_chunk(self, instances):
+        data = self.get_serializer(instances, many=True).data
+        # Le tableau est encodé d'un bloc, sans ses crochets
+        return dumps(data)[1:-1]
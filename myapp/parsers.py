@@ -0,0 +1,23 @@
+from django.conf import settings
+from rest_framework import parsers
+from rest_framework.exceptions import ParseError
+
+
+class FastJSONParser(parsers.JSONParser):
+    """JSONParser s'appuyant sur orjson ; sans orjson, analyse identique à JSONParser"""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            import orjson
+        except ImportError:
+            return super().parse(stream, media_type, parser_context)
+
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        data = stream.read() if stream is not None else b''
+        if encoding.lower().replace('-', '') != 'utf8':
+            data = data.decode(encoding).encode('utf-8')
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
@@ -0,0 +1,40 @@
+"""Classement des zones d'un niveau administratif selon un indicateur"""
+from .models import DemographicData
+from .tiles import LEVELS
+
+ORDERS = ('desc', 'asc')
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 1000
+
+
+def rank_zones(level, census, indicator, descending=True, limit=DEFAULT_LIMIT):
+    """[(pcode, nom, valeur)] triés par valeur, zones sans valeur exclues (ex aequo par pcode)"""
+    config = LEVELS[level]
+    pcode, name = f"{level}__{config['pcode']}", f"{level}__{config['name']}"
+    queryset = DemographicData.objects.filter(census=census, level=level).exclude(
+        **{f'{indicator}__isnull': True}
+    )
+    queryset = queryset.order_by(f'-{indicator}' if descending else indicator, pcode)
+    return [
+        (code, label, value if isinstance(value, int) else float(value))
+        for code, label, value in queryset.values_list(pcode, name, indicator)[:limit]
+    ]
+
+
+def build_ranking(level, census, indicator, order='desc', limit=DEFAULT_LIMIT, snapshot=None):
+    """Classement lu dans `snapshot` (instantané du recensement) s'il est fourni, sinon en base"""
+    descending = order == 'desc'
+    if snapshot is not None:
+        zones = snapshot.ranking(level, indicator, descending, limit)
+    else:
+        zones = rank_zones(level, census, indicator, descending, limit)
+    return {
+        'level': level,
+        'year': census.year,
+        'indicator': indicator,
+        'order': order,
+        'zones': [
+            {'rank': rank, 'pcode': code, 'name': label, 'value': value}
+            for rank, (code, label, value) in enumerate(zones, start=1)
+        ],
+    }
@@ -0,0 +1,84 @@
+import json
+
+from django.core.cache import cache
+from rest_framework import renderers
+from rest_framework.utils.encoders import JSONEncoder
+
+from .topojson import encode_topology
+from .versioning import BOUNDARIES, get_version
+
+
+def boundary_topology_cache_key(*parts):
+    """Clé de cache d'une topologie encodée, liée à la version des limites"""
+    return ':'.join(['topojson', str(get_version(BOUNDARIES))] + [str(part) for part in parts])
+
+
+def _default(obj):
+    # Decimal, chaînes traduites, QuerySet… : même conversion que l'encodeur de DRF
+    return JSONEncoder().default(obj)
+
+
+def dumps(data, indent=None):
+    """Sérialise en JSON (octets UTF-8) avec orjson s'il est installé"""
+    try:
+        import orjson
+    except ImportError:
+        return json.dumps(
+            data, cls=JSONEncoder, indent=indent, ensure_ascii=False,
+            separators=None if indent else (',', ':'),
+        ).encode('utf-8')
+    option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+    return orjson.dumps(data, default=_default, option=option)
+
+
+class FastJSONRenderer(renderers.JSONRenderer):
+    """JSONRenderer s'appuyant sur orjson (dates, UUID natifs ; Decimal via l'encodeur DRF)
+
+    Sans orjson, le rendu est celui de JSONRenderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        try:
+            import orjson  # noqa: F401
+        except ImportError:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+        indent = self.get_indent(accepted_media_type or '', renderer_context or {})
+        return dumps(data, indent=indent)
+
+
+class TopoJSONRenderer(renderers.BaseRenderer):
+    """Rendu TopoJSON (?format=topojson) des listes de zones administratives
+
+    Chaque élément sérialisé devient une géométrie dont les propriétés sont les
+    autres champs ; les frontières partagées ne sont encodées qu'une fois.
+    """
+    media_type = 'application/json'
+    format = 'topojson'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        renderer_context = renderer_context or {}
+        response = renderer_context.get('response')
+        if response is not None and response.exception:
+            return renderers.JSONRenderer().render(data, accepted_media_type, renderer_context)
+
+        view = renderer_context.get('view')
+        request = renderer_context.get('request')
+        key = boundary_topology_cache_key(request.get_full_path()) if request is not None else None
+        if key:
+            content = cache.get(key)
+            if content is not None:
+                return content
+
+        items = data if isinstance(data, list) else [data]
+        features = []
+        for item in items:
+            properties = {field: value for field, value in item.items() if field != 'geo_json'}
+            features.append((properties, item.get('geo_json') or {}))
+        name = getattr(view, 'topology_object', 'features')
+        content = dumps(encode_topology({name: features}))
+        if key:
+            cache.set(key, content)
+        return content
@@ -38,7 +38,8 @@ class DemographicDataResource(resources.ModelResource):
         skip_unchanged = True
         report_skipped = True
         import_id_fields = ('census', 'country', 'region', 'department', 'commune')
-        exclude = ('id',)
+        # level et zone_pcode sont déduits des liens à l'enregistrement
+        exclude = ('id', 'level', 'zone_pcode')
 
     def before_import_row(self, row, **kwargs):
         print(f"DEBUG: Row in before_import_row (DemographicDataResource): {row}")
@@ -0,0 +1,447 @@
+"""Cache de réponses pré-sérialisées et pré-compressées (identité, gzip, brotli)
+
+Les corps sont rangés par jeu de données et par version : une clé contient la
+version des données, l'URL complète (requête incluse) et le format de rendu.
+Une entrée n'est donc jamais invalidée explicitement ; les versions périmées
+sont supprimées lors de l'écriture de la suivante.
+
+Deux stockages : fichiers sur disque (servis avec FileResponse, donc sendfile
+lorsque le serveur WSGI le permet) ou mémoire du processus (LRU borné en octets).
+
+Au premier accès, les variantes sont compressées à un niveau rapide (gzip 6,
+brotli RESPONSE_CACHE_BROTLI_QUALITY) ; la variante brotli est ensuite
+recompressée au niveau maximal (RESPONSE_CACHE_BROTLI_UPGRADE_QUALITY) par un
+thread d'arrière-plan, puis substituée dans le stockage.
+
+Les listes en flux (?stream=1) sont compressées et écrites morceau par morceau
+pendant leur envoi : la mémoire reste constante, et l'entrée n'est enregistrée
+que si le flux va jusqu'au bout (pas de recompression brotli pour ces entrées).
+"""
+import gzip
+import os
+import re
+import shutil
+import threading
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.http import FileResponse, HttpResponse
+from django.utils.cache import patch_vary_headers
+
+from .instrumentation import serialization_timer
+from .versioning import make_etag
+
+IDENTITY = 'identity'
+GZIP = 'gzip'
+BROTLI = 'br'
+EXTENSIONS = {IDENTITY: 'body', GZIP: 'gz', BROTLI: 'br'}
+CACHEABLE_FORMATS = ('json', 'topojson')
+GZIP_LEVEL = 6
+
+
+def brotli_available():
+    try:
+        import brotli  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def brotli_quality():
+    return getattr(settings, 'RESPONSE_CACHE_BROTLI_QUALITY', 5)
+
+
+def brotli_upgrade_quality():
+    """Niveau de la recompression brotli en arrière-plan (None : pas de recompression)"""
+    quality = getattr(settings, 'RESPONSE_CACHE_BROTLI_UPGRADE_QUALITY', 11)
+    return quality if quality and quality > brotli_quality() else None
+
+
+def compress(content):
+    """Variantes du corps : {encodage: octets}, aux niveaux rapides (calculées pendant la requête)"""
+    variants = {IDENTITY: content, GZIP: gzip.compress(content, compresslevel=GZIP_LEVEL, mtime=0)}
+    if brotli_available():
+        import brotli
+
+        variants[BROTLI] = brotli.compress(content, quality=brotli_quality())
+    return variants
+
+
+class StreamCompressor:
+    """Compression incrémentale des variantes d'un corps en flux (mêmes niveaux que compress())"""
+
+    def __init__(self):
+        self.gzip = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        self.brotli = None
+        if brotli_available():
+            import brotli
+
+            self.brotli = brotli.Compressor(quality=brotli_quality())
+
+    def process(self, chunk):
+        """{encodage: octets} à ajouter à chaque variante pour ce morceau"""
+        parts = {IDENTITY: chunk, GZIP: self.gzip.compress(chunk)}
+        if self.brotli is not None:
+            parts[BROTLI] = self.brotli.process(chunk)
+        return parts
+
+    def finish(self):
+        parts = {IDENTITY: b'', GZIP: self.gzip.flush()}
+        if self.brotli is not None:
+            parts[BROTLI] = self.brotli.finish()
+        return parts
+
+
+def choose_encoding(request, encodings):
+    """Meilleur encodage accepté par le client parmi ceux disponibles"""
+    accepted = {
+        part.split(';')[0].strip().lower()
+        for part in request.META.get('HTTP_ACCEPT_ENCODING', '').split(',')
+        if not re.search(r';\s*q=0(\.0*)?\s*$', part)
+    }
+    for encoding in (BROTLI, GZIP):
+        if encoding in encodings and encoding in accepted:
+            return encoding
+    return IDENTITY
+
+
+def _scope_name(scope):
+    return re.sub(r'[^A-Za-z0-9_-]', '-', str(scope))
+
+
+class FileResponseStore:
+    """Corps compressés rangés sous <racine>/<jeu de données>/v<version>/"""
+
+    def __init__(self, root=None):
+        self.root = root or getattr(
+            settings, 'RESPONSE_CACHE_DIR', os.path.join(settings.BASE_DIR, 'cache', 'responses')
+        )
+
+    def _path(self, scope, version, key, encoding):
+        return os.path.join(self.root, _scope_name(scope), f'v{version}', f'{key}.{EXTENSIONS[encoding]}')
+
+    def encodings(self, scope, version, key):
+        return [
+            encoding for encoding in EXTENSIONS
+            if os.path.exists(self._path(scope, version, key, encoding))
+        ]
+
+    def open(self, scope, version, key, encoding):
+        try:
+            return open(self._path(scope, version, key, encoding), 'rb')
+        except FileNotFoundError:
+            return None
+
+    def set(self, scope, version, key, variants):
+        directory = os.path.dirname(self._path(scope, version, key, IDENTITY))
+        os.makedirs(directory, exist_ok=True)
+        suffix = f'{os.getpid()}.{threading.get_ident()}.tmp'
+        # Le corps non compressé est écrit en dernier : sa présence signale une entrée complète
+        for encoding in sorted(variants, key=lambda e: e == IDENTITY):
+            path = self._path(scope, version, key, encoding)
+            with open(f'{path}.{suffix}', 'wb') as f:
+                f.write(variants[encoding])
+            os.replace(f'{path}.{suffix}', path)
+        self._prune(scope, version)
+
+    def writer(self, scope, version, key):
+        return _FileEntryWriter(self, scope, version, key)
+
+    def replace(self, scope, version, key, encoding, body):
+        """Remplace une variante d'une entrée encore présente (sinon ne fait rien)"""
+        path = self._path(scope, version, key, encoding)
+        if not os.path.exists(self._path(scope, version, key, IDENTITY)):
+            return
+        temporary = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            with open(temporary, 'wb') as f:
+                f.write(body)
+            os.replace(temporary, path)
+        except OSError:
+            # Version supprimée entre-temps par l'écriture de la suivante
+            if os.path.exists(temporary):
+                os.remove(temporary)
+
+    def _prune(self, scope, version):
+        scope_dir = os.path.join(self.root, _scope_name(scope))
+        for name in os.listdir(scope_dir):
+            if name != f'v{version}':
+                shutil.rmtree(os.path.join(scope_dir, name), ignore_errors=True)
+
+    def clear(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+
+class _FileEntryWriter:
+    """Entrée écrite au fil de l'eau dans des fichiers temporaires, renommés à la validation"""
+
+    def __init__(self, store, scope, version, key):
+        self.store = store
+        self.entry = (scope, version, key)
+        self.suffix = f'{os.getpid()}.{threading.get_ident()}.tmp'
+        self.files = {}
+
+    def _temporary(self, encoding):
+        return f'{self.store._path(*self.entry, encoding)}.{self.suffix}'
+
+    def write(self, parts):
+        if self.files is None:
+            return
+        try:
+            for encoding, data in parts.items():
+                if encoding not in self.files:
+                    os.makedirs(os.path.dirname(self._temporary(encoding)), exist_ok=True)
+                    self.files[encoding] = open(self._temporary(encoding), 'wb')
+                self.files[encoding].write(data)
+        except OSError:
+            # Disque plein, version supprimée entre-temps… : la réponse continue, sans cache
+            self.abort()
+
+    def commit(self):
+        if self.files is None:
+            return
+        for f in self.files.values():
+            f.close()
+        try:
+            # Le corps non compressé est renommé en dernier : sa présence signale une entrée complète
+            for encoding in sorted(self.files, key=lambda e: e == IDENTITY):
+                os.replace(self._temporary(encoding), self.store._path(*self.entry, encoding))
+        except OSError:
+            self.abort()
+            return
+        self.files = None
+        self.store._prune(*self.entry[:2])
+
+    def abort(self):
+        for encoding, f in (self.files or {}).items():
+            f.close()
+            if os.path.exists(self._temporary(encoding)):
+                os.remove(self._temporary(encoding))
+        self.files = None
+
+
+class MemoryResponseStore:
+    """Corps compressés en mémoire du processus, évincés du plus ancien au plus récent"""
+
+    def __init__(self, max_bytes=None):
+        self.max_bytes = max_bytes or getattr(settings, 'RESPONSE_CACHE_MAX_BYTES', 256 * 1024 * 1024)
+        self.entries = OrderedDict()
+        self.size = 0
+        self.lock = threading.Lock()
+
+    def _get(self, scope, version, key):
+        with self.lock:
+            entry = self.entries.get((scope, version, key))
+            if entry is not None:
+                self.entries.move_to_end((scope, version, key))
+            return entry
+
+    def encodings(self, scope, version, key):
+        return list(self._get(scope, version, key) or ())
+
+    def open(self, scope, version, key, encoding):
+        entry = self._get(scope, version, key)
+        return entry.get(encoding) if entry else None
+
+    def set(self, scope, version, key, variants):
+        entry_size = sum(len(body) for body in variants.values())
+        if entry_size > self.max_bytes:
+            return
+        with self.lock:
+            # Les entrées d'une version précédente du même jeu de données ne serviront plus
+            for stale in [k for k in self.entries if k[0] == scope and k[1] != version]:
+                self.size -= sum(len(body) for body in self.entries.pop(stale).values())
+            previous = self.entries.pop((scope, version, key), None)
+            if previous:
+                self.size -= sum(len(body) for body in previous.values())
+            self.entries[(scope, version, key)] = variants
+            self.size += entry_size
+            while self.size > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= sum(len(body) for body in evicted.values())
+
+    def writer(self, scope, version, key):
+        return _MemoryEntryWriter(self, scope, version, key)
+
+    def replace(self, scope, version, key, encoding, body):
+        with self.lock:
+            entry = self.entries.get((scope, version, key))
+            if entry is None:
+                return
+            # Nouveau dictionnaire : les lectures en cours gardent l'ancien
+            self.entries[(scope, version, key)] = {**entry, encoding: body}
+            self.size += len(body) - len(entry.get(encoding, b''))
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+
+class _MemoryEntryWriter:
+    """Morceaux accumulés jusqu'à la taille maximale du stockage (au-delà : entrée abandonnée)"""
+
+    def __init__(self, store, scope, version, key):
+        self.store = store
+        self.entry = (scope, version, key)
+        self.parts = {}
+        self.size = 0
+
+    def write(self, parts):
+        if self.parts is None:
+            return
+        self.size += sum(len(data) for data in parts.values())
+        if self.size > self.store.max_bytes:
+            self.abort()
+            return
+        for encoding, data in parts.items():
+            self.parts.setdefault(encoding, []).append(data)
+
+    def commit(self):
+        if self.parts is not None:
+            self.store.set(*self.entry, {encoding: b''.join(data) for encoding, data in self.parts.items()})
+        self.parts = None
+
+    def abort(self):
+        self.parts = None
+
+
+BACKENDS = {'file': FileResponseStore, 'memory': MemoryResponseStore}
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_response_store():
+    """Stockage configuré par RESPONSE_CACHE_BACKEND ('file' par défaut, 'memory' ou None)"""
+    global _store
+    backend = getattr(settings, 'RESPONSE_CACHE_BACKEND', 'file')
+    if not backend:
+        return None
+    with _store_lock:
+        if _store is None or not isinstance(_store, BACKENDS[backend]):
+            _store = BACKENDS[backend]()
+    return _store
+
+
+@receiver(setting_changed)
+def reset_response_store(setting, **kwargs):
+    """Nouveau stockage si la configuration change (override_settings)"""
+    global _store
+    if setting in ('RESPONSE_CACHE_BACKEND', 'RESPONSE_CACHE_DIR', 'RESPONSE_CACHE_MAX_BYTES'):
+        with _store_lock:
+            _store = None
+
+
+def clear_response_cache():
+    store = get_response_store()
+    if store is not None:
+        store.clear()
+
+
+_upgrader = None
+_upgrades = set()
+_upgrades_lock = threading.Lock()
+
+
+def _upgrade_brotli(store, entry, content, quality):
+    import brotli
+
+    try:
+        store.replace(*entry, BROTLI, brotli.compress(content, quality=quality))
+    finally:
+        with _upgrades_lock:
+            _upgrades.discard(entry)
+
+
+def schedule_brotli_upgrade(store, scope, version, key, content):
+    """Recompresse la variante brotli au niveau maximal dans un thread d'arrière-plan (un à la fois)"""
+    global _upgrader
+    quality = brotli_upgrade_quality()
+    if quality is None or not brotli_available():
+        return
+    entry = (scope, version, key)
+    with _upgrades_lock:
+        if entry in _upgrades:
+            return
+        _upgrades.add(entry)
+        if _upgrader is None:
+            _upgrader = ThreadPoolExecutor(max_workers=1, thread_name_prefix='brotli-upgrade')
+    _upgrader.submit(_upgrade_brotli, store, entry, content, quality)
+
+
+def _write_through(chunks, writer):
+    """Renvoie les morceaux du flux en les écrivant (compressés) dans le stockage"""
+    compressor = StreamCompressor()
+    try:
+        for chunk in chunks:
+            writer.write(compressor.process(chunk))
+            yield chunk
+        writer.write(compressor.finish())
+    except BaseException:
+        # Client déconnecté ou erreur en cours de flux : entrée incomplète, rien n'est enregistré
+        writer.abort()
+        raise
+    writer.commit()
+
+
+def _build_response(body, content_type, encoding):
+    if isinstance(body, bytes):
+        response = HttpResponse(body, content_type=content_type)
+    else:
+        response = FileResponse(body, content_type=content_type)
+        response.headers.pop('Content-Disposition', None)
+    if encoding != IDENTITY:
+        response['Content-Encoding'] = encoding
+    patch_vary_headers(response, ['Accept-Encoding'])
+    return response
+
+
+class CompressedResponseCacheMixin:
+    """Sert les lectures depuis le cache de réponses pré-compressées
+
+    À combiner avec ConditionalGetMixin : la version des données calculée pour
+    l'ETag sert aussi de clé de cache, aucune requête supplémentaire n'est faite.
+    """
+
+    def is_response_cacheable(self, request):
+        return request.method in ('GET', 'HEAD') and request.accepted_renderer.format in CACHEABLE_FORMATS
+
+    def get_fresh_response(self, state, handler, request, *args, **kwargs):
+        store = get_response_store()
+        if store is None or not self.is_response_cacheable(request):
+            return super().get_fresh_response(state, handler, request, *args, **kwargs)
+
+        scope, version, _ = state
+        renderer = request.accepted_renderer
+        content_type = f'{renderer.media_type}; charset={renderer.charset}' if renderer.charset else renderer.media_type
+        key = make_etag(request.get_full_path(), renderer.format)
+
+        encoding = choose_encoding(request, store.encodings(scope, version, key))
+        body = store.open(scope, version, key, encoding)
+        if body is not None:
+            return _build_response(body, content_type, encoding)
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code != 200:
+            return response
+        response = self.finalize_response(request, response, *args, **kwargs)
+        if response.streaming:
+            # Liste en flux (?stream=1) : mise en cache pendant l'envoi, sans garder le corps en mémoire
+            response.streaming_content = _write_through(response.streaming_content, store.writer(scope, version, key))
+            patch_vary_headers(response, ['Accept-Encoding'])
+            return response
+        with serialization_timer(request):
+            # Réponse DRF à rendre, ou HttpResponse déjà encodée (liste servie par l'instantané)
+            if not getattr(response, 'is_rendered', True):
+                response.render()
+            content = response.content
+        variants = compress(content)
+        store.set(scope, version, key, variants)
+        schedule_brotli_upgrade(store, scope, version, key, content)
+        encoding = choose_encoding(request, variants)
+        return _build_response(variants[encoding], content_type, encoding)
@@ -0,0 +1,234 @@
+"""Agrégation des données communales vers les départements, régions et le pays
+
+Les lignes communales d'un recensement sont lues en une requête, rangées en
+colonnes NumPy, puis agrégées pour n'importe quel regroupement (np.bincount) :
+- effectifs (COUNT_FIELDS) : sommes ;
+- pourcentages et taux (WEIGHTED_FIELDS) : moyennes pondérées par la population
+  de référence du taux, en ignorant les communes sans valeur.
+"""
+from decimal import Decimal
+
+from django.db import transaction
+
+from .models import Country, Region, Department, DemographicData, EducationLevel
+
+COUNT_FIELDS = ['total_population', 'population_10_plus', 'population_15_plus']
+
+# Champ pourcentage → effectif de la population concernée (pondération)
+WEIGHTED_FIELDS = {
+    'male_percentage': 'total_population',
+    'female_percentage': 'total_population',
+    'urban_percentage': 'total_population',
+    'rural_percentage': 'total_population',
+    'single_rate': 'population_10_plus',
+    'married_rate': 'population_10_plus',
+    'divorced_rate': 'population_10_plus',
+    'widowed_rate': 'population_10_plus',
+    'school_enrollment_rate': 'total_population',
+    'illiteracy_rate_10_plus': 'population_10_plus',
+    'illiteracy_rate_15_plus': 'population_15_plus',
+}
+
+EDUCATION_FIELDS = ['no_education', 'preschool', 'primary', 'middle_school', 'high_school', 'university']
+EDUCATION_WEIGHT = 'population_10_plus'
+
+ZONE_FIELDS = ['commune_id', 'department_id', 'region_id', 'country_id']
+LEVELS = ('department', 'region', 'country')
+
+
+class CommuneFrame:
+    """Données communales d'un recensement en colonnes (NaN pour les valeurs absentes)"""
+
+    def __init__(self, census):
+        import numpy as np
+
+        education = [f'educationlevel__{field}' for field in EDUCATION_FIELDS]
+        columns = COUNT_FIELDS + list(WEIGHTED_FIELDS) + education
+        rows = list(
+            DemographicData.objects.filter(census=census, level='commune').values_list(
+                'commune_id', 'commune__department_id', 'commune__department__region_id',
+                'commune__department__region__country_id', 'commune__adm3_pcode', *columns,
+            )
+        )
+        self.census = census
+        self.size = len(rows)
+        ids = np.array([row[:4] for row in rows], dtype=float).reshape(-1, 4)
+        self.zones = {
+            field: np.nan_to_num(ids[:, i], nan=-1).astype(np.int64)
+            for i, field in enumerate(ZONE_FIELDS)
+        }
+        self.pcodes = [row[4] for row in rows]
+        values = np.array(
+            [[float(value) if value is not None else np.nan for value in row[5:]] for row in rows],
+            dtype=float,
+        ).reshape(-1, len(columns))
+        self.columns = {
+            field.replace('educationlevel__', ''): values[:, i]
+            for i, field in enumerate(columns)
+        }
+
+    def labels(self, level):
+        """Indice de groupe de chaque commune pour un niveau (zones triées par pk)"""
+        import numpy as np
+
+        keys = self.zones[f'{level}_id']
+        groups, inverse = np.unique(keys, return_inverse=True)
+        return groups, inverse
+
+    def aggregate(self, inverse, count):
+        """Agrège les communes selon `inverse` (indice de groupe, -1 pour exclure)"""
+        import numpy as np
+
+        selected = inverse >= 0
+        inverse = inverse[selected]
+
+        def column_sum(values, weights=None):
+            values = values[selected]
+            present = ~np.isnan(values)
+            if weights is None:
+                total = np.bincount(inverse[present], weights=values[present], minlength=count)
+                seen = np.bincount(inverse[present], minlength=count)
+                return np.where(seen > 0, total, np.nan)
+            weights = np.nan_to_num(weights[selected])
+            weighted = np.bincount(inverse[present], weights=values[present] * weights[present], minlength=count)
+            weight = np.bincount(inverse[present], weights=weights[present], minlength=count)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                return np.where(weight > 0, weighted / weight, np.nan)
+
+        results = {field: column_sum(self.columns[field]) for field in COUNT_FIELDS}
+        for field, weight in WEIGHTED_FIELDS.items():
+            results[field] = column_sum(self.columns[field], self.columns[weight])
+        for field in EDUCATION_FIELDS:
+            results[field] = column_sum(self.columns[field], self.columns[EDUCATION_WEIGHT])
+        results['commune_count'] = np.bincount(inverse, minlength=count)
+        return results
+
+
+def _row(results, index):
+    import numpy as np
+
+    row = {}
+    for field, values in results.items():
+        value = values[index]
+        if field in COUNT_FIELDS or field == 'commune_count':
+            row[field] = None if np.isnan(value) else int(round(value))
+        else:
+            row[field] = None if np.isnan(value) else round(float(value), 2)
+    return row
+
+
+def rollup_level(frame, level):
+    """{pk de la zone: valeurs agrégées} pour toutes les zones d'un niveau"""
+    groups, inverse = frame.labels(level)
+    inverse = inverse.copy()
+    # Communes sans rattachement (clé -1) : exclues
+    inverse[frame.zones[f'{level}_id'] < 0] = -1
+    results = frame.aggregate(inverse, len(groups))
+    return {int(pk): _row(results, i) for i, pk in enumerate(groups) if pk >= 0}
+
+
+def rollup_groups(frame, groups):
+    """Agrégation de regroupements arbitraires : {nom: [codes adm3]} → {nom: valeurs}"""
+    import numpy as np
+
+    names = list(groups)
+    positions = {pcode: i for i, pcode in enumerate(frame.pcodes)}
+    results = {}
+    # Une commune peut appartenir à plusieurs groupes : un passage par groupe
+    for name in names:
+        inverse = np.full(frame.size, -1, dtype=np.int64)
+        for pcode in groups[name]:
+            if pcode in positions:
+                inverse[positions[pcode]] = 0
+        results[name] = _row(frame.aggregate(inverse, 1), 0)
+    return results
+
+
+def zone_codes(level):
+    """{pk: code} des zones d'un niveau"""
+    model, field = {
+        'department': (Department, 'adm2_pcode'),
+        'region': (Region, 'adm1_pcode'),
+        'country': (Country, 'code'),
+    }[level]
+    return dict(model.objects.values_list('pk', field))
+
+
+def rollup_census(census, levels=LEVELS):
+    """Agrégats de tous les niveaux demandés, calculés en un seul passage sur les communes"""
+    frame = CommuneFrame(census)
+    return {level: rollup_level(frame, level) for level in levels}
+
+
+@transaction.atomic
+def apply_rollup(census, rollups):
+    """Remplace les lignes département / région / pays du recensement par les agrégats
+
+    Retourne {niveau: (lignes créées, lignes mises à jour)}.
+    """
+    # Liens vers les niveaux supérieurs, comme les imports (clés d'import : pays, région, département, commune)
+    region_countries = dict(Region.objects.values_list('pk', 'country_id'))
+    parents = {
+        'region': {pk: {'country_id': country_id} for pk, country_id in region_countries.items()},
+        'department': {
+            pk: {'country_id': region_countries.get(region_id), 'region_id': region_id}
+            for pk, region_id in Department.objects.values_list('pk', 'region_id')
+        },
+    }
+    report = {}
+    for level, zones in rollups.items():
+        existing = {
+            getattr(row, f'{level}_id'): row
+            for row in DemographicData.objects.filter(census=census, level=level).select_related('educationlevel')
+        }
+        created = updated = 0
+        for pk, values in zones.items():
+            fields = {
+                field: Decimal(str(values[field])) if field in WEIGHTED_FIELDS else values[field]
+                for field in COUNT_FIELDS + list(WEIGHTED_FIELDS)
+                if values[field] is not None
+            }
+            links = parents.get(level, {}).get(pk, {})
+            row = existing.get(pk)
+            if row is None:
+                row = DemographicData(census=census, **{f'{level}_id': pk}, **links, **fields)
+                missing = [f for f in COUNT_FIELDS + list(WEIGHTED_FIELDS) if getattr(row, f, None) is None]
+                if missing:
+                    # Une ligne incomplète violerait les contraintes NOT NULL
+                    continue
+                row.save()
+                created += 1
+            else:
+                # Lignes agrégées avant que les liens parents soient renseignés : complétées au passage
+                fields.update({field: value for field, value in links.items() if getattr(row, field) != value})
+                for field, value in fields.items():
+                    setattr(row, field, value)
+                row.save(update_fields=list(fields))
+                updated += 1
+
+            education = {field: Decimal(str(values[field])) for field in EDUCATION_FIELDS if values[field] is not None}
+            if len(education) == len(EDUCATION_FIELDS):
+                EducationLevel.objects.update_or_create(demographic_data=row, defaults=education)
+        report[level] = (created, updated)
+    return report
+
+
+def compare_rollup(census, rollups, fields=None):
+    """Écart maximal (valeur stockée − agrégat) par niveau et par champ"""
+    fields = fields or COUNT_FIELDS + list(WEIGHTED_FIELDS)
+    differences = {}
+    for level, zones in rollups.items():
+        rows = DemographicData.objects.filter(census=census, level=level).values(f'{level}_id', *fields)
+        level_differences = {}
+        for row in rows:
+            values = zones.get(row[f'{level}_id'])
+            if not values:
+                continue
+            for field in fields:
+                if row[field] is None or values[field] is None:
+                    continue
+                delta = float(row[field]) - values[field]
+                if abs(delta) > abs(level_differences.get(field, 0)):
+                    level_differences[field] = delta
+        differences[level] = level_differences
+    return differences
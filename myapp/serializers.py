@@ -1,32 +1,98 @@
+from decimal import Decimal
+from django.db import models
 from rest_framework import serializers
+from rest_framework.settings import api_settings
 from .models import Country, Region, Department, Commune, DemographicData, EducationLevel
+from .geometry import FULL_RESOLUTION
 
-class CountrySerializer(serializers.ModelSerializer):
+class DynamicFieldsMixin:
+    """Restreint les champs sérialisés aux listes 'fields' / 'omit' du contexte"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fields = self.context.get('fields')
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+        for name in self.context.get('omit') or ():
+            self.fields.pop(name, None)
+
+class GeometryField(serializers.JSONField):
+    """Champ geo_json qui renvoie la géométrie simplifiée pour la résolution du contexte"""
+    # Colonnes lues par ce champ (pour restreindre le queryset)
+    source_fields = ('geo_json', 'geo_json_simplified')
+
+    def __init__(self, **kwargs):
+        kwargs['source'] = '*'
+        super().__init__(**kwargs)
+
+    def to_representation(self, instance):
+        resolution = self.context.get('resolution', FULL_RESOLUTION)
+        if resolution != FULL_RESOLUTION:
+            simplified = (instance.geo_json_simplified or {}).get(resolution)
+            if simplified:
+                return simplified
+            # Pas encore simplifiée : géométrie complète, annotée par SimplifiedGeometryMixin (geo_json différé)
+            if getattr(instance, 'geo_json_fallback', None) is not None:
+                return instance.geo_json_fallback
+        return instance.geo_json
+
+    def to_internal_value(self, data):
+        return {'geo_json': super().to_internal_value(data)}
+
+class FastDecimalField(serializers.DecimalField):
+    """DecimalField qui évite quantize() pour les valeurs déjà au bon nombre de décimales
+    (cas de toutes les valeurs lues en base)"""
+
+    def to_representation(self, value):
+        if (
+            isinstance(value, Decimal)
+            and value.is_finite()
+            and value.as_tuple().exponent == -self.decimal_places
+            and getattr(self, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING)
+            and not self.localize
+        ):
+            return '{:f}'.format(value)
+        return super().to_representation(value)
+
+class FastDecimalMixin:
+    serializer_field_mapping = {
+        **serializers.ModelSerializer.serializer_field_mapping,
+        models.DecimalField: FastDecimalField,
+    }
+
+class CountrySerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Country
         fields = '__all__'
 
-class RegionSerializer(serializers.ModelSerializer):
+class RegionSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    geo_json = GeometryField()
+
     class Meta:
         model = Region
-        fields = '__all__'
+        exclude = ('geo_json_simplified',)
+
+class DepartmentSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    geo_json = GeometryField()
 
-class DepartmentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Department
-        fields = '__all__'
+        exclude = ('geo_json_simplified',)
+
+class CommuneSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    geo_json = GeometryField()
 
-class CommuneSerializer(serializers.ModelSerializer):
     class Meta:
         model = Commune
-        fields = '__all__'
+        exclude = ('geo_json_simplified',)
 
-class EducationLevelSerializer(serializers.ModelSerializer):
+class EducationLevelSerializer(FastDecimalMixin, serializers.ModelSerializer):
     class Meta:
         model = EducationLevel
         exclude = ('id', 'demographic_data')
 
-class DemographicDataSerializer(serializers.ModelSerializer):
+class DemographicDataSerializer(DynamicFieldsMixin, FastDecimalMixin, serializers.ModelSerializer):
     education_level = EducationLevelSerializer(source='educationlevel', read_only=True)
     class Meta:
         model = DemographicData
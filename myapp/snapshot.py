@@ -0,0 +1,240 @@
+"""Instantané en mémoire d'un recensement : une ligne par zone, colonnes NumPy typées
+
+Activé par CENSUS_SNAPSHOT_ENABLED. Chaque recensement est lu en une requête
+(limites jointes pour les noms), puis rangé en colonnes : entiers
+pour les effectifs, flottants (NaN pour une valeur absente) pour les taux et
+niveaux d'études. Les lignes sont indexées par (niveau, pcode) et par niveau.
+
+Les lectures (liste des données démographiques en flux, choroplèthes,
+classements) sont servies depuis l'instantané, sans ORM ni Decimal. Un
+instantané est immuable et porte la version du recensement et des limites ; à
+la première lecture après un changement de version, le suivant est construit
+puis substitué d'un coup, les requêtes en cours gardant le précédent.
+"""
+import threading
+
+from django.conf import settings
+from rest_framework.settings import api_settings
+
+from .models import Census, DemographicData
+from .renderers import dumps
+from .rollup import EDUCATION_FIELDS
+from .tiles import INDICATOR_FIELDS
+from .versioning import BOUNDARIES, get_version
+
+LEVELS = ('country', 'region', 'department', 'commune')
+
+# Nom de la zone de chaque niveau (via la clé étrangère du même nom)
+NAME_FIELDS = {'country': 'name', 'region': 'adm1_en', 'department': 'adm2_en', 'commune': 'adm3_en'}
+
+INTEGER_FIELDS = {'total_population', 'population_10_plus', 'population_15_plus'}
+
+
+def is_enabled():
+    return getattr(settings, 'CENSUS_SNAPSHOT_ENABLED', False)
+
+
+class CensusSnapshot:
+    """Données d'un recensement en colonnes (lecture seule)"""
+
+    def __init__(self, census, boundary_version):
+        import numpy as np
+
+        self.census = census
+        self.version = (census.data_version, boundary_version)
+        name_columns = [f'{level}__{NAME_FIELDS[level]}' for level in LEVELS]
+        education_columns = [f'educationlevel__{field}' for field in EDUCATION_FIELDS]
+        fields = [
+            'pk', *(f'{level}_id' for level in LEVELS), 'level', 'zone_pcode', *name_columns,
+            *INDICATOR_FIELDS, 'educationlevel__pk', *education_columns,
+        ]
+        rows = list(DemographicData.objects.filter(census=census).order_by('pk').values_list(*fields))
+        self.size = len(rows)
+        columns = list(zip(*rows)) if rows else [()] * len(fields)
+
+        self.ids = np.array(columns[0], dtype=np.int64)
+        position = 1
+        # Clés étrangères : -1 pour une valeur absente
+        self.zone_ids = {}
+        for level in LEVELS:
+            self.zone_ids[level] = np.array(
+                [-1 if value is None else value for value in columns[position]], dtype=np.int64
+            )
+            position += 1
+
+        level_index = {level: index for index, level in enumerate(LEVELS)}
+        self.levels = np.array([level_index[level] for level in columns[position]], dtype=np.int8)
+        self.pcodes = np.array(columns[position + 1], dtype=object)
+        position += 2
+        self.names = np.empty(self.size, dtype=object)
+        for index, level in enumerate(LEVELS):
+            selected = np.flatnonzero(self.levels == index)
+            self.names[selected] = np.array(columns[position + index], dtype=object)[selected]
+        position += len(LEVELS)
+
+        self.columns = {}
+        for field in INDICATOR_FIELDS:
+            values = columns[position]
+            if field in INTEGER_FIELDS:
+                self.columns[field] = np.array(values, dtype=np.int64)
+            else:
+                self.columns[field] = np.array(values, dtype=float)
+            position += 1
+        self.has_education = np.array([value is not None for value in columns[position]], dtype=bool)
+        position += 1
+        for field in EDUCATION_FIELDS:
+            self.columns[field] = np.array(columns[position], dtype=float)
+            position += 1
+
+        self.level_rows = {level: np.flatnonzero(self.levels == index) for index, level in enumerate(LEVELS)}
+        self.index = {
+            (LEVELS[level], pcode): row
+            for row, (level, pcode) in enumerate(zip(self.levels.tolist(), self.pcodes.tolist()))
+            if pcode
+        }
+        self._records_json = None
+        self._lock = threading.Lock()
+
+    @property
+    def year(self):
+        return self.census.year
+
+    def _values(self, field, rows):
+        """Valeurs Python d'une colonne (None pour NaN)"""
+        values = self.columns[field][rows].tolist()
+        if field in INTEGER_FIELDS:
+            return values
+        return [None if value != value else value for value in values]
+
+    def indicator_values(self, level, indicator):
+        """{pk de la zone: valeur} pour toutes les zones d'un niveau"""
+        rows = self.level_rows[level]
+        return dict(zip(self.zone_ids[level][rows].tolist(), self._values(indicator, rows)))
+
+    def zone_pcodes(self, level):
+        rows = self.level_rows[level]
+        return dict(zip(self.zone_ids[level][rows].tolist(), self.pcodes[rows].tolist()))
+
+    def ranking(self, level, indicator, descending=True, limit=None):
+        """[(pcode, nom, valeur)] des zones d'un niveau triées par valeur (zones sans valeur exclues)"""
+        import numpy as np
+
+        rows = self.level_rows[level]
+        values = self.columns[indicator][rows].astype(float)
+        rows, values = rows[~np.isnan(values)], values[~np.isnan(values)]
+        # Tri stable sur le pcode puis sur la valeur : ordre déterministe des ex aequo
+        order = np.argsort(self.pcodes[rows].astype(str), kind='stable')
+        rows, values = rows[order], values[order]
+        order = np.argsort(-values if descending else values, kind='stable')[:limit]
+        rows = rows[order]
+        return list(zip(self.pcodes[rows].tolist(), self.names[rows].tolist(), self._values(indicator, rows)))
+
+    def zone_rows(self, pcodes):
+        """Lignes des zones désignées par leurs codes (tous niveaux), dans l'ordre des pk"""
+        return sorted(
+            self.index[(level, pcode)] for pcode in pcodes for level in LEVELS if (level, pcode) in self.index
+        )
+
+    def records(self, rows=None):
+        """Lignes au format de DemographicDataSerializer"""
+        import numpy as np
+
+        if rows is None:
+            rows = np.arange(self.size)
+        rows = np.asarray(rows, dtype=np.int64)
+        coerce = api_settings.COERCE_DECIMAL_TO_STRING
+
+        def decimals(field):
+            values = self._values(field, rows)
+            if coerce:
+                return [None if value is None else f'{value:.2f}' for value in values]
+            return [None if value is None else round(value, 2) for value in values]
+
+        fields = {
+            field: self._values(field, rows) if field in INTEGER_FIELDS else decimals(field)
+            for field in INDICATOR_FIELDS
+        }
+        education = [decimals(field) for field in EDUCATION_FIELDS]
+        has_education = self.has_education[rows].tolist()
+        levels = [LEVELS[level] for level in self.levels[rows].tolist()]
+        pcodes = self.pcodes[rows].tolist()
+        zone_ids = {
+            level: [None if pk < 0 else pk for pk in self.zone_ids[level][rows].tolist()]
+            for level in LEVELS
+        }
+        census_id = self.census.pk
+        records = []
+        for i, pk in enumerate(self.ids[rows].tolist()):
+            record = {
+                'id': pk,
+                'education_level': (
+                    dict(zip(EDUCATION_FIELDS, (values[i] for values in education))) if has_education[i] else None
+                ),
+                'level': levels[i],
+                'zone_pcode': pcodes[i],
+            }
+            for field in INDICATOR_FIELDS:
+                record[field] = fields[field][i]
+            record['census'] = census_id
+            for level in LEVELS:
+                record[level] = zone_ids[level][i]
+            records.append(record)
+        return records
+
+    def records_json(self):
+        """Toutes les lignes encodées en JSON (calculées une fois par instantané)"""
+        if self._records_json is None:
+            with self._lock:
+                if self._records_json is None:
+                    self._records_json = dumps(self.records())
+        return self._records_json
+
+
+class SnapshotEngine:
+    """Instantanés du processus, un par recensement, reconstruits au changement de version"""
+
+    def __init__(self):
+        self.snapshots = {}
+        self.locks = {}
+        self.lock = threading.Lock()
+
+    def get(self, census_id, data_version, boundary_version=None):
+        if boundary_version is None:
+            boundary_version = get_version(BOUNDARIES)
+        version = (data_version, boundary_version)
+        snapshot = self.snapshots.get(census_id)
+        if snapshot is not None and snapshot.version == version:
+            return snapshot
+        with self.lock:
+            lock = self.locks.setdefault(census_id, threading.Lock())
+        # Une seule construction par recensement ; les autres threads attendent le résultat
+        with lock:
+            snapshot = self.snapshots.get(census_id)
+            if snapshot is not None and snapshot.version == version:
+                return snapshot
+            census = Census.objects.filter(pk=census_id).first()
+            if census is None:
+                self.snapshots.pop(census_id, None)
+                return None
+            # Version relue avec les données : un import concurrent déclenchera une nouvelle construction
+            snapshot = CensusSnapshot(census, boundary_version)
+            self.snapshots[census_id] = snapshot
+        return snapshot
+
+    def clear(self):
+        with self.lock:
+            self.snapshots.clear()
+
+
+_engine = SnapshotEngine()
+
+
+def get_census_snapshot(census_id, data_version, boundary_version=None):
+    """Instantané à jour du recensement, ou None si le moteur est désactivé"""
+    if not is_enabled():
+        return None
+    return _engine.get(census_id, data_version, boundary_version)
+
+
+def clear_snapshots():
+    _engine.clear()
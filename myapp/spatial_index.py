@@ -0,0 +1,116 @@
+"""Index spatial en mémoire des communes (recherche « quelle commune contient ce point ? »)
+
+Les polygones des communes sont chargés une seule fois par processus, préparés
+(shapely.prepare) et rangés dans un STRtree. L'index est reconstruit lorsque la
+version des limites administratives change (vérifiée au plus toutes les
+SPATIAL_INDEX_CHECK_INTERVAL secondes).
+"""
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import DatabaseError
+
+from .models import Commune
+from .versioning import BOUNDARIES, get_version
+
+logger = logging.getLogger(__name__)
+
+_index = None
+_lock = threading.Lock()
+_last_check = 0.0
+
+
+class CommuneIndex:
+    """STRtree des communes avec les codes du département et de la région parents"""
+
+    def __init__(self, version):
+        import numpy as np
+        import shapely
+        from shapely.geometry import shape
+
+        self.version = version
+        self.zones = []
+        geometries = []
+        rows = Commune.objects.values_list(
+            'pk', 'adm3_pcode', 'adm3_en',
+            'department_id', 'department__adm2_pcode', 'department__adm2_en',
+            'department__region_id', 'department__region__adm1_pcode', 'department__region__adm1_en',
+            'geo_json',
+        )
+        for *zone, geometry in rows:
+            if not geometry:
+                continue
+            self.zones.append(tuple(zone))
+            geometries.append(shape(geometry))
+        self.geometries = np.array(geometries, dtype=object)
+        shapely.prepare(self.geometries)
+        self.tree = shapely.STRtree(self.geometries)
+
+    def locate(self, lon, lat):
+        """Retourne l'indice de la commune contenant le point (frontière comprise), ou None"""
+        import shapely
+
+        # Point sur une frontière commune : la commune de plus petit indice, comme locate_many()
+        for index in sorted(self.tree.query(shapely.Point(lon, lat))):
+            if shapely.intersects_xy(self.geometries[index], lon, lat):
+                return int(index)
+        return None
+
+    def locate_many(self, lons, lats):
+        """Version vectorisée : tableau d'indices de communes (-1 hors de toute commune)"""
+        import numpy as np
+        import shapely
+
+        points = shapely.points(np.asarray(lons, dtype=float), np.asarray(lats, dtype=float))
+        missing = np.iinfo(np.int64).max
+        result = np.full(len(points), missing, dtype=np.int64)
+        point_indices, zone_indices = self.tree.query(points, predicate='intersects')
+        # Point sur une frontière commune : plusieurs paires, la commune de plus petit indice est gardée
+        np.minimum.at(result, point_indices, zone_indices)
+        result[result == missing] = -1
+        return result
+
+    def zone(self, index):
+        """Codes et noms (commune, département, région) d'un indice renvoyé par locate()"""
+        (commune_id, adm3_pcode, adm3_en,
+         department_id, adm2_pcode, adm2_en,
+         region_id, adm1_pcode, adm1_en) = self.zones[index]
+        return {
+            'commune': {'id': commune_id, 'adm3_pcode': adm3_pcode, 'adm3_en': adm3_en},
+            'department': {'id': department_id, 'adm2_pcode': adm2_pcode, 'adm2_en': adm2_en},
+            'region': {'id': region_id, 'adm1_pcode': adm1_pcode, 'adm1_en': adm1_en},
+        }
+
+
+def get_commune_index():
+    """Index courant, reconstruit si les limites administratives ont changé"""
+    global _index, _last_check
+
+    interval = getattr(settings, 'SPATIAL_INDEX_CHECK_INTERVAL', 5)
+    now = time.monotonic()
+    if _index is not None and now - _last_check < interval:
+        return _index
+
+    with _lock:
+        version = get_version(BOUNDARIES)
+        if _index is None or _index.version != version:
+            _index = CommuneIndex(version)
+        _last_check = now
+    return _index
+
+
+def clear_commune_index():
+    """Oublie l'index de ce processus : reconstruit à la prochaine recherche"""
+    global _index
+    with _lock:
+        _index = None
+
+
+def warm_up_commune_index():
+    """Construit l'index au démarrage du serveur pour que la première requête reste rapide"""
+    try:
+        get_commune_index()
+    except DatabaseError as e:
+        logger.warning("Index spatial des communes non construit au démarrage : %s", e)
@@ -0,0 +1,375 @@
+"""Jeux de données synthétiques déterministes : limites, recensements et niveaux d'études
+
+Le découpage reproduit l'échelle de la Mauritanie (15 régions, 58 départements,
+238 communes) et peut être multiplié : soit une grille de pavés emboîtés dans
+l'emprise du pays, soit les limites existantes dont chaque commune est
+subdivisée. Chaque commune est incluse dans son département, lui-même inclus
+dans sa région. Les lignes communales sont tirées au hasard (graine fixe, NumPy
+par recensement entier), les niveaux supérieurs sont obtenus par agrégation
+(rollup) : la hiérarchie est cohérente par construction.
+"""
+import json
+import math
+from collections import namedtuple
+from datetime import date
+
+from django.db import connection, transaction
+
+from .geometry import rebuild_simplified_geometries
+from .models import (
+    Census, CensusDiff, Country, Region, Department, Commune, BoundaryPoint, DemographicData, EducationLevel,
+)
+from .rollup import COUNT_FIELDS, EDUCATION_FIELDS, WEIGHTED_FIELDS, apply_rollup, rollup_census
+
+BASE_REGIONS = 15
+BASE_DEPARTMENTS = 58
+BASE_COMMUNES = 238
+BASE_YEAR = 2023
+
+# Emprise approximative de la Mauritanie (lon min, lat min, lon max, lat max)
+BBOX = (-17.07, 14.72, -4.83, 27.30)
+EDGE_POINTS = 8
+
+BOUNDARY_DATE = date(BASE_YEAR, 1, 1)
+BATCH_SIZE = 5000
+
+# Zone du découpage : code, nom, géométrie GeoJSON, superficie (km²), zones filles
+Zone = namedtuple('Zone', 'code name geometry area children')
+
+
+def split_bbox(bbox, count):
+    """Découpe une emprise en `count` pavés couvrant toute la surface (rangées de largeurs égales)"""
+    min_x, min_y, max_x, max_y = bbox
+    rows = max(1, round(math.sqrt(count * (max_y - min_y) / max(max_x - min_x, 1e-9))))
+    rows = min(rows, count)
+    cells = []
+    for row in range(rows):
+        in_row = count // rows + (1 if row < count % rows else 0)
+        y0 = min_y + (max_y - min_y) * row / rows
+        y1 = min_y + (max_y - min_y) * (row + 1) / rows
+        for column in range(in_row):
+            x0 = min_x + (max_x - min_x) * column / in_row
+            x1 = min_x + (max_x - min_x) * (column + 1) / in_row
+            cells.append((x0, y0, x1, y1))
+    return cells
+
+
+def distribute(total, parts):
+    """Répartit `total` éléments en `parts` effectifs entiers aussi égaux que possible"""
+    return [total // parts + (1 if i < total % parts else 0) for i in range(parts)]
+
+
+def cell_geometry(bbox, edge_points=EDGE_POINTS):
+    """MultiPolygon GeoJSON d'un pavé, avec des sommets intermédiaires sur chaque côté"""
+    x0, y0, x1, y1 = bbox
+    ring = []
+    for start, end in (((x0, y0), (x1, y0)), ((x1, y0), (x1, y1)), ((x1, y1), (x0, y1)), ((x0, y1), (x0, y0))):
+        for i in range(edge_points):
+            t = i / edge_points
+            ring.append([round(start[0] + (end[0] - start[0]) * t, 6), round(start[1] + (end[1] - start[1]) * t, 6)])
+    ring.append(ring[0])
+    return {'type': 'MultiPolygon', 'coordinates': [[ring]]}
+
+
+def degrees_to_sqkm(area):
+    # Degrés carrés → km² (même approximation que Region.calculate_area)
+    return round(area * 11132 ** 2 / 1e6, 2)
+
+
+def cell_area(bbox):
+    x0, y0, x1, y1 = bbox
+    return degrees_to_sqkm((x1 - x0) * (y1 - y0))
+
+
+def _cell_zone(code, name, bbox, children=()):
+    return Zone(code, name, cell_geometry(bbox), cell_area(bbox), list(children))
+
+
+def boundary_layout(scale=1, regions=BASE_REGIONS, departments=BASE_DEPARTMENTS, communes=BASE_COMMUNES):
+    """Grille de régions → départements → communes ; `scale` multiplie le nombre de communes"""
+    communes = max(departments, int(communes * scale))
+    department_counts = distribute(departments, regions)
+    commune_counts = iter(distribute(communes, departments))
+    layout = []
+    for r, region_bbox in enumerate(split_bbox(BBOX, regions), start=1):
+        region_code = f'MR{r:02d}'
+        children = []
+        for d, department_bbox in enumerate(split_bbox(region_bbox, department_counts[r - 1]), start=1):
+            department_code = f'{region_code}{d:02d}'
+            commune_zones = [
+                _cell_zone(f'{department_code}{c:03d}', f'Commune {department_code}-{c}', commune_bbox)
+                for c, commune_bbox in enumerate(split_bbox(department_bbox, next(commune_counts)), start=1)
+            ]
+            children.append(_cell_zone(department_code, f'Département {department_code}', department_bbox, commune_zones))
+        layout.append(_cell_zone(region_code, f'Région {r}', region_bbox, children))
+    return layout
+
+
+def subdivide_geometry(geometry, parts):
+    """Découpe une géométrie GeoJSON en au plus `parts` morceaux (intersections avec une grille)"""
+    import shapely
+    from shapely.geometry import shape
+
+    shapes = shapely.intersection(shape(geometry), shapely.box(*zip(*split_bbox(shape(geometry).bounds, parts))))
+    return [
+        (json.loads(shapely.to_geojson(piece)), degrees_to_sqkm(piece.area))
+        for piece in shapes
+        if not piece.is_empty and piece.area > 0
+    ]
+
+
+def existing_layout(scale=1):
+    """Découpage à partir des limites en base : régions et départements inchangés, chaque
+    commune subdivisée en `scale` morceaux (codes adm3 suffixés)"""
+    parts = max(1, round(scale))
+    communes = {}
+    for department_id, code, name, geometry, area in Commune.objects.order_by('pk').values_list(
+        'department_id', 'adm3_pcode', 'adm3_en', 'geo_json', 'area_sqkm',
+    ):
+        if parts == 1 or not geometry:
+            pieces = [Zone(code, name, geometry, area, [])]
+        else:
+            pieces = [
+                Zone(f'{code}{i:03d}'[:10], f'{name} {i}', piece, piece_area, [])
+                for i, (piece, piece_area) in enumerate(subdivide_geometry(geometry, parts), start=1)
+            ]
+        communes.setdefault(department_id, []).extend(pieces)
+
+    departments = {}
+    for pk, region_id, code, name, geometry, area in Department.objects.order_by('pk').values_list(
+        'pk', 'region_id', 'adm2_pcode', 'adm2_en', 'geo_json', 'area_sqkm',
+    ):
+        departments.setdefault(region_id, []).append(Zone(code, name, geometry, area, communes.get(pk, [])))
+
+    return [
+        Zone(code, name, geometry, area, departments.get(pk, []))
+        for pk, code, name, geometry, area in Region.objects.order_by('pk').values_list(
+            'pk', 'adm1_pcode', 'adm1_en', 'geo_json', 'area_sqkm',
+        )
+    ]
+
+
+def country_geometry(layout):
+    import shapely
+    from shapely.geometry import shape
+
+    union = shapely.union_all([shape(region.geometry) for region in layout if region.geometry])
+    return json.loads(shapely.to_geojson(union))
+
+
+def boundary_features(layout):
+    """FeatureCollection au format attendu par la commande import_geojson (une entité par commune)"""
+    features = []
+    for region in layout:
+        for department in region.children:
+            for commune in department.children:
+                features.append({
+                    'type': 'Feature',
+                    'properties': {
+                        'ADM0_EN': 'Mauritania', 'ADM0_PCODE': 'MR',
+                        'ADM1_EN': region.name, 'ADM1_PCODE': region.code,
+                        'ADM2_EN': department.name, 'ADM2_PCODE': department.code,
+                        'ADM3_EN': commune.name, 'ADM3_PCODE': commune.code, 'ADM3_REF': 'None',
+                        'real_name': commune.name,
+                        'date': BOUNDARY_DATE.isoformat(), 'validOn': BOUNDARY_DATE.isoformat(), 'validTo': 'None',
+                        'AREA_SQKM': commune.area,
+                    },
+                    'geometry': commune.geometry,
+                })
+    return {'type': 'FeatureCollection', 'features': features}
+
+
+@transaction.atomic
+def flush_data():
+    """Supprime recensements, données et limites administratives (du plus fin au plus large)
+
+    DELETE direct sur chaque table : le collecteur de l'ORM chargerait chaque ligne
+    pour suivre les cascades, ce qui prend plusieurs minutes à partir du million de lignes.
+    """
+    with connection.cursor() as cursor:
+        for model in (EducationLevel, CensusDiff, DemographicData, Census, BoundaryPoint, Commune, Department, Region, Country):
+            cursor.execute(f'DELETE FROM {connection.ops.quote_name(model._meta.db_table)}')
+
+
+@transaction.atomic
+def create_boundaries(layout, batch_size=BATCH_SIZE):
+    """Crée le pays, les régions, départements et communes (bulk_create)
+
+    Retourne les communes [(pk, department_id, region_id, country_id)] dans l'ordre des pk.
+    """
+    dates = {'date': BOUNDARY_DATE, 'valid_on': BOUNDARY_DATE}
+    country = Country.objects.create(name='Mauritania', code='MR', geo_json=country_geometry(layout))
+    regions = Region.objects.bulk_create([
+        Region(
+            country=country, adm0_en='Mauritania', adm0_pcode='MR', adm1_en=zone.name, adm1_pcode=zone.code,
+            geo_json=zone.geometry, area_sqkm=zone.area, **dates,
+        )
+        for zone in layout
+    ])
+    departments = Department.objects.bulk_create([
+        Department(
+            region=region, adm2_en=zone.name, adm2_pcode=zone.code,
+            geo_json=zone.geometry, area_sqkm=zone.area, **dates,
+        )
+        for region, region_zone in zip(regions, layout)
+        for zone in region_zone.children
+    ])
+    department_zones = [zone for region_zone in layout for zone in region_zone.children]
+    communes = Commune.objects.bulk_create([
+        Commune(
+            department=department, adm3_en=zone.name, adm3_pcode=zone.code, real_name=zone.name,
+            geo_json=zone.geometry, area_sqkm=zone.area, **dates,
+        )
+        for department, department_zone in zip(departments, department_zones)
+        for zone in department_zone.children
+    ], batch_size=batch_size)
+    # Géométries simplifiées servies selon le zoom, comme après import_geojson
+    for model in (Region, Department, Commune):
+        rebuild_simplified_geometries(model)
+
+    departments_by_pk = {department.pk: department for department in departments}
+    return [
+        (commune.pk, commune.department_id, departments_by_pk[commune.department_id].region_id, country.pk)
+        for commune in communes
+    ]
+
+
+def split_percent(rng, count, parts):
+    """Tableau (count, parts) de pourcentages à deux décimales dont chaque ligne somme à 100"""
+    import numpy as np
+
+    weights = rng.random((count, parts)) + 0.05
+    values = np.round(100 * weights / weights.sum(axis=1, keepdims=True), 2)
+    values[:, -1] = np.round(100 - values[:, :-1].sum(axis=1), 2)
+    return values
+
+
+def commune_profiles(count, seed=0):
+    """Caractéristiques stables des communes, d'un recensement à l'autre"""
+    import numpy as np
+
+    rng = np.random.default_rng([seed, 0])
+    return {
+        'population': rng.lognormal(9.5, 1.0, count).astype(np.int64) + 500,
+        'growth': rng.uniform(0.015, 0.04, count),
+        'urban': rng.beta(0.7, 1.5, count) * 100,
+        'literacy': rng.uniform(0.3, 0.85, count),
+    }
+
+
+def census_values(profiles, years, seed=0):
+    """Colonnes DemographicData et EducationLevel de toutes les communes, `years` ans après l'année de base"""
+    import numpy as np
+
+    count = len(profiles['population'])
+    rng = np.random.default_rng([seed, 1, years + 1000])
+    population = (profiles['population'] * (1 + profiles['growth']) ** years).astype(np.int64)
+    male = np.round(rng.uniform(47, 52, count), 2)
+    urban = np.round(np.clip(profiles['urban'] + rng.uniform(-2, 2, count) + years * 0.3, 0, 100), 2)
+    marital = split_percent(rng, count, 4)
+    illiteracy_10 = np.round(np.clip(
+        (1 - profiles['literacy']) * 100 - years * 0.5 + rng.uniform(-3, 3, count), 2, 95,
+    ), 2)
+    values = {
+        'total_population': population,
+        'population_10_plus': (population * rng.uniform(0.68, 0.76, count)).astype(np.int64),
+        'population_15_plus': (population * rng.uniform(0.56, 0.64, count)).astype(np.int64),
+        'male_percentage': male,
+        'female_percentage': np.round(100 - male, 2),
+        'urban_percentage': urban,
+        'rural_percentage': np.round(100 - urban, 2),
+        'single_rate': marital[:, 0],
+        'married_rate': marital[:, 1],
+        'divorced_rate': marital[:, 2],
+        'widowed_rate': marital[:, 3],
+        'school_enrollment_rate': np.round(np.minimum(99, profiles['literacy'] * 100 + rng.uniform(0, 15, count)), 2),
+        'illiteracy_rate_10_plus': illiteracy_10,
+        'illiteracy_rate_15_plus': np.round(np.minimum(99, illiteracy_10 + rng.uniform(0, 8, count)), 2),
+    }
+    education = split_percent(rng, count, len(EDUCATION_FIELDS))
+    return values, {field: education[:, i] for i, field in enumerate(EDUCATION_FIELDS)}
+
+
+@transaction.atomic
+def create_census(year, communes, profiles, seed=0, is_projection=False, rollup=True, batch_size=BATCH_SIZE):
+    """Recensement complet : lignes communales en bulk, puis départements, régions et pays agrégés"""
+    census = Census.objects.create(year=year, is_projection=is_projection)
+    values, education = census_values(profiles, year - BASE_YEAR, seed)
+    fields = COUNT_FIELDS + list(WEIGHTED_FIELDS)
+    columns = [values[field].tolist() for field in fields]
+    education_columns = [education[field].tolist() for field in EDUCATION_FIELDS]
+    # bulk_create contourne DemographicData.save() : niveau et code de zone renseignés ici
+    pcodes = dict(Commune.objects.values_list('pk', 'adm3_pcode'))
+
+    for start in range(0, len(communes), batch_size):
+        stop = min(start + batch_size, len(communes))
+        rows = DemographicData.objects.bulk_create([
+            DemographicData(
+                census=census, commune_id=commune_id, department_id=department_id,
+                region_id=region_id, country_id=country_id, level='commune', zone_pcode=pcodes[commune_id],
+                **{field: column[i] for field, column in zip(fields, columns)},
+            )
+            for i, (commune_id, department_id, region_id, country_id) in enumerate(communes[start:stop], start=start)
+        ])
+        EducationLevel.objects.bulk_create([
+            EducationLevel(
+                demographic_data=row,
+                **{field: column[i] for field, column in zip(EDUCATION_FIELDS, education_columns)},
+            )
+            for i, row in enumerate(rows, start=start)
+        ])
+
+    if rollup:
+        apply_rollup(census, rollup_census(census))
+    return census
+
+
+def census_years(count, start=BASE_YEAR, step=1):
+    return [start + i * step for i in range(count)]
+
+
+def create_dataset(scale=1, censuses=1, seed=0, layout=None, years=None, projections_after=BASE_YEAR,
+                   rollup=True, batch_size=BATCH_SIZE, report=None):
+    """Limites (grille à l'échelle `scale` par défaut) et recensements ; les années au-delà de
+    `projections_after` sont des projections"""
+    communes = create_boundaries(layout if layout is not None else boundary_layout(scale), batch_size)
+    profiles = commune_profiles(len(communes), seed)
+    created = []
+    for year in years or census_years(censuses):
+        created.append(create_census(
+            year, communes, profiles, seed=seed, is_projection=year > projections_after,
+            rollup=rollup, batch_size=batch_size,
+        ))
+        if report:
+            report(created[-1])
+    return created
+
+
+IMPORT_COLUMNS = [
+    ('Total Population', 'total_population'), ('Male Population', 'male_percentage'),
+    ('Female Population', 'female_percentage'), ('Urban Population', 'urban_percentage'),
+    ('Rural Population', 'rural_percentage'), ('Population 10+', 'population_10_plus'),
+    ('Single Rate', 'single_rate'), ('Married Rate', 'married_rate'),
+    ('Divorced Rate', 'divorced_rate'), ('Widowed Rate', 'widowed_rate'),
+    ('School Enrollment Rate', 'school_enrollment_rate'), ('Illiteracy Rate 10+', 'illiteracy_rate_10_plus'),
+    ('Population 15+', 'population_15_plus'), ('Illiteracy Rate 15+', 'illiteracy_rate_15_plus'),
+    ('No Education', 'educationlevel__no_education'), ('Preschool', 'educationlevel__preschool'),
+    ('Primary', 'educationlevel__primary'), ('Middle School', 'educationlevel__middle_school'),
+    ('High School', 'educationlevel__high_school'), ('University', 'educationlevel__university'),
+]
+
+
+def import_table(census):
+    """Lignes (en-tête compris) au format du modèle d'import centralisé, pour un recensement existant"""
+    header = ['Country Code', 'Region Code', 'Department Code', 'Commune Code', 'niveau_donnee']
+    rows = [header + [column for column, _ in IMPORT_COLUMNS]]
+    values = DemographicData.objects.filter(census=census, region__isnull=False).order_by('pk').values_list(
+        'region__country__code', 'region__adm1_pcode', 'department__adm2_pcode', 'commune__adm3_pcode',
+        *[field for _, field in IMPORT_COLUMNS],
+    )
+    for country_code, region_code, department_code, commune_code, *data in values:
+        level = 'commune' if commune_code else 'departement' if department_code else 'region'
+        rows.append([country_code, region_code, department_code or '', commune_code or '', level] + [
+            '' if value is None else str(value) for value in data
+        ])
+    return rows
@@ -0,0 +1,47 @@
+"""Jeu de données partagé par les tests : petit découpage synthétique sur deux recensements"""
+import tempfile
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from myapp.models import DemographicData
+from myapp.response_cache import clear_response_cache
+from myapp.spatial_index import clear_commune_index
+from myapp.synthetic import boundary_layout, create_dataset
+from myapp.tiles import clear_tile_cache
+
+# 2 régions, 4 départements, 8 communes : quelques dizaines de lignes par recensement
+LAYOUT = dict(regions=2, departments=4, communes=8)
+YEARS = [2013, 2023]
+
+
+def create_small_dataset(years=YEARS):
+    return create_dataset(layout=boundary_layout(**LAYOUT), years=years)
+
+
+class DatasetTestCase(TestCase):
+    """Jeu synthétique créé une fois par classe ; caches vidés entre les tests (les pk peuvent être réutilisés)"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.cache_dir = cls.enterClassContext(tempfile.TemporaryDirectory())
+        cls.enterClassContext(override_settings(
+            RESPONSE_CACHE_BACKEND='memory',
+            RESPONSE_CACHE_BROTLI_UPGRADE_QUALITY=None,
+            EXPORT_CACHE_DIR=cls.cache_dir,
+            TILE_CACHE_DIR=cls.cache_dir,
+        ))
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.censuses = create_small_dataset()
+
+    def setUp(self):
+        cache.clear()
+        clear_response_cache()
+        clear_tile_cache()
+        clear_commune_index()
+
+    def population(self, year, pcode):
+        return DemographicData.objects.get(census__year=year, zone_pcode=pcode).total_population
@@ -0,0 +1,31 @@
+from django.urls import reverse
+
+from .base import DatasetTestCase
+
+
+class BulkTests(DatasetTestCase):
+    def test_demographics_get_and_post(self):
+        url = reverse('demographics-bulk')
+        response = self.client.get(url, {'pcodes': 'MR01,MR0101001', 'year': 2013})
+        self.assertEqual(response.status_code, 200)
+        rows = response.json()
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(
+            {row['total_population'] for row in rows},
+            {self.population(2013, 'MR01'), self.population(2013, 'MR0101001')},
+        )
+        posted = self.client.post(f'{url}?year=2013', {'pcodes': ['MR01', 'MR0101001']}, content_type='application/json')
+        self.assertEqual(posted.status_code, 200)
+        self.assertEqual(len(posted.json()), 2)
+
+    def test_demographics_requires_pcodes(self):
+        response = self.client.post(reverse('demographics-bulk'), {'pcodes': []}, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_communes(self):
+        url = reverse('commune-bulk')
+        response = self.client.get(url, {'pcodes': 'MR0101001,MR0101002', 'fields': 'adm3_pcode'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sorted(row['adm3_pcode'] for row in response.json()), ['MR0101001', 'MR0101002'])
+        posted = self.client.post(url, {'pcodes': ['MR0101001']}, content_type='application/json')
+        self.assertEqual([row['adm3_pcode'] for row in posted.json()], ['MR0101001'])
@@ -0,0 +1,37 @@
+from django.core.cache import cache
+from django.urls import reverse
+
+from myapp.census_diff import refresh_pair
+from myapp.invalidation import suppress_invalidation
+from myapp.models import CensusDiff
+
+from .base import DatasetTestCase
+
+
+class CensusDiffTests(DatasetTestCase):
+    def test_population_change(self):
+        response = self.client.get(reverse('census-diff'), {'level': 'region'})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual((data['from'], data['to'], data['years']), (2013, 2023, 10))
+        zones = {zone['zone_pcode']: zone for zone in data['zones']}
+        self.assertEqual(sorted(zones), ['MR01', 'MR02'])
+        self.assertEqual(
+            zones['MR01']['population_change'], self.population(2023, 'MR01') - self.population(2013, 'MR01'),
+        )
+
+    def test_get_does_not_write(self):
+        self.client.get(reverse('census-diff'), {'level': 'commune'})
+        self.assertFalse(CensusDiff.objects.exists())
+
+    def test_materialized_rows_match(self):
+        computed = self.client.get(reverse('census-diff'), {'level': 'commune'}).json()['zones']
+        with suppress_invalidation():
+            refresh_pair(*self.censuses)
+        cache.clear()
+        self.assertTrue(CensusDiff.objects.exists())
+        self.assertEqual(self.client.get(reverse('census-diff'), {'level': 'commune'}).json()['zones'], computed)
+
+    def test_unknown_pair(self):
+        response = self.client.get(reverse('census-diff'), {'from': 1990})
+        self.assertEqual(response.status_code, 404)
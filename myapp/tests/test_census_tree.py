@@ -0,0 +1,38 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from myapp.census_tree import build_census_tree
+from myapp.models import Census
+
+from .base import DatasetTestCase
+
+
+class CensusTreeTests(DatasetTestCase):
+    def test_hierarchy(self):
+        response = self.client.get(reverse('census-tree', args=[2013]))
+        self.assertEqual(response.status_code, 200)
+        tree = response.json()
+        self.assertEqual(tree['year'], 2013)
+        self.assertEqual(len(tree['regions']), 2)
+        region = next(region for region in tree['regions'] if region['adm1_pcode'] == 'MR01')
+        self.assertEqual(region['data']['total_population'], self.population(2013, 'MR01'))
+        communes = [commune for department in region['departments'] for commune in department['communes']]
+        self.assertEqual(len(communes), 4)
+        self.assertTrue(all(commune['adm3_pcode'].startswith('MR01') for commune in communes))
+        self.assertIn('education_level', communes[0]['data'])
+        self.assertNotIn('zone_pcode', communes[0]['data'])
+
+    def test_constant_number_of_queries(self):
+        census = Census.objects.get(year=2013)
+        with CaptureQueriesContext(connection) as queries:
+            build_census_tree(census)
+        self.assertEqual(len(queries), 4)
+
+    def test_cached_per_census_version(self):
+        url = reverse('census-tree', args=[2013])
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get(url).status_code, 200)
+        # Lecture des versions seulement, le corps vient du cache de réponses
+        self.assertFalse([query for query in queries if 'myapp_demographicdata' in query['sql']])
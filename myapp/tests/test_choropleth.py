@@ -0,0 +1,67 @@
+import itertools
+
+from django.test import SimpleTestCase
+from django.urls import reverse
+
+from myapp.choropleth import JENKS_MAX_VALUES, classify, compute_breaks, jenks_breaks
+from myapp.models import Commune
+
+from .base import DatasetTestCase
+
+
+def within_class_variance(values, breaks):
+    classes = {}
+    for value in values:
+        classes.setdefault(classify(value, breaks), []).append(value)
+    return sum(sum((v - sum(c) / len(c)) ** 2 for v in c) for c in classes.values())
+
+
+class BreaksTests(SimpleTestCase):
+    values = [1, 2, 4, 5, 7, 9, 10, 20, 21, 22, 40, 41, 43, 80]
+
+    def test_jenks_is_optimal(self):
+        breaks = jenks_breaks(self.values, 3)
+        self.assertEqual(len(breaks), 4)
+        best = min(
+            within_class_variance(self.values, [self.values[0], a, b, self.values[-1]])
+            for a, b in itertools.combinations(self.values[:-1], 2)
+        )
+        self.assertAlmostEqual(within_class_variance(self.values, breaks), best)
+
+    def test_jenks_large_series(self):
+        values = [float(i % 997) for i in range(JENKS_MAX_VALUES * 20)]
+        breaks = jenks_breaks(values, 5)
+        self.assertEqual((breaks[0], breaks[-1]), (0.0, 996.0))
+        self.assertEqual(breaks, sorted(breaks))
+
+    def test_duplicates_removed(self):
+        self.assertEqual(compute_breaks([3, 3, 3], 'quantile', 4), [3])
+        self.assertEqual(compute_breaks([], 'jenks'), [])
+
+
+class ChoroplethApiTests(DatasetTestCase):
+    def test_map(self):
+        response = self.client.get(reverse('choropleth'), {
+            'level': 'region', 'year': 2013, 'indicator': 'total_population', 'method': 'jenks', 'classes': 2,
+        })
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(set(data['values']), {'MR01', 'MR02'})
+        self.assertEqual(data['values']['MR01'], self.population(2013, 'MR01'))
+
+    def test_geojson_full_geometry_fallback(self):
+        Commune.objects.filter(adm3_pcode='MR0101001').update(geo_json_simplified={})
+        response = self.client.get(reverse('choropleth'), {
+            'level': 'commune', 'year': 2013, 'indicator': 'total_population',
+            'output': 'geojson', 'resolution': 'low',
+        })
+        self.assertEqual(response.status_code, 200)
+        geometries = {feature['properties']['pcode']: feature['geometry'] for feature in response.json()['features']}
+        self.assertEqual(len(geometries), 8)
+        self.assertEqual(geometries['MR0101001'], Commune.objects.get(adm3_pcode='MR0101001').geo_json)
+        self.assertTrue(all(geometries.values()))
+
+    def test_json_errors(self):
+        response = self.client.get(reverse('choropleth'), {'indicator': 'inconnu'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('indicator', response.json())
@@ -0,0 +1,55 @@
+from django.test import SimpleTestCase
+from django.urls import reverse
+from rest_framework.views import APIView
+
+from myapp.mixins import ConditionalGetMixin
+from myapp.models import DemographicData, Region
+
+from .base import DatasetTestCase
+
+
+class ConditionalGetTests(DatasetTestCase):
+    def assertNotModified(self, url, params=None):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        response = self.client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        return etag
+
+    def test_boundaries(self):
+        etag = self.assertNotModified(reverse('region-list'))
+        region = Region.objects.get(adm1_pcode='MR01')
+        region.adm1_en = 'Renommée'
+        with self.captureOnCommitCallbacks(execute=True):
+            region.save()
+        response = self.client.get(reverse('region-list'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_census_scoped_views(self):
+        tree = reverse('census-tree', args=[2013])
+        etag = self.assertNotModified(tree)
+        other_etag = self.assertNotModified(reverse('census-tree', args=[2023]))
+        self.assertNotModified(reverse('demographics-list-create'), {'year': 2013})
+
+        row = DemographicData.objects.get(census__year=2023, zone_pcode='MR01')
+        row.total_population += 1
+        with self.captureOnCommitCallbacks(execute=True):
+            row.save()
+        # Seul le recensement modifié change de version
+        self.assertEqual(self.client.get(tree, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        response = self.client.get(reverse('census-tree', args=[2023]), HTTP_IF_NONE_MATCH=other_etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_unknown_census(self):
+        self.assertEqual(self.client.get(reverse('census-tree', args=[1990])).status_code, 404)
+
+
+class DataVersionScopeTests(SimpleTestCase):
+    def test_scope_required(self):
+        class UnversionedView(ConditionalGetMixin, APIView):
+            pass
+
+        with self.assertRaisesMessage(AssertionError, 'UnversionedView doit définir data_version_scope'):
+            UnversionedView().get_data_version()
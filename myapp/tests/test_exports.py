@@ -0,0 +1,81 @@
+import csv
+import importlib.util
+import io
+import json
+import unittest
+
+from django.urls import reverse
+
+from myapp.models import Commune, Country, DemographicData, Department, Region
+
+from .base import DatasetTestCase
+
+
+class ExportTests(DatasetTestCase):
+    def read_stream(self, response):
+        return b''.join(response.streaming_content).decode('utf-8')
+
+    def test_csv_stream(self):
+        response = self.client.get(reverse('export-demographics-stream'), {'year': 2023, 'level': 'commune'})
+        self.assertEqual(response.status_code, 200)
+        rows = list(csv.DictReader(io.StringIO(self.read_stream(response))))
+        self.assertEqual(len(rows), 8)
+        self.assertEqual({row['level'] for row in rows}, {'commune'})
+
+    def test_ndjson_stream(self):
+        response = self.client.get(reverse('export-demographics-stream'), {'year': 'all', 'output': 'ndjson'})
+        self.assertEqual(response.status_code, 200)
+        lines = self.read_stream(response).splitlines()
+        self.assertEqual(len(lines), DemographicData.objects.count())
+        self.assertIn('no_education', json.loads(lines[0]))
+
+    def test_zone_names_follow_level(self):
+        response = self.client.get(reverse('export-demographics-stream'), {'year': 2023})
+        rows = list(csv.DictReader(io.StringIO(self.read_stream(response))))
+        self.assertEqual(len(rows), DemographicData.objects.filter(census__year=2023).count())
+        expected = {
+            'country': dict(Country.objects.values_list('code', 'name')),
+            'region': dict(Region.objects.values_list('adm1_pcode', 'adm1_en')),
+            'department': dict(Department.objects.values_list('adm2_pcode', 'adm2_en')),
+            'commune': dict(Commune.objects.values_list('adm3_pcode', 'adm3_en')),
+        }
+        pcode_columns = {
+            'country': 'country_code', 'region': 'region_pcode',
+            'department': 'department_pcode', 'commune': 'commune_pcode',
+        }
+        for row in rows:
+            self.assertEqual(row['zone_name'], expected[row['level']][row[pcode_columns[row['level']]]])
+
+    def test_stream_errors(self):
+        url = reverse('export-demographics-stream')
+        response = self.client.get(url, {'output': 'xml'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('output', response.json())
+        self.assertIn('level', self.client.get(url, {'level': 'canton'}).json())
+        self.assertIn('year', self.client.get(url, {'year': 'abc'}).json())
+        response = self.client.get(url, {'year': 1990}, HTTP_ACCEPT='text/csv')
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertIn('detail', response.json())
+
+    def test_export_all_data(self):
+        response = self.client.get(reverse('export_all_data'))
+        self.assertEqual(response.status_code, 200)
+
+    @unittest.skipIf(importlib.util.find_spec('pyarrow') is None, "pyarrow n'est pas installé")
+    def test_columnar(self):
+        import pyarrow.parquet as pq
+
+        response = self.client.get(reverse('export-columnar'), {'year': 2023, 'level': 'region', 'geometry': '1', 'resolution': 'low'})
+        self.assertEqual(response.status_code, 200)
+        table = pq.read_table(io.BytesIO(b''.join(response.streaming_content)))
+        self.assertEqual(sorted(table.column('pcode').to_pylist()), ['MR01', 'MR02'])
+        self.assertNotIn(None, table.column('geometry').to_pylist())
+
+    def test_columnar_errors(self):
+        url = reverse('export-columnar')
+        self.assertIn('output', self.client.get(url, {'output': 'xlsx'}).json())
+        self.assertIn('resolution', self.client.get(url, {'resolution': 'ultra'}).json())
+        response = self.client.get(url, {'year': 1990}, HTTP_ACCEPT='application/vnd.apache.parquet')
+        self.assertEqual(response.status_code, 404)
+        self.assertIn('detail', response.json())
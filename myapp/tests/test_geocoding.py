@@ -0,0 +1,74 @@
+import csv
+import io
+import json
+
+import openpyxl
+from django.urls import reverse
+from shapely.geometry import shape
+
+from myapp.models import Commune
+
+from .base import DatasetTestCase
+
+
+def upload(name, content):
+    source = io.BytesIO(content)
+    source.name = name
+    return source
+
+
+class BatchGeocodeTests(DatasetTestCase):
+    def setUp(self):
+        super().setUp()
+        point = shape(Commune.objects.get(adm3_pcode='MR0102001').geo_json).representative_point()
+        self.inside = (point.y, point.x)
+
+    def post(self, name, content, **data):
+        response = self.client.post(reverse('geocode-batch'), {'file': upload(name, content), **data})
+        content = b''.join(response.streaming_content).decode('utf-8') if response.streaming else response.content
+        return response, content
+
+    def test_csv(self):
+        lat, lon = self.inside
+        response, content = self.post('points.csv', f'nom,Latitude,Longitude\na,{lat},{lon}\nb,0,0\n'.encode())
+        self.assertEqual(response.status_code, 200)
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual(
+            [(row['nom'], row['adm3_pcode'], row['adm2_pcode'], row['adm1_pcode']) for row in rows],
+            [('a', 'MR0102001', 'MR0102', 'MR01'), ('b', '', '', '')],
+        )
+
+    def test_geojson_to_ndjson(self):
+        lat, lon = self.inside
+        collection = {'type': 'FeatureCollection', 'features': [
+            {'type': 'Feature', 'properties': {'nom': 'a'}, 'geometry': {'type': 'Point', 'coordinates': [lon, lat]}},
+            {'type': 'Feature', 'properties': {'nom': 'b'}, 'geometry': None},
+        ]}
+        response, content = self.post('points.geojson', json.dumps(collection).encode(), output='ndjson')
+        self.assertEqual(response.status_code, 200)
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual([(row['nom'], row['adm3_pcode']) for row in rows], [('a', 'MR0102001'), ('b', None)])
+
+    def test_xlsx(self):
+        workbook = openpyxl.Workbook()
+        workbook.active.append(['id', 'y', 'x'])
+        workbook.active.append([1, *self.inside])
+        content = io.BytesIO()
+        workbook.save(content)
+        response, body = self.post('points.xlsx', content.getvalue())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(next(csv.DictReader(io.StringIO(body)))['adm3_pcode'], 'MR0102001')
+
+    def test_malformed_uploads(self):
+        for name, content in (
+            ('points.geojson', b'{"type": "FeatureCollection", "features": ["x"]}'),
+            ('points.geojson', b'[1, 2]'),
+            ('points.geojson', b'{pas du json'),
+            ('points.xlsx', b'pas un classeur'),
+            ('points.csv', b'nom,valeur\na,1\n'),
+        ):
+            response, _ = self.post(name, content)
+            self.assertEqual(response.status_code, 400, content)
+            self.assertIn('error', response.json())
+        response, _ = self.post('points.csv', b'lat,lon\n', output='xml')
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,78 @@
+from django.test import TestCase
+from django.urls import reverse
+
+from myapp.geometry import RESOLUTIONS, parse_resolution, rebuild_simplified_geometries
+from myapp.models import Commune, Region
+
+from .base import DatasetTestCase, create_small_dataset
+
+
+def results(response):
+    data = response.json()
+    return data['results'] if isinstance(data, dict) else data
+
+
+class ParseResolutionTests(TestCase):
+    def test_zoom(self):
+        self.assertEqual(parse_resolution(zoom='5'), 'low')
+        self.assertEqual(parse_resolution(zoom='14'), 'full')
+        self.assertEqual(parse_resolution('Medium', zoom='14'), 'medium')
+
+    def test_invalid_values(self):
+        with self.assertRaisesMessage(ValueError, "Niveau de zoom non valide 'abc'"):
+            parse_resolution(zoom='abc')
+        with self.assertRaisesMessage(ValueError, "Résolution inconnue 'ultra'"):
+            parse_resolution('ultra')
+
+
+class SimplifiedGeometryApiTests(DatasetTestCase):
+    def test_resolution(self):
+        response = self.client.get(reverse('region-list'), {'resolution': 'low'})
+        self.assertEqual(response.status_code, 200)
+        region = Region.objects.get(adm1_pcode='MR01')
+        served = {row['adm1_pcode']: row['geo_json'] for row in results(response)}
+        self.assertEqual(served['MR01'], region.geo_json_simplified['low'])
+
+    def test_full_geometry_fallback(self):
+        Region.objects.filter(adm1_pcode='MR01').update(geo_json_simplified={})
+        response = self.client.get(reverse('region-list'), {'zoom': 3})
+        served = {row['adm1_pcode']: row['geo_json'] for row in results(response)}
+        self.assertEqual(served['MR01'], Region.objects.get(adm1_pcode='MR01').geo_json)
+
+    def test_invalid_zoom(self):
+        response = self.client.get(reverse('region-list'), {'zoom': 'abc'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Niveau de zoom non valide", response.json()['resolution'])
+
+
+class SavedGeometryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_small_dataset(years=[2023])
+
+    def test_rebuilds_saved_zone_and_neighbours(self):
+        Commune.objects.update(geo_json_simplified={})
+        commune = Commune.objects.get(adm3_pcode='MR0101001')
+        x0, y0 = commune.geo_json['coordinates'][0][0][0]
+        commune.geo_json = {'type': 'MultiPolygon', 'coordinates': [[[
+            [x0, y0], [x0 + 0.01, y0], [x0 + 0.01, y0 + 0.01], [x0, y0 + 0.01], [x0, y0],
+        ]]]}
+        with self.captureOnCommitCallbacks(execute=True):
+            commune.save()
+
+        commune.refresh_from_db()
+        self.assertEqual(set(commune.geo_json_simplified), set(RESOLUTIONS))
+        rebuilt = set(Commune.objects.exclude(geo_json_simplified={}).values_list('adm3_pcode', flat=True))
+        self.assertIn('MR0101001', rebuilt)
+        # Communes sans contact avec la zone enregistrée : inchangées
+        self.assertLess(len(rebuilt), Commune.objects.count())
+
+    def test_local_rebuild_matches_full_rebuild(self):
+        rebuild_simplified_geometries(Commune)
+        full = dict(Commune.objects.values_list('pk', 'geo_json_simplified'))
+        Commune.objects.update(geo_json_simplified={})
+        saved = Commune.objects.get(adm3_pcode='MR0101001').pk
+        count = rebuild_simplified_geometries(Commune, [saved])
+        local = dict(Commune.objects.exclude(geo_json_simplified={}).values_list('pk', 'geo_json_simplified'))
+        self.assertEqual(len(local), count)
+        self.assertEqual(local, {pk: full[pk] for pk in local})
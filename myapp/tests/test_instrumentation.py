@@ -0,0 +1,40 @@
+from django.test import SimpleTestCase
+from django.urls import reverse
+
+from myapp.instrumentation import MetricsStore, RequestSample, get_metrics_store, percentile
+
+from .base import DatasetTestCase
+
+
+class PercentileTests(SimpleTestCase):
+    def test_nearest_rank(self):
+        self.assertEqual(percentile([1, 2, 3, 4, 5], 0.5), 3)
+        self.assertEqual(percentile([1, 2, 3, 4], 0.5), 2)
+        self.assertEqual(percentile(list(range(1, 101)), 0.95), 95)
+        self.assertEqual(percentile([7], 0.99), 7)
+
+
+class MetricsStoreTests(SimpleTestCase):
+    def test_sliding_window(self):
+        store = MetricsStore(window=3)
+        for duration in (0.5, 0.1, 0.2, 0.3):
+            store.record('GET region-list', RequestSample(duration, 2, 0.01, 0.0, 100, 1, 200))
+        row, = store.summary()
+        self.assertEqual((row['requests'], row['window']), (4, 3))
+        self.assertEqual(row['p50_ms'], 200.0)
+        self.assertEqual(row['total_ms'], 600.0)
+
+
+class RequestMetricsMiddlewareTests(DatasetTestCase):
+    def setUp(self):
+        super().setUp()
+        get_metrics_store().reset()
+
+    def test_records_requests(self):
+        self.client.get(reverse('region-list'))
+        self.client.get(reverse('region-list'))
+        rows = {row['view']: row for row in get_metrics_store().summary()}
+        row = rows['GET region-list']
+        self.assertEqual(row['requests'], 2)
+        self.assertGreater(row['queries_max'], 0)
+        self.assertGreater(row['bytes_avg'], 0)
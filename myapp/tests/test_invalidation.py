@@ -0,0 +1,46 @@
+from django.db import transaction
+from django.test import TestCase
+
+from myapp.invalidation import suppress_invalidation
+from myapp.models import DemographicData, Region
+from myapp.versioning import BOUNDARIES, get_version
+
+from .base import create_small_dataset
+
+
+class InvalidationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.census = create_small_dataset()[-1]
+
+    def data_version(self):
+        self.census.refresh_from_db(fields=['data_version'])
+        return self.census.data_version
+
+    def test_save_bumps_once_at_commit(self):
+        before = self.data_version()
+        rows = DemographicData.objects.filter(census=self.census, level='commune')[:3]
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                for row in rows:
+                    row.total_population += 1
+                    row.save()
+                self.assertEqual(self.data_version(), before)
+        self.assertEqual(self.data_version(), before + 1)
+
+    def test_suppressed_saves(self):
+        before = self.data_version()
+        row = DemographicData.objects.filter(census=self.census).first()
+        with self.captureOnCommitCallbacks(execute=True):
+            with suppress_invalidation():
+                row.save()
+        self.assertEqual(self.data_version(), before)
+
+    def test_boundary_save_bumps_boundaries(self):
+        before = get_version(BOUNDARIES)
+        region = Region.objects.get(adm1_pcode='MR01')
+        region.adm1_en = 'Région renommée'
+        with self.captureOnCommitCallbacks(execute=True):
+            region.save(update_fields=['adm1_en'])
+        self.assertGreater(get_version(BOUNDARIES), before)
+        self.assertEqual(self.data_version(), self.census.data_version)
@@ -0,0 +1,139 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+
+from django.apps import apps
+from django.core.management import call_command
+from django.db import IntegrityError, connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+
+from myapp.models import Commune, DemographicData
+from myapp.synthetic import boundary_layout, create_dataset
+
+from .base import LAYOUT, create_small_dataset
+
+
+class PcodeRenameTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.census = create_small_dataset()[-1]
+
+    def data_version(self):
+        self.census.refresh_from_db(fields=['data_version'])
+        return self.census.data_version
+
+    def test_pcode_rename_syncs_zone_pcode(self):
+        before = self.data_version()
+        commune = Commune.objects.get(adm3_pcode='MR0101001')
+        commune.adm3_pcode = 'MR0101901'
+        with self.captureOnCommitCallbacks(execute=True):
+            commune.save(update_fields=['adm3_pcode'])
+        self.assertEqual(
+            set(DemographicData.objects.filter(commune=commune).values_list('zone_pcode', flat=True)), {'MR0101901'},
+        )
+        self.assertFalse(DemographicData.objects.filter(zone_pcode='MR0101001').exists())
+        self.assertEqual(self.data_version(), before + 1)
+
+
+class SetZoneTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_small_dataset(years=[2023])
+
+    def test_save_without_zone_query(self):
+        row = DemographicData.objects.get(zone_pcode='MR0101001')
+        row.total_population += 1
+        with CaptureQueriesContext(connection) as queries:
+            row.save()
+        # Zone inchangée : ni niveau ni code recalculés depuis les tables de limites
+        self.assertFalse([q['sql'] for q in queries if 'myapp_commune' in q['sql']])
+
+    def test_zone_change(self):
+        DemographicData.objects.filter(zone_pcode='MR0101002').delete()
+        row = DemographicData.objects.get(zone_pcode='MR0101001')
+        row.commune = Commune.objects.get(adm3_pcode='MR0101002')
+        row.save()
+        row.refresh_from_db()
+        self.assertEqual((row.level, row.zone_pcode), ('commune', 'MR0101002'))
+
+    def test_zone_fields_deferred(self):
+        row = DemographicData.objects.only('pk', 'total_population').get(zone_pcode='MR0101001')
+        row.total_population += 1
+        row.save()
+        row.refresh_from_db()
+        self.assertEqual((row.level, row.zone_pcode), ('commune', 'MR0101001'))
+
+
+class LevelMigrationTests(TransactionTestCase):
+    """0021 : niveau et code de zone renseignés ; échec tant que des doublons restent"""
+    # Vidage en cascade (tables d'anciens modèles encore liées aux limites)
+    available_apps = [config.name for config in apps.get_app_configs()]
+    before = [('myapp', '0020_demographicdata_level_zone_pcode')]
+    after = [('myapp', '0023_demographicdata_zone_census_idx')]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        with contextlib.redirect_stdout(io.StringIO()):
+            executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        self.migrate(self.after)
+
+    def add_duplicate(self):
+        create_dataset(layout=boundary_layout(**LAYOUT), years=[2023])
+        historical = self.migrate(self.before)
+        HistoricalData = historical.get_model('myapp', 'DemographicData')
+        HistoricalData.objects.update(level='', zone_pcode='')
+        original = HistoricalData.objects.filter(commune__adm3_pcode='MR0101001').get()
+        duplicate_pk = original.pk
+        original.pk = None
+        original.total_population += 1
+        original.save()
+        return duplicate_pk, original.pk
+
+    def test_populates_levels(self):
+        create_dataset(layout=boundary_layout(**LAYOUT), years=[2023])
+        historical = self.migrate(self.before)
+        historical.get_model('myapp', 'DemographicData').objects.update(level='', zone_pcode='')
+        self.migrate(self.after)
+
+        self.assertFalse(DemographicData.objects.filter(level='').exists())
+        self.assertEqual(DemographicData.objects.get(zone_pcode='MR0101001').level, 'commune')
+        self.assertEqual(
+            dict(DemographicData.objects.filter(level='region').values_list('zone_pcode', 'region__adm1_pcode')),
+            {'MR01': 'MR01', 'MR02': 'MR02'},
+        )
+        self.assertEqual(DemographicData.objects.get(level='country').zone_pcode, 'MR')
+
+    def test_duplicates_block_migration(self):
+        duplicate_pk, kept_pk = self.add_duplicate()
+        with self.assertRaisesMessage(IntegrityError, 'dedupe_demographics'):
+            self.migrate(self.after)
+        # Rien n'est supprimé par la migration
+        self.assertTrue(DemographicData.objects.filter(pk=duplicate_pk).exists())
+
+        with tempfile.TemporaryDirectory() as directory:
+            backup = os.path.join(directory, 'duplicates.json')
+            call_command('dedupe_demographics', backup=backup, stdout=io.StringIO())
+            with open(backup, encoding='utf-8') as f:
+                saved = json.load(f)
+        self.assertEqual([obj['pk'] for obj in saved if obj['model'] == 'myapp.demographicdata'], [duplicate_pk])
+
+        self.migrate(self.after)
+        kept = DemographicData.objects.get(zone_pcode='MR0101001')
+        self.assertEqual((kept.pk, kept.level), (kept_pk, 'commune'))
+
+    def test_dedupe_dry_run(self):
+        duplicate_pk, _ = self.add_duplicate()
+        out = io.StringIO()
+        call_command('dedupe_demographics', dry_run=True, stdout=out)
+        self.assertIn(f'commune: 1 duplicate rows (pk {duplicate_pk})', out.getvalue())
+        self.assertTrue(DemographicData.objects.filter(pk=duplicate_pk).exists())
+        call_command('dedupe_demographics', stdout=io.StringIO())
+        self.migrate(self.after)
@@ -0,0 +1,51 @@
+import gzip
+import itertools
+import unittest
+
+from django.apps import apps
+from django.test import LiveServerTestCase, SimpleTestCase, override_settings
+
+from myapp import loadtest
+from myapp.response_cache import brotli_available, clear_response_cache
+
+from .base import create_small_dataset
+
+
+class DecodeBodyTests(SimpleTestCase):
+    def test_gzip(self):
+        self.assertEqual(loadtest.decode_body(gzip.compress(b'[1]'), 'gzip'), b'[1]')
+
+    @unittest.skipUnless(brotli_available(), 'brotli non installé')
+    def test_brotli(self):
+        import brotli
+
+        self.assertEqual(loadtest.decode_body(brotli.compress(b'[1]'), 'br'), b'[1]')
+
+    def test_identity(self):
+        self.assertEqual(loadtest.decode_body(b'[1]', None), b'[1]')
+
+
+@override_settings(RESPONSE_CACHE_BACKEND='memory', RESPONSE_CACHE_BROTLI_UPGRADE_QUALITY=None)
+class LoadTestServerTests(LiveServerTestCase):
+    # Vidage en cascade (tables d'anciens modèles encore liées aux limites)
+    available_apps = [config.name for config in apps.get_app_configs()]
+
+    def setUp(self):
+        clear_response_cache()
+        create_small_dataset()
+
+    def test_discover_compressed_responses(self):
+        # Deux fois : la seconde lecture est servie compressée depuis le cache de réponses
+        for _ in range(2):
+            catalog = loadtest.discover(self.live_server_url)
+            self.assertEqual(catalog['years'], [2013, 2023])
+            self.assertEqual(len(catalog['commune']), 8)
+
+    def test_run_load(self):
+        catalog = loadtest.discover(self.live_server_url)
+        sessions = itertools.islice(loadtest.scripted_sessions(catalog, export_all_ratio=0), 4)
+        results = loadtest.run_load(self.live_server_url, sessions, concurrency=2, think_factor=0)
+        self.assertEqual(results.sessions, 4)
+        self.assertNotIn(None, results.statuses)
+        self.assertFalse(results.errors)
+        self.assertTrue(all(results.bytes[label] >= results.wire_bytes[label] for label in results.bytes))
@@ -0,0 +1,40 @@
+from django.urls import reverse
+from shapely.geometry import shape
+
+from myapp.models import Commune
+from myapp.spatial_index import get_commune_index
+
+from .base import DatasetTestCase
+
+
+class LocateTests(DatasetTestCase):
+    def point_in(self, pcode):
+        point = shape(Commune.objects.get(adm3_pcode=pcode).geo_json).representative_point()
+        return {'lon': point.x, 'lat': point.y}
+
+    def test_commune_and_parents(self):
+        response = self.client.get(reverse('locate'), {**self.point_in('MR0101001'), 'year': 2013})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(
+            (data['commune']['adm3_pcode'], data['department']['adm2_pcode'], data['region']['adm1_pcode']),
+            ('MR0101001', 'MR0101', 'MR01'),
+        )
+        self.assertEqual(data['census'], 2013)
+        self.assertEqual(
+            data['region']['demographic_data']['total_population'], self.population(2013, 'MR01'),
+        )
+
+    def test_border_point(self):
+        # Sommet partagé par plusieurs communes : locate et locate_many choisissent la même
+        x, y = Commune.objects.get(adm3_pcode='MR0101001').geo_json['coordinates'][0][0][2]
+        index = get_commune_index()
+        position = index.locate(x, y)
+        self.assertIsNotNone(position)
+        self.assertEqual(index.locate_many([x], [y]).tolist(), [position])
+
+    def test_errors(self):
+        self.assertEqual(self.client.get(reverse('locate'), {'lat': 'abc', 'lon': 0}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('locate'), {'lat': 0, 'lon': 0}).status_code, 404)
+        response = self.client.get(reverse('locate'), {**self.point_in('MR0101001'), 'year': 'abc'})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,42 @@
+import json
+
+from django.test import override_settings
+from django.urls import reverse
+
+from myapp.models import Commune, DemographicData
+
+from .base import DatasetTestCase
+
+
+class KeysetPaginationTests(DatasetTestCase):
+    def test_cursor_pages(self):
+        url = reverse('commune-list')
+        response = self.client.get(url, {'page_size': 3, 'fields': 'id'})
+        self.assertEqual(response.status_code, 200)
+        ids = []
+        while True:
+            data = response.json()
+            ids += [row['id'] for row in data['results']]
+            if not data['next']:
+                break
+            self.assertLessEqual(len(data['results']), 3)
+            response = self.client.get(data['next'])
+        self.assertEqual(ids, list(Commune.objects.order_by('pk').values_list('pk', flat=True)))
+
+    def test_page_size_is_bounded(self):
+        response = self.client.get(reverse('demographics-list-create'), {'page_size': 100000})
+        self.assertEqual(response.status_code, 200)
+        self.assertLessEqual(len(response.json()['results']), 1000)
+
+    def test_stream(self):
+        response = self.client.get(reverse('commune-list'), {'stream': 1, 'fields': 'adm3_pcode'})
+        self.assertEqual(response.status_code, 200)
+        rows = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(len(rows), 8)
+
+    @override_settings(RESPONSE_CACHE_BACKEND=None)
+    def test_stream_demographics(self):
+        response = self.client.get(reverse('demographics-list-create'), {'stream': 1, 'year': 2013})
+        body = b''.join(response.streaming_content) if response.streaming else response.content
+        rows = json.loads(body)
+        self.assertEqual(len(rows), DemographicData.objects.filter(census__year=2013).count())
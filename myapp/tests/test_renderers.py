@@ -0,0 +1,67 @@
+import datetime
+import io
+import json
+from decimal import Decimal
+from unittest import mock
+
+from django.test import SimpleTestCase
+from django.urls import reverse
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+
+from myapp.models import DemographicData
+from myapp.parsers import FastJSONParser
+from myapp.renderers import FastJSONRenderer, dumps
+from myapp.serializers import FastDecimalField
+
+from .base import DatasetTestCase
+
+SAMPLE = {
+    'rate': Decimal('12.50'),
+    'date': datetime.date(2023, 1, 2),
+    'name': 'Nouakchott-Ouest',
+    'values': [1, 2.5, None],
+}
+
+
+class FastJSONRendererTests(SimpleTestCase):
+    def test_same_output_as_drf(self):
+        self.assertEqual(json.loads(FastJSONRenderer().render(SAMPLE)), json.loads(JSONRenderer().render(SAMPLE)))
+
+    def test_without_orjson(self):
+        with mock.patch.dict('sys.modules', {'orjson': None}):
+            self.assertEqual(FastJSONRenderer().render(SAMPLE), JSONRenderer().render(SAMPLE))
+            self.assertEqual(json.loads(dumps(SAMPLE, indent=2)), json.loads(JSONRenderer().render(SAMPLE)))
+
+    def test_non_ascii(self):
+        self.assertIn('Néma'.encode('utf-8'), dumps({'name': 'Néma'}))
+
+
+class FastJSONParserTests(SimpleTestCase):
+    def parse(self, body, encoding='utf-8'):
+        return FastJSONParser().parse(io.BytesIO(body), parser_context={'encoding': encoding})
+
+    def test_parse(self):
+        self.assertEqual(self.parse('{"name": "Néma"}'.encode('latin-1'), 'latin-1'), {'name': 'Néma'})
+
+    def test_invalid_json(self):
+        with self.assertRaises(ParseError):
+            self.parse(b'{"name":')
+
+
+class FastDecimalFieldTests(SimpleTestCase):
+    def test_representation(self):
+        field = FastDecimalField(max_digits=5, decimal_places=2)
+        self.assertEqual(field.to_representation(Decimal('1.50')), '1.50')
+        self.assertEqual(field.to_representation(Decimal('1.5')), '1.50')
+        self.assertEqual(field.to_representation(Decimal('1E+1')), '10.00')
+
+
+class DemographicsRenderingTests(DatasetTestCase):
+    def test_demographics_list(self):
+        response = self.client.get(reverse('demographics-list-create'), {'year': 2013})
+        self.assertEqual(response.status_code, 200)
+        rows = response.json()['results']
+        self.assertEqual(len(rows), DemographicData.objects.filter(census__year=2013).count())
+        # Décimaux rendus en chaînes, comme avec le rendu DRF
+        self.assertTrue(all(isinstance(row['illiteracy_rate_15_plus'], (str, type(None))) for row in rows))
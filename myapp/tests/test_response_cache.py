@@ -0,0 +1,92 @@
+import gzip
+import json
+import os
+import unittest
+
+from django.db import connection
+from django.http import FileResponse
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+
+from myapp.response_cache import MemoryResponseStore, _write_through, brotli_available
+
+from .base import DatasetTestCase
+
+
+def body(response):
+    return b''.join(response.streaming_content) if response.streaming else response.content
+
+
+class CompressedResponseCacheTests(DatasetTestCase):
+    def test_gzip_variant(self):
+        url = reverse('region-list')
+        plain = self.client.get(url).content
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(gzip.decompress(body(response)), plain)
+
+    @unittest.skipUnless(brotli_available(), 'brotli non installé')
+    def test_brotli_variant(self):
+        import brotli
+
+        url = reverse('region-list')
+        plain = self.client.get(url).content
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(brotli.decompress(body(response)), plain)
+
+    def test_stream_written_through(self):
+        url = reverse('commune-list')
+        params = {'stream': 1, 'fields': 'adm3_pcode'}
+        first = self.client.get(url, params)
+        # Première réponse toujours envoyée en flux, mise en cache pendant la lecture
+        self.assertTrue(first.streaming)
+        content = b''.join(first.streaming_content)
+        self.assertEqual(len(json.loads(content)), 8)
+
+        second = self.client.get(url, params, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(second['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(body(second)), content)
+        # La connexion reste utilisable après la réponse en flux
+        self.assertTrue(connection.is_usable())
+
+
+class WriteThroughTests(SimpleTestCase):
+    def test_complete_stream(self):
+        store = MemoryResponseStore()
+        self.assertEqual(list(_write_through(iter([b'[1,', b'2]']), store.writer('s', 1, 'k'))), [b'[1,', b'2]'])
+        self.assertEqual(gzip.decompress(store.open('s', 1, 'k', 'gzip')), b'[1,2]')
+
+    def test_interrupted_stream_not_cached(self):
+        store = MemoryResponseStore()
+        chunks = _write_through(iter([b'[1,', b'2]']), store.writer('s', 1, 'k'))
+        next(chunks)
+        # Client déconnecté après le premier morceau
+        chunks.close()
+        self.assertEqual(store.encodings('s', 1, 'k'), [])
+
+    def test_size_limit(self):
+        store = MemoryResponseStore(max_bytes=10)
+        self.assertEqual(len(list(_write_through(iter([b'x' * 8] * 4), store.writer('s', 1, 'k')))), 4)
+        self.assertEqual(store.encodings('s', 1, 'k'), [])
+
+
+class FileResponseStoreTests(DatasetTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.enterClassContext(override_settings(
+            RESPONSE_CACHE_BACKEND='file', RESPONSE_CACHE_DIR=os.path.join(cls.cache_dir, 'responses'),
+        ))
+
+    def test_stream_files(self):
+        url = reverse('commune-list')
+        params = {'stream': 1, 'fields': 'adm3_pcode'}
+        content = b''.join(self.client.get(url, params).streaming_content)
+        cached = self.client.get(url, params)
+        self.assertIsInstance(cached, FileResponse)
+        self.assertEqual(body(cached), content)
+        cached.close()
+        names = [name for _, _, files in os.walk(os.path.join(self.cache_dir, 'responses')) for name in files]
+        self.assertFalse([name for name in names if name.endswith('.tmp')])
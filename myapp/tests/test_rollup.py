@@ -0,0 +1,45 @@
+from django.urls import reverse
+
+from myapp.models import DemographicData
+from myapp.rollup import COUNT_FIELDS
+
+from .base import DatasetTestCase
+
+
+class RollupTests(DatasetTestCase):
+    def test_region_totals(self):
+        response = self.client.get(reverse('rollup'), {'by': 'region', 'year': 2023})
+        self.assertEqual(response.status_code, 200)
+        zones = response.json()['zones']
+        communes = DemographicData.objects.filter(census__year=2023, level='commune', region__adm1_pcode='MR01')
+        self.assertEqual(zones['MR01']['total_population'], sum(row.total_population for row in communes))
+
+    def test_stored_rollup_rows(self):
+        # Lignes agrégées rattachées à leurs niveaux supérieurs (pays, région)
+        row = DemographicData.objects.get(census__year=2023, zone_pcode='MR0101')
+        self.assertEqual(row.level, 'department')
+        self.assertIsNotNone(row.country_id)
+        self.assertEqual(row.region.adm1_pcode, 'MR01')
+
+    def test_groups(self):
+        response = self.client.post(reverse('rollup'), {
+            'year': 2023, 'groups': {'deux': ['MR0101001', 'MR0101002']},
+        }, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json()['groups']['deux']['total_population'],
+            self.population(2023, 'MR0101001') + self.population(2023, 'MR0101002'),
+        )
+
+    def test_invalid_bodies(self):
+        for body in ([2023], {'year': 2023, 'groups': {'g': [1, 2]}}, {'year': 'abc', 'groups': {}}):
+            response = self.client.post(reverse('rollup'), body, content_type='application/json')
+            self.assertEqual(response.status_code, 400, body)
+
+
+class TotalsTests(DatasetTestCase):
+    def test_country_row_sums_communes(self):
+        country = DemographicData.objects.get(census__year=2013, level='country')
+        communes = DemographicData.objects.filter(census__year=2013, level='commune')
+        for field in COUNT_FIELDS:
+            self.assertEqual(getattr(country, field), sum(getattr(row, field) for row in communes), field)
@@ -0,0 +1,73 @@
+import json
+
+from django.test import override_settings
+from django.urls import reverse
+
+from myapp import rankings
+from myapp.choropleth import build_choropleth
+from myapp.models import Census, DemographicData
+from myapp.serializers import DemographicDataSerializer
+from myapp.snapshot import clear_snapshots, get_census_snapshot
+from myapp.versioning import get_census_state
+
+from .base import DatasetTestCase
+
+
+@override_settings(CENSUS_SNAPSHOT_ENABLED=True)
+class CensusSnapshotTests(DatasetTestCase):
+    def setUp(self):
+        super().setUp()
+        clear_snapshots()
+        self.census = Census.objects.get(year=2023)
+
+    def snapshot(self):
+        census_id, _, data_version, _ = get_census_state(2023)
+        return get_census_snapshot(census_id, data_version)
+
+    def test_records_match_serializer(self):
+        rows = DemographicData.objects.filter(census=self.census).select_related('educationlevel').order_by('pk')
+        serialized = json.loads(json.dumps(DemographicDataSerializer(rows, many=True).data))
+        records = json.loads(self.snapshot().records_json())
+        self.assertEqual(len(records), len(serialized))
+        for record, row in zip(records, serialized):
+            education = row.pop('education_level')
+            self.assertEqual({key: record[key] for key in row}, row)
+            self.assertEqual(
+                {key: value for key, value in record['education_level'].items()},
+                {key: education[key] for key in record['education_level']},
+            )
+
+    def test_choropleth_and_ranking_match_orm(self):
+        snapshot = self.snapshot()
+        for level in ('region', 'commune'):
+            self.assertEqual(
+                build_choropleth(level, self.census, 'illiteracy_rate_15_plus', snapshot=snapshot),
+                build_choropleth(level, self.census, 'illiteracy_rate_15_plus'),
+            )
+            self.assertEqual(
+                rankings.build_ranking(level, self.census, 'total_population', 'desc', 5, snapshot),
+                rankings.build_ranking(level, self.census, 'total_population', 'desc', 5),
+            )
+
+    def test_rebuilt_on_new_version(self):
+        snapshot = self.snapshot()
+        self.assertIs(self.snapshot(), snapshot)
+        row = DemographicData.objects.get(census=self.census, zone_pcode='MR0101001')
+        row.total_population += 1
+        with self.captureOnCommitCallbacks(execute=True):
+            row.save()
+        rebuilt = self.snapshot()
+        self.assertIsNot(rebuilt, snapshot)
+        self.assertEqual(
+            rebuilt.indicator_values('commune', 'total_population')[row.commune_id], row.total_population,
+        )
+
+    def test_stream_served_from_snapshot(self):
+        response = self.client.get(reverse('demographics-list-create'), {'year': 2023, 'stream': 1})
+        self.assertEqual(response.status_code, 200)
+        body = b''.join(response.streaming_content) if response.streaming else response.content
+        self.assertEqual(len(json.loads(body)), DemographicData.objects.filter(census=self.census).count())
+
+    @override_settings(CENSUS_SNAPSHOT_ENABLED=False)
+    def test_disabled(self):
+        self.assertIsNone(self.snapshot())
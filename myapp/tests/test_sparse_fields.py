@@ -0,0 +1,30 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .base import DatasetTestCase
+
+
+class SparseFieldsetTests(DatasetTestCase):
+    def get(self, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('commune-list'), {'page_size': 100, **params})
+        self.assertEqual(response.status_code, 200)
+        return response.json()['results'], ' '.join(query['sql'] for query in queries)
+
+    def test_fields(self):
+        rows, sql = self.get(fields='adm3_pcode,adm3_en')
+        self.assertEqual(len(rows), 8)
+        self.assertEqual(set(rows[0]), {'adm3_pcode', 'adm3_en'})
+        self.assertNotIn('geo_json', sql)
+
+    def test_omit_geometry(self):
+        rows, sql = self.get(omit='geo_json')
+        self.assertIn('adm3_pcode', rows[0])
+        self.assertNotIn('geo_json', rows[0])
+        self.assertNotIn('"geo_json', sql)
+
+    def test_unknown_field(self):
+        response = self.client.get(reverse('commune-list'), {'fields': 'adm3_pcode,population'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('population', response.json()['fields'])
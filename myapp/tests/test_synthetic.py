@@ -0,0 +1,80 @@
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.db.models import Sum
+from django.test import SimpleTestCase, TestCase
+from shapely.geometry import shape
+
+from myapp import synthetic
+from myapp.models import Census, Commune, DemographicData, Department, EducationLevel
+from myapp.rollup import EDUCATION_FIELDS
+
+from .base import LAYOUT, create_small_dataset
+
+
+class LayoutTests(SimpleTestCase):
+    def test_nested_zones(self):
+        layout = synthetic.boundary_layout(**LAYOUT)
+        departments = [department for region in layout for department in region.children]
+        communes = [commune for department in departments for commune in department.children]
+        self.assertEqual((len(layout), len(departments), len(communes)), (2, 4, 8))
+        for department in departments:
+            outline = shape(department.geometry).buffer(1e-9)
+            self.assertTrue(all(outline.contains(shape(commune.geometry)) for commune in department.children))
+
+    def test_scale(self):
+        communes = sum(
+            len(department.children)
+            for region in synthetic.boundary_layout(scale=3, **LAYOUT) for department in region.children
+        )
+        self.assertEqual(communes, 24)
+
+    def test_seeded_values(self):
+        profiles = synthetic.commune_profiles(20, seed=4)
+        first, _ = synthetic.census_values(profiles, 5, seed=4)
+        second, _ = synthetic.census_values(synthetic.commune_profiles(20, seed=4), 5, seed=4)
+        self.assertEqual(first['total_population'].tolist(), second['total_population'].tolist())
+
+    def test_percentages_sum_to_100(self):
+        _, education = synthetic.census_values(synthetic.commune_profiles(50), 0)
+        totals = sum(education[field] for field in EDUCATION_FIELDS)
+        self.assertTrue(all(abs(total - 100) < 1e-6 for total in totals))
+
+
+class CreateDatasetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.censuses = create_small_dataset()
+
+    def test_rows(self):
+        for census in self.censuses:
+            rows = DemographicData.objects.filter(census=census)
+            # pays + 2 régions + 4 départements + 8 communes
+            self.assertEqual(rows.count(), 15)
+            self.assertEqual(EducationLevel.objects.filter(demographic_data__census=census).count(), 15)
+
+    def test_hierarchy_is_consistent(self):
+        census = self.censuses[0]
+        for department in Department.objects.all():
+            total = DemographicData.objects.filter(
+                census=census, level='commune', department=department,
+            ).aggregate(total=Sum('total_population'))['total']
+            row = DemographicData.objects.get(census=census, level='department', department=department)
+            self.assertEqual(row.total_population, total)
+
+    def test_simplified_geometries(self):
+        self.assertFalse(Commune.objects.filter(geo_json_simplified={}).exists())
+
+
+class GenerateSyntheticCensusCommandTests(TestCase):
+    def test_generate(self):
+        out = StringIO()
+        call_command('generate_synthetic_census', censuses=2, step=5, scale=0.1, skip_diffs=True, stdout=out)
+        self.assertEqual(list(Census.objects.order_by('year').values_list('year', flat=True)), [2023, 2028])
+        self.assertTrue(Census.objects.get(year=2028).is_projection)
+        self.assertIn('2028 (projection)', out.getvalue())
+
+    def test_refuses_existing_data(self):
+        create_small_dataset(years=[2023])
+        with self.assertRaisesMessage(CommandError, '--flush'):
+            call_command('generate_synthetic_census', stdout=StringIO())
@@ -0,0 +1,37 @@
+import mapbox_vector_tile
+from django.urls import reverse
+
+from myapp.models import DemographicData
+
+from .base import DatasetTestCase
+
+
+class VectorTileTests(DatasetTestCase):
+    def tile(self, level='region', z=0, x=0, y=0, **params):
+        return self.client.get(reverse('vector-tile', args=[level, z, x, y]), params)
+
+    def test_features_and_indicators(self):
+        response = self.tile(year=2013, HTTP_ACCEPT='application/x-protobuf')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/vnd.mapbox-vector-tile')
+        layer = mapbox_vector_tile.decode(response.content)['region']
+        self.assertEqual(layer['extent'], 4096)
+        properties = {feature['properties']['pcode']: feature['properties'] for feature in layer['features']}
+        self.assertEqual(sorted(properties), ['MR01', 'MR02'])
+        row = DemographicData.objects.get(census__year=2013, zone_pcode='MR01')
+        self.assertEqual(properties['MR01']['total_population'], row.total_population)
+        self.assertAlmostEqual(properties['MR01']['urban_percentage'], float(row.urban_percentage))
+
+    def test_empty_tile(self):
+        # Tuile du Pacifique : aucune zone
+        self.assertEqual(self.tile(z=4, x=0, y=0).status_code, 204)
+
+    def test_json_errors(self):
+        for response, status in (
+            (self.tile(year='abc'), 400),
+            (self.tile(year=1990, HTTP_ACCEPT='application/x-protobuf'), 404),
+            (self.tile(level='canton'), 400),
+            (self.tile(z=2, x=4), 400),
+        ):
+            self.assertEqual(response.status_code, status)
+            self.assertEqual(response['Content-Type'], 'application/json')
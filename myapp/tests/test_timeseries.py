@@ -0,0 +1,25 @@
+from django.urls import reverse
+
+from .base import YEARS, DatasetTestCase
+
+
+class TimeSeriesTests(DatasetTestCase):
+    def test_series_by_zone(self):
+        response = self.client.get(reverse('timeseries'), {'pcodes': 'MR01,MR0101001,XX99'})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['years'], YEARS)
+        self.assertEqual(data['series']['MR01']['level'], 'region')
+        self.assertEqual(data['series']['MR0101001']['total_population'], [
+            self.population(year, 'MR0101001') for year in YEARS
+        ])
+        self.assertEqual(data['missing'], ['XX99'])
+
+    def test_requires_pcodes(self):
+        response = self.client.get(reverse('timeseries'))
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('pcodes', response.json())
+
+    def test_unknown_indicator(self):
+        response = self.client.get(reverse('timeseries'), {'pcodes': 'MR01', 'indicators': 'inconnu'})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,51 @@
+from collections import Counter
+from unittest import mock
+
+from django.core.cache import cache
+from django.urls import reverse
+
+from .base import DatasetTestCase
+
+
+def arc_indices(arcs):
+    """Index des arcs référencés (~i : arc i parcouru à l'envers)"""
+    if isinstance(arcs, int):
+        return [arcs if arcs >= 0 else ~arcs]
+    return [index for item in arcs for index in arc_indices(item)]
+
+
+class TopoJSONTests(DatasetTestCase):
+    def test_boundaries_topology(self):
+        response = self.client.get(reverse('boundaries-topojson'), {'resolution': 'low'})
+        self.assertEqual(response.status_code, 200)
+        topology = response.json()
+        self.assertEqual(topology['type'], 'Topology')
+        counts = {name: len(layer['geometries']) for name, layer in topology['objects'].items()}
+        self.assertEqual(counts, {'regions': 2, 'departments': 4, 'communes': 8})
+        # La frontière entre les deux régions n'est encodée qu'une fois
+        uses = Counter(
+            index for geometry in topology['objects']['regions']['geometries']
+            for index in set(arc_indices(geometry['arcs']))
+        )
+        self.assertIn(2, uses.values())
+
+    def test_list_format(self):
+        response = self.client.get(reverse('region-list'), {'format': 'topojson', 'fields': 'adm1_pcode,geo_json'})
+        self.assertEqual(response.status_code, 200)
+        geometries = response.json()['objects']['regions']['geometries']
+        self.assertEqual(sorted(geometry['properties']['adm1_pcode'] for geometry in geometries), ['MR01', 'MR02'])
+
+    def test_cached_with_finite_timeout(self):
+        with mock.patch.object(cache, 'set', wraps=cache.set) as cache_set:
+            self.client.get(reverse('boundaries-topojson'))
+            self.client.get(reverse('region-list'), {'format': 'topojson'})
+        self.assertEqual(cache_set.call_count, 2)
+        for call in cache_set.call_args_list:
+            # Délai par défaut du cache (CACHE_TIMEOUT) : les versions périmées finissent par expirer
+            self.assertEqual(len(call.args), 2)
+            self.assertNotIn('timeout', call.kwargs)
+
+    def test_json_errors(self):
+        response = self.client.get(reverse('boundaries-topojson'), {'quantization': 'abc'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('quantization', response.json())
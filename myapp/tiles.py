@@ -0,0 +1,203 @@
+"""Génération de tuiles vectorielles Mapbox (MVT) pour les limites administratives
+
+Les géométries sont projetées une fois en coordonnées « monde » web mercator
+normalisées ([0, 1], axe y vers le bas), puis chaque tuile est découpée,
+ramenée sur une grille de EXTENT pixels et encodée par mapbox_vector_tile
+(spécification Mapbox Vector Tile 2.1 ; orientation des anneaux et géométries
+invalides gérées par la bibliothèque).
+"""
+import glob
+import math
+import os
+import shutil
+import threading
+from decimal import Decimal
+
+from django.conf import settings
+
+from .geometry import FULL_RESOLUTION, resolution_for_zoom
+from .models import Region, Department, Commune, DemographicData
+from .versioning import BOUNDARIES, get_version
+
+EXTENT = 4096
+# Marge autour de la tuile (en pixels) pour éviter les artefacts de rendu aux bords
+BUFFER = 64
+MAX_ZOOM = 16
+CONTENT_TYPE = 'application/vnd.mapbox-vector-tile'
+
+LEVELS = {
+    'region': {'model': Region, 'name': 'adm1_en', 'pcode': 'adm1_pcode'},
+    'department': {'model': Department, 'name': 'adm2_en', 'pcode': 'adm2_pcode'},
+    'commune': {'model': Commune, 'name': 'adm3_en', 'pcode': 'adm3_pcode'},
+}
+
+INDICATOR_FIELDS = [
+    'total_population', 'male_percentage', 'female_percentage',
+    'urban_percentage', 'rural_percentage', 'population_10_plus',
+    'single_rate', 'married_rate', 'divorced_rate', 'widowed_rate',
+    'school_enrollment_rate', 'illiteracy_rate_10_plus',
+    'population_15_plus', 'illiteracy_rate_15_plus',
+]
+
+_layers = {}
+_layers_lock = threading.Lock()
+
+
+def get_tile_cache_dir():
+    return getattr(settings, 'TILE_CACHE_DIR', os.path.join(settings.BASE_DIR, 'cache', 'tiles'))
+
+
+def tile_cache_path(level, census, z, x, y):
+    """Chemin d'une tuile en cache : les versions des limites et du recensement en font
+    partie, une tuile n'est donc jamais servie après une modification des données"""
+    census_key = f'{census.year}-v{census.data_version}' if census else 'none'
+    boundary_key = f'b{get_version(BOUNDARIES)}'
+    return os.path.join(get_tile_cache_dir(), level, boundary_key, census_key, str(z), str(x), f'{y}.mvt')
+
+
+def clear_tile_cache(level=None, census=None):
+    """Supprime les tuiles en cache (toutes, ou pour un niveau / un recensement)
+
+    Vide aussi les couches géométriques gardées en mémoire par ce processus.
+    """
+    root = get_tile_cache_dir()
+    levels = [level] if level else list(LEVELS)
+    for name in levels:
+        if census is None:
+            paths = [os.path.join(root, name)]
+        else:
+            paths = glob.glob(os.path.join(root, name, '*', f'{census.year}-v*'))
+        for path in paths:
+            shutil.rmtree(path, ignore_errors=True)
+    if census is None:
+        with _layers_lock:
+            _layers.clear()
+
+
+def lonlat_to_world(coords):
+    """Convertit un tableau (n, 2) lon/lat en coordonnées monde web mercator normalisées"""
+    import numpy as np
+
+    lon = coords[:, 0]
+    lat = np.clip(coords[:, 1], -85.05112878, 85.05112878)
+    x = (lon + 180.0) / 360.0
+    sin_lat = np.sin(np.radians(lat))
+    y = 0.5 - np.log((1 + sin_lat) / (1 - sin_lat)) / (4 * math.pi)
+    return np.column_stack([x, y])
+
+
+def get_layer(level, resolution):
+    """Retourne les géométries projetées d'un niveau (mises en cache en mémoire)
+
+    Résultat : (liste de (pk, nom, pcode), tableau de géométries shapely, STRtree)
+    """
+    key = (level, resolution, get_version(BOUNDARIES))
+    layer = _layers.get(key)
+    if layer is not None:
+        return layer
+
+    import numpy as np
+    import shapely
+    from shapely.geometry import shape
+
+    config = LEVELS[level]
+    geometry_field = 'geo_json' if resolution == FULL_RESOLUTION else 'geo_json_simplified'
+    rows = config['model'].objects.values_list('pk', config['name'], config['pcode'], geometry_field)
+
+    features = []
+    geometries = []
+    for pk, name, pcode, geometry in rows:
+        if resolution != FULL_RESOLUTION:
+            geometry = (geometry or {}).get(resolution)
+        if not geometry:
+            continue
+        features.append((pk, name, pcode))
+        geometries.append(shapely.transform(shape(geometry), lonlat_to_world))
+    geometries = np.array(geometries, dtype=object)
+    layer = (features, geometries, shapely.STRtree(geometries))
+    with _layers_lock:
+        # Les couches d'une version précédente des limites ne serviront plus
+        for stale in [k for k in _layers if k[2] != key[2]]:
+            del _layers[stale]
+        _layers[key] = layer
+    return layer
+
+
+def get_indicators(level, census):
+    """Indicateurs démographiques du recensement, indexés par pk de la zone"""
+    if census is None:
+        return {}
+    queryset = DemographicData.objects.filter(census=census, level=level)
+    return {
+        row[level]: row
+        for row in queryset.values(level, *INDICATOR_FIELDS)
+    }
+
+
+def tile_polygons(geometry):
+    """Surfaces d'une géométrie découpée (un découpage peut produire des lignes ou des points)"""
+    from shapely.geometry import MultiPolygon, Polygon
+
+    if isinstance(geometry, (Polygon, MultiPolygon)):
+        return geometry
+    polygons = [part for part in getattr(geometry, 'geoms', []) if isinstance(part, Polygon)]
+    return MultiPolygon(polygons) if polygons else None
+
+
+def build_tile(level, census, z, x, y):
+    """Construit la tuile MVT (bytes) d'un niveau administratif"""
+    import mapbox_vector_tile
+    import shapely
+    from mapbox_vector_tile.encoder import on_invalid_geometry_make_valid
+
+    features, geometries, tree = get_layer(level, resolution_for_zoom(z))
+    scale = 2 ** z
+    buffer = BUFFER / EXTENT
+    bounds = ((x - buffer) / scale, (y - buffer) / scale, (x + 1 + buffer) / scale, (y + 1 + buffer) / scale)
+
+    indices = tree.query(shapely.box(*bounds))
+    if not len(indices):
+        return b''
+    indicators = get_indicators(level, census)
+
+    tile_features = []
+    for index in sorted(indices):
+        clipped = tile_polygons(shapely.clip_by_rect(geometries[index], *bounds))
+        if clipped is None or clipped.is_empty:
+            continue
+        pk, name, pcode = features[index]
+        properties = {'id': pk, 'name': name, 'pcode': pcode}
+        for field, value in indicators.get(pk, {}).items():
+            if field != level and value is not None:
+                properties[field] = float(value) if isinstance(value, Decimal) else value
+        tile_features.append({
+            'id': pk,
+            # Coordonnées tuile (pixels, y vers le bas) : arrondies par l'encodeur
+            'geometry': shapely.transform(clipped, lambda coords: (coords * scale - (x, y)) * EXTENT),
+            'properties': properties,
+        })
+    if not tile_features:
+        return b''
+    return mapbox_vector_tile.encode([{'name': level, 'features': tile_features}], default_options={
+        'extents': EXTENT,
+        'y_coord_down': True,
+        'on_invalid_geometry': on_invalid_geometry_make_valid,
+    })
+
+
+def get_tile(level, census, z, x, y):
+    """Lit la tuile depuis le cache disque, ou la construit et l'y enregistre"""
+    path = tile_cache_path(level, census, z, x, y)
+    try:
+        with open(path, 'rb') as f:
+            return f.read()
+    except FileNotFoundError:
+        pass
+
+    data = build_tile(level, census, z, x, y)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return data
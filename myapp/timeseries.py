@@ -0,0 +1,74 @@
+"""Séries chronologiques d'indicateurs pour une liste de zones, sur tous les recensements
+
+Les codes demandés peuvent mêler les niveaux (pays, région, département,
+commune). Les données sont lues en une requête sur le code de zone dénormalisé,
+par l'index (zone_pcode, census) : le coût dépend du nombre de zones
+demandées, pas de la taille de la table.
+"""
+from decimal import Decimal
+
+from django.db.models import Q
+
+from .models import Census, DemographicData
+from .rollup import EDUCATION_FIELDS
+from .tiles import INDICATOR_FIELDS
+
+MAX_ZONES = 200
+
+# Niveau → (champ code, champ nom) vus depuis DemographicData
+ZONE_FIELDS = {
+    'commune': ('commune__adm3_pcode', 'commune__adm3_en'),
+    'department': ('department__adm2_pcode', 'department__adm2_en'),
+    'region': ('region__adm1_pcode', 'region__adm1_en'),
+    'country': ('country__code', 'country__name'),
+}
+
+
+def indicator_column(indicator):
+    """Colonne à lire pour un indicateur (les niveaux d'études sont dans EducationLevel)"""
+    if indicator in INDICATOR_FIELDS:
+        return indicator
+    if indicator in EDUCATION_FIELDS:
+        return f'educationlevel__{indicator}'
+    raise ValueError(
+        f"Indicateur inconnu '{indicator}'. Valeurs possibles : {', '.join(INDICATOR_FIELDS + EDUCATION_FIELDS)}"
+    )
+
+
+def zone_query(pcodes):
+    """Filtre des lignes DemographicData des zones désignées par leurs codes (tous niveaux)
+
+    Servi par l'index demographic_zone_census_idx, seul ou avec un recensement.
+    """
+    return Q(zone_pcode__in=pcodes)
+
+
+def build_timeseries(pcodes, indicators):
+    """Séries alignées sur la liste des recensements (null pour une année sans donnée)"""
+    columns = [indicator_column(indicator) for indicator in indicators]
+    censuses = list(Census.objects.order_by('year').values('id', 'year', 'is_projection'))
+    position = {census['id']: i for i, census in enumerate(censuses)}
+
+    name_columns = [name_field for _, name_field in ZONE_FIELDS.values()]
+    rows = DemographicData.objects.filter(zone_query(pcodes)).values(
+        'census_id', 'level', 'zone_pcode', *name_columns, *columns,
+    )
+
+    series = {}
+    for row in rows:
+        level = row['level']
+        zone = series.setdefault(row['zone_pcode'], {
+            'level': level,
+            'name': row[ZONE_FIELDS[level][1]],
+            **{indicator: [None] * len(censuses) for indicator in indicators},
+        })
+        for indicator, column in zip(indicators, columns):
+            value = row[column]
+            zone[indicator][position[row['census_id']]] = float(value) if isinstance(value, Decimal) else value
+
+    return {
+        'years': [census['year'] for census in censuses],
+        'is_projection': [census['is_projection'] for census in censuses],
+        'series': {pcode: series[pcode] for pcode in pcodes if pcode in series},
+        'missing': [pcode for pcode in pcodes if pcode not in series],
+    }
@@ -0,0 +1,164 @@
+"""Encodage TopoJSON des limites administratives
+
+Les anneaux des polygones sont découpés en arcs aux points de jonction
+(sommets où les voisins changent) ; chaque arc partagé entre deux zones, ou
+recopié d'un niveau administratif à l'autre, n'est stocké qu'une seule fois.
+Les coordonnées sont quantifiées sur une grille entière puis encodées en delta.
+"""
+
+DEFAULT_QUANTIZATION = 100000
+
+
+def _iter_rings(geometry):
+    if geometry.get('type') == 'Polygon':
+        yield from geometry['coordinates']
+    elif geometry.get('type') == 'MultiPolygon':
+        for polygon in geometry['coordinates']:
+            yield from polygon
+
+
+def _bounds(layers):
+    x0 = y0 = float('inf')
+    x1 = y1 = float('-inf')
+    for features in layers.values():
+        for _, geometry in features:
+            for ring in _iter_rings(geometry):
+                for x, y, *_ in ring:
+                    x0, x1 = min(x0, x), max(x1, x)
+                    y0, y1 = min(y0, y), max(y1, y)
+    if x0 > x1:
+        # Aucune coordonnée (géométries omises ou vides)
+        return 0, 0, 0, 0
+    return x0, y0, x1, y1
+
+
+class _Topology:
+
+    def __init__(self, quantization, bounds):
+        x0, y0, x1, y1 = bounds
+        self.x0, self.y0 = x0, y0
+        self.kx = (x1 - x0) / (quantization - 1) if x1 > x0 else 1
+        self.ky = (y1 - y0) / (quantization - 1) if y1 > y0 else 1
+        self.neighbors = {}
+        self.junctions = set()
+        self.arcs = []
+        self.arc_index = {}
+
+    def quantize_ring(self, ring):
+        points = []
+        for x, y, *_ in ring:
+            point = (round((x - self.x0) / self.kx), round((y - self.y0) / self.ky))
+            if not points or points[-1] != point:
+                points.append(point)
+        if points and points[0] != points[-1]:
+            points.append(points[0])
+        # Un anneau fermé valide compte au moins 4 points
+        return points if len(points) >= 4 else None
+
+    def register_ring(self, ring):
+        """Marque comme jonction tout sommet rencontré avec des voisins différents"""
+        size = len(ring) - 1
+        for i in range(size):
+            point = ring[i]
+            pair = frozenset((ring[i - 1], ring[i + 1]))
+            seen = self.neighbors.get(point)
+            if seen is None:
+                self.neighbors[point] = pair
+            elif seen != pair:
+                self.junctions.add(point)
+
+    def _arc_ref(self, points):
+        points = tuple(points)
+        index = self.arc_index.get(points)
+        if index is not None:
+            return index
+        reverse = self.arc_index.get(points[::-1])
+        if reverse is not None:
+            return ~reverse
+        index = len(self.arcs)
+        self.arcs.append(points)
+        self.arc_index[points] = index
+        return index
+
+    def ring_arcs(self, ring):
+        """Découpe un anneau en arcs et retourne leurs références"""
+        size = len(ring) - 1
+        starts = [i for i in range(size) if ring[i] in self.junctions]
+        if not starts:
+            # Anneau sans jonction (île, enclave) : départ au plus petit sommet pour
+            # qu'un même anneau, parcouru dans un sens ou dans l'autre, donne le même arc
+            start = min(range(size), key=lambda i: ring[i])
+            return [self._arc_ref(ring[start:size] + ring[:start + 1])]
+
+        rotated = ring[starts[0]:size] + ring[:starts[0] + 1]
+        refs = []
+        arc = [rotated[0]]
+        for point in rotated[1:]:
+            arc.append(point)
+            if point in self.junctions:
+                refs.append(self._arc_ref(arc))
+                arc = [point]
+        return refs
+
+    def encode_arcs(self):
+        encoded = []
+        for arc in self.arcs:
+            previous_x = previous_y = 0
+            deltas = []
+            for x, y in arc:
+                deltas.append([x - previous_x, y - previous_y])
+                previous_x, previous_y = x, y
+            encoded.append(deltas)
+        return encoded
+
+
+def encode_topology(layers, quantization=DEFAULT_QUANTIZATION):
+    """Construit une Topology TopoJSON
+
+    `layers` associe un nom d'objet (ex. 'communes') à une liste de couples
+    (propriétés, géométrie GeoJSON Polygon/MultiPolygon).
+    """
+    topology = _Topology(quantization, _bounds(layers))
+
+    quantized = {}
+    for name, features in layers.items():
+        quantized[name] = []
+        for properties, geometry in features:
+            if geometry.get('type') == 'Polygon':
+                polygons = [geometry['coordinates']]
+            elif geometry.get('type') == 'MultiPolygon':
+                polygons = geometry['coordinates']
+            else:
+                polygons = []
+            rings = [
+                [ring for ring in map(topology.quantize_ring, polygon) if ring]
+                for polygon in polygons
+            ]
+            rings = [polygon for polygon in rings if polygon]
+            for polygon in rings:
+                for ring in polygon:
+                    topology.register_ring(ring)
+            quantized[name].append((properties, geometry.get('type'), rings))
+
+    objects = {}
+    for name, features in quantized.items():
+        geometries = []
+        for properties, geometry_type, polygons in features:
+            arcs = [[topology.ring_arcs(ring) for ring in polygon] for polygon in polygons]
+            if not arcs:
+                geometries.append({'type': None, 'properties': properties})
+            elif geometry_type == 'Polygon':
+                geometries.append({'type': 'Polygon', 'arcs': arcs[0], 'properties': properties})
+            else:
+                geometries.append({'type': 'MultiPolygon', 'arcs': arcs, 'properties': properties})
+        objects[name] = {'type': 'GeometryCollection', 'geometries': geometries}
+
+    return {
+        'type': 'Topology',
+        'transform': {
+            'scale': [topology.kx, topology.ky],
+            'translate': [topology.x0, topology.y0],
+        },
+        'objects': objects,
+        'arcs': topology.encode_arcs(),
+    }
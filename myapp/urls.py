@@ -16,9 +16,11 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import (
     CountryViewSet, RegionViewSet, DepartmentViewSet, CommuneViewSet,
-    DemographicDataListCreateView, DemographicDataDetailView,
+    DemographicDataListCreateView, DemographicDataDetailView, DemographicDataBulkView,
     export_all_data, export_zone_data, CentralizedImportView, download_template,
-    CensusYearsView
+    CensusYearsView, VectorTileView, BoundariesTopoJSONView, LocateView,
+    BatchGeocodeView, CensusTreeView, ChoroplethView, RankingView, RollupView, TimeSeriesView,
+    CensusDiffView, ExportDemographicsStreamView, ExportColumnarView
 )
 
 router = DefaultRouter()
@@ -31,10 +33,23 @@ urlpatterns = [
     # URLs de l'API REST
     path('api/', include(router.urls)),
     path('api/demographics/', DemographicDataListCreateView.as_view(), name='demographics-list-create'),
+    path('api/demographics/bulk/', DemographicDataBulkView.as_view(), name='demographics-bulk'),
     path('api/demographics/<int:pk>/', DemographicDataDetailView.as_view(), name='demographics-detail'),
     path('api/census-years/', CensusYearsView.as_view(), name='census-years'),
+    path('api/census/<int:year>/tree/', CensusTreeView.as_view(), name='census-tree'),
+    path('api/locate/', LocateView.as_view(), name='locate'),
+    path('api/geocode/batch/', BatchGeocodeView.as_view(), name='geocode-batch'),
+    path('api/choropleth/', ChoroplethView.as_view(), name='choropleth'),
+    path('api/rankings/', RankingView.as_view(), name='rankings'),
+    path('api/rollup/', RollupView.as_view(), name='rollup'),
+    path('api/timeseries/', TimeSeriesView.as_view(), name='timeseries'),
+    path('api/census-diff/', CensusDiffView.as_view(), name='census-diff'),
+    path('api/boundaries/topojson/', BoundariesTopoJSONView.as_view(), name='boundaries-topojson'),
+    path('api/tiles/<str:level>/<int:z>/<int:x>/<int:y>.mvt', VectorTileView.as_view(), name='vector-tile'),
     
     # URLs pour l'export
     path('export-all-data/', export_all_data, name='export_all_data'),
+    path('api/export/demographics/', ExportDemographicsStreamView.as_view(), name='export-demographics-stream'),
+    path('api/export/columnar/', ExportColumnarView.as_view(), name='export-columnar'),
     path('export-zone-data/<int:zone_id>/<str:zone_type>/', export_zone_data, name='export_zone_data'),
 ]  
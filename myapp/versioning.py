@@ -0,0 +1,88 @@
+"""Versions des données servant de clés d'invalidation aux caches et aux ETag
+
+- une version par recensement (Census.data_version), incrémentée à chaque import
+  ou modification de ses DemographicData / EducationLevel ;
+- une version globale des limites administratives (DataVersion 'boundaries').
+"""
+import hashlib
+
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Census, Country, Region, Department, Commune, DemographicData, EducationLevel, DataVersion
+
+BOUNDARIES = 'boundaries'
+
+BOUNDARY_MODELS = (Country, Region, Department, Commune)
+
+
+def get_version(key):
+    """Version courante d'un jeu de données (0 si jamais modifié)"""
+    version = DataVersion.objects.filter(key=key).values_list('version', flat=True).first()
+    return version or 0
+
+
+def get_version_state(key):
+    """(version, date de dernière modification) d'un jeu de données"""
+    state = DataVersion.objects.filter(key=key).values_list('version', 'updated_at').first()
+    return state or (0, None)
+
+
+def bump_version(key):
+    """Incrémente la version d'un jeu de données"""
+    DataVersion.objects.get_or_create(key=key)
+    DataVersion.objects.filter(key=key).update(version=F('version') + 1, updated_at=timezone.now())
+
+
+def get_census_state(year=None):
+    """(pk, année, version, date de modification) du recensement demandé, ou du plus récent
+
+    Une seule requête, sans charger les données du recensement.
+    """
+    queryset = Census.objects.all()
+    if year is not None:
+        queryset = queryset.filter(year=year)
+    return queryset.order_by('-year').values_list('pk', 'year', 'data_version', 'data_updated_at').first()
+
+
+def bump_census_version(*census_ids):
+    """Incrémente la version des recensements donnés (instances ou pk)"""
+    ids = {getattr(census, 'pk', census) for census in census_ids if census is not None}
+    if ids:
+        Census.objects.filter(pk__in=ids).update(
+            data_version=F('data_version') + 1,
+            data_updated_at=timezone.now(),
+        )
+
+
+def census_scope(census):
+    """Jeu de données d'un recensement (instance ou pk)"""
+    return ('census', getattr(census, 'pk', census))
+
+
+def get_instance_scopes(instance):
+    """Jeux de données (limites, recensements) concernés par la modification d'un objet"""
+    if isinstance(instance, BOUNDARY_MODELS):
+        return {BOUNDARIES}
+    if isinstance(instance, Census):
+        census_id = instance.pk
+    elif isinstance(instance, DemographicData):
+        census_id = instance.census_id
+    elif isinstance(instance, EducationLevel):
+        census_id = DemographicData.objects.filter(
+            pk=instance.demographic_data_id
+        ).values_list('census_id', flat=True).first()
+    else:
+        return set()
+    return {census_scope(census_id)} if census_id is not None else set()
+
+
+def bump_scopes(scopes):
+    if BOUNDARIES in scopes:
+        bump_version(BOUNDARIES)
+    bump_census_version(*(scope[1] for scope in scopes if scope != BOUNDARIES))
+
+
+def make_etag(*parts):
+    """ETag opaque calculé à partir de la version et de la représentation demandée"""
+    return hashlib.md5(':'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
@@ -3,9 +3,9 @@ from rest_framework import generics
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 import openpyxl
-from .models import Country, Region, Department, Commune, DemographicData,  EducationLevel, Census
+from .models import Country, Region, Department, Commune, DemographicData,  EducationLevel, Census, CensusDiff
 from .serializers import CountrySerializer, RegionSerializer, DepartmentSerializer, CommuneSerializer ,  DemographicDataSerializer
-from django.http import HttpResponse
+from django.http import HttpResponse, FileResponse, StreamingHttpResponse
 from openpyxl.styles import Font, Alignment
 from openpyxl import Workbook
 from django.contrib.admin.views.decorators import staff_member_required
@@ -26,6 +26,34 @@ from rest_framework.views import APIView
 from rest_framework.permissions import AllowAny
 from datetime import datetime
 
+from django.conf import settings
+from django.core.cache import cache
+from django.db import models
+from django.utils.cache import get_conditional_response, quote_etag
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.parsers import MultiPartParser, FormParser
+from rest_framework.settings import api_settings
+
+from . import choropleth as choropleth_maps, columnar, exports, geocoding, rankings, rollup, tiles
+from .census_diff import diff_rows, refresh_for_census
+from .census_tree import build_census_tree
+from .data_cache import all_censuses_namespace, boundaries_namespace, census_namespace, get_or_compute
+from .geometry import FULL_RESOLUTION, parse_resolution
+from .instrumentation import get_metrics_store
+from .invalidation import suppress_invalidation
+from .mixins import (
+    SimplifiedGeometryMixin, SparseFieldsetMixin, BoundaryVersionMixin, ConditionalGetMixin,
+    PcodeLookupMixin, get_bulk_pcodes, parse_field_list,
+)
+from .pagination import StreamingListMixin, wants_stream
+from .renderers import TopoJSONRenderer, boundary_topology_cache_key, dumps
+from .response_cache import CompressedResponseCacheMixin
+from .snapshot import get_census_snapshot, is_enabled as is_snapshot_enabled
+from .spatial_index import get_commune_index
+from .timeseries import MAX_ZONES, build_timeseries, zone_query
+from .topojson import encode_topology
+from .versioning import BOUNDARIES, bump_census_version, get_census_state, get_version, get_version_state, make_etag
+
 
 def normalize_header(header):
     return header.strip().lower().replace(' ', '_000_temp_replace_').replace('+', 'plus').replace('%', 'percent').replace('.', '_dot_').replace('-', '_dash_').replace('\'', '').replace('(', '').replace(')', '').replace('\\', '').replace('/', '').replace('É', 'e').replace('é', 'e').replace('à', 'a').replace('À', 'a').replace('â', 'a').replace('Â', 'a').replace('ê', 'e').replace('Ê', 'e').replace('î', 'i').replace('Î', 'i').replace('ô', 'o').replace('Ô', 'o').replace('ù', 'u').replace('Ù', 'u').replace('û', 'u').replace('Û', 'u').replace('ç', 'c').replace('Ç', 'c').replace('ë', 'e').replace('Ë', 'e').replace('ï', 'i').replace('Ï', 'i').replace('ü', 'u').replace('Ü', 'u').replace('ñ', 'n').replace('Ñ', 'n').replace('_000_temp_replace_', '')
@@ -46,6 +74,8 @@ class CentralizedImportView(FormView):
     form_class = CentralizedImportForm
     success_url = reverse_lazy('admin:index')
 
+    # Version incrémentée une seule fois en fin d'import, et non à chaque ligne enregistrée
+    @suppress_invalidation()
     def form_valid(self, form):
         census = form.cleaned_data['census_year']
         selected_content_type = form.cleaned_data['file_format']
@@ -221,36 +251,77 @@ class CentralizedImportView(FormView):
             else:
                 messages.warning(self.request, "Aucune donnée n'a pu être importée")
 
+            # Nouvelle version des données : invalide ETag, caches et tuiles de ce recensement
+            bump_census_version(census)
+            tiles.clear_tile_cache(census=census)
+            refresh_for_census(census)
+
             # Message de fin d'import
             messages.success(self.request, "Importation terminée !")
             return super().form_valid(form)
 
         except Exception as e:
+            # Une partie des lignes a pu être importée avant l'erreur
+            bump_census_version(census)
             messages.error(self.request, f"Une erreur est survenue lors de l'importation: {str(e)}")
             return self.render_to_response(self.get_context_data(form=form))
 
 
-class CountryViewSet(viewsets.ModelViewSet):
+class CountryViewSet(CompressedResponseCacheMixin, BoundaryVersionMixin, SparseFieldsetMixin, StreamingListMixin, viewsets.ModelViewSet):
     queryset = Country.objects.all()
     serializer_class = CountrySerializer
 
-class RegionViewSet(viewsets.ModelViewSet):
+class RegionViewSet(CompressedResponseCacheMixin, BoundaryVersionMixin, PcodeLookupMixin, SimplifiedGeometryMixin, SparseFieldsetMixin, StreamingListMixin, viewsets.ModelViewSet):
     queryset = Region.objects.all()
     serializer_class = RegionSerializer
+    renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES + [TopoJSONRenderer]
+    topology_object = 'regions'
+    pcode_field = 'adm1_pcode'
 
-class DepartmentViewSet(viewsets.ModelViewSet):
+class DepartmentViewSet(CompressedResponseCacheMixin, BoundaryVersionMixin, PcodeLookupMixin, SimplifiedGeometryMixin, SparseFieldsetMixin, StreamingListMixin, viewsets.ModelViewSet):
     queryset = Department.objects.all()
     serializer_class = DepartmentSerializer
+    renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES + [TopoJSONRenderer]
+    topology_object = 'departments'
+    pcode_field = 'adm2_pcode'
 
-class CommuneViewSet(viewsets.ModelViewSet):
+class CommuneViewSet(CompressedResponseCacheMixin, BoundaryVersionMixin, PcodeLookupMixin, SimplifiedGeometryMixin, SparseFieldsetMixin, StreamingListMixin, viewsets.ModelViewSet):
     queryset = Commune.objects.all()
     serializer_class = CommuneSerializer
+    renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES + [TopoJSONRenderer]
+    topology_object = 'communes'
+    pcode_field = 'adm3_pcode'
 
-class DemographicDataListCreateView(generics.ListCreateAPIView):
+class DemographicDataListCreateView(CompressedResponseCacheMixin, ConditionalGetMixin, StreamingListMixin, generics.ListCreateAPIView):
     serializer_class = DemographicDataSerializer
 
+    def get_data_version(self):
+        year = self.request.query_params.get('year', None)
+        try:
+            state = get_census_state(int(year) if year is not None else None)
+        except ValueError:
+            return None
+        if state is None:
+            return None
+        self.census_state = state
+        census_id, _, version, updated_at = state
+        return (f'census:{census_id}', version, updated_at)
+
+    def list(self, request, *args, **kwargs):
+        if is_snapshot_enabled() and wants_stream(request) and request.accepted_renderer.format == 'json':
+            return self.conditional(self.list_from_snapshot, request, *args, **kwargs)
+        return super().list(request, *args, **kwargs)
+
+    def list_from_snapshot(self, request, *args, **kwargs):
+        """Toutes les lignes du recensement depuis l'instantané en mémoire (?stream=1)"""
+        state = getattr(self, 'census_state', None)
+        snapshot = get_census_snapshot(state[0], state[2]) if state else None
+        if snapshot is None:
+            return super().list(request, *args, **kwargs)
+        return HttpResponse(snapshot.records_json(), content_type='application/json')
+
     def get_queryset(self):
-        queryset = DemographicData.objects.all()
+        queryset = DemographicData.objects.select_related('educationlevel')
         year = self.request.query_params.get('year', None)
         
         if year is not None:
@@ -268,10 +339,75 @@ class DemographicDataListCreateView(generics.ListCreateAPIView):
         
         return queryset
 
+class DemographicDataBulkView(SparseFieldsetMixin, generics.GenericAPIView):
+    """Données démographiques d'une liste de zones (codes de tous niveaux) pour un recensement
+
+    GET ?pcodes=MR01,MR01101&year=2023 ou POST {"pcodes": [...]} ; ?fields= / ?omit= pour alléger.
+    """
+    serializer_class = DemographicDataSerializer
+    permission_classes = [AllowAny]
+
+    def is_read_request(self):
+        return True
+
+    def get_census_state(self):
+        if not hasattr(self, '_census_state'):
+            year = self.request.query_params.get('year')
+            try:
+                self._census_state = get_census_state(int(year) if year else None)
+            except ValueError:
+                raise ValidationError({'year': "Année non valide."})
+            if self._census_state is None:
+                raise NotFound("Aucun recensement pour cette année.")
+        return self._census_state
+
+    def get_queryset(self):
+        return DemographicData.objects.filter(census_id=self.get_census_state()[0]).filter(
+            zone_query(get_bulk_pcodes(self.request))
+        ).select_related('educationlevel')
+
+    def get(self, request):
+        census_id, _, data_version, _ = self.get_census_state()
+        pcodes = get_bulk_pcodes(request)
+        fields, omit = self.get_field_selection()
+        snapshot = get_census_snapshot(census_id, data_version)
+        if snapshot is not None:
+            def selected(name):
+                return (fields is None or name in fields) and name not in (omit or ())
+
+            return Response([
+                {name: value for name, value in record.items() if selected(name)}
+                for record in snapshot.records(snapshot.zone_rows(pcodes))
+            ])
+        return Response(get_or_compute(
+            [census_namespace(census_id, data_version), boundaries_namespace()],
+            ['demographics-bulk', pcodes, (fields, omit)],
+            lambda: self.get_serializer(self.get_queryset(), many=True).data,
+        ))
+
+    def post(self, request):
+        return self.get(request)
+
 class DemographicDataDetailView(generics.RetrieveUpdateDestroyAPIView):
     queryset = DemographicData.objects.all()
     serializer_class = DemographicDataSerializer
 
+@staff_member_required
+def request_metrics_dashboard(request):
+    """Tableau de bord des mesures par vue (requêtes SQL, temps, taille, latences)"""
+    store = get_metrics_store()
+    if request.method == 'POST':
+        store.reset()
+        messages.success(request, "Les mesures ont été réinitialisées.")
+        return redirect('admin:request_metrics')
+    return render(request, 'admin/request_metrics.html', {
+        'title': "Mesures des requêtes",
+        'rows': store.summary(),
+        'slow_requests': store.slow_requests(),
+        'slow_threshold': getattr(settings, 'INSTRUMENTATION_SLOW_REQUEST_MS', None),
+        'window': store.window,
+    })
+
 @staff_member_required
 def download_template(request):
     """Télécharger le modèle Excel pour l'import des données (avec niveau_donnee explicite)"""
@@ -632,4 +768,480 @@ class CensusYearsView(APIView):
 
     def get(self, request):
         available_years = list(Census.objects.values_list('year', flat=True))
-        return Response(available_years)
\ No newline at end of file
+        return Response(available_years)
+
+class VectorTileView(APIView):
+    """Tuile vectorielle (MVT) d'un niveau administratif avec les indicateurs du recensement"""
+    permission_classes = [AllowAny]
+
+    def perform_content_negotiation(self, request, force=False):
+        # Les clients cartographiques demandent du protobuf : les erreurs restent en JSON
+        return super().perform_content_negotiation(request, force=True)
+
+    def get(self, request, level, z, x, y):
+        if level not in tiles.LEVELS:
+            raise ValidationError({'level': f"Valeurs possibles : {', '.join(tiles.LEVELS)}"})
+        if z > tiles.MAX_ZOOM or not (0 <= x < 2 ** z and 0 <= y < 2 ** z):
+            raise ValidationError("Coordonnées de tuile non valides.")
+
+        year = request.query_params.get('year')
+        try:
+            state = get_census_state(int(year) if year else None)
+        except ValueError:
+            raise ValidationError({'year': "Année non valide."})
+        if year and state is None:
+            raise NotFound("Aucun recensement pour cette année.")
+        census = Census.objects.get(pk=state[0]) if state else None
+
+        data = tiles.get_tile(level, census, z, x, y)
+        if not data:
+            return HttpResponse(status=204)
+        response = HttpResponse(data, content_type=tiles.CONTENT_TYPE)
+        response['Cache-Control'] = 'public, max-age=3600'
+        return response
+
+class BoundariesTopoJSONView(BoundaryVersionMixin, APIView):
+    """Régions, départements et communes dans une seule topologie TopoJSON"""
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        return self.conditional(self.get_topology, request)
+
+    def get_topology(self, request):
+        try:
+            resolution = parse_resolution(request.query_params.get('resolution'), request.query_params.get('zoom'))
+        except ValueError as e:
+            raise ValidationError({'resolution': str(e)})
+        try:
+            quantization = int(request.query_params.get('quantization', 100000))
+        except ValueError:
+            raise ValidationError({'quantization': "Entier attendu."})
+        quantization = min(max(quantization, 1000), 10000000)
+
+        key = boundary_topology_cache_key('all', resolution, quantization)
+        content = cache.get(key)
+        if content is None:
+            geometry_field = 'geo_json' if resolution == FULL_RESOLUTION else 'geo_json_simplified'
+            layers = {}
+            for name, model, fields in [
+                ('regions', Region, ['id', 'adm1_en', 'adm1_pcode']),
+                ('departments', Department, ['id', 'region_id', 'adm2_en', 'adm2_pcode']),
+                ('communes', Commune, ['id', 'department_id', 'adm3_en', 'adm3_pcode']),
+            ]:
+                features = []
+                for row in model.objects.values(*fields, geometry_field):
+                    geometry = row.pop(geometry_field) or {}
+                    if resolution != FULL_RESOLUTION:
+                        geometry = geometry.get(resolution) or {}
+                    features.append((row, geometry))
+                layers[name] = features
+            topology = encode_topology(layers, quantization)
+            content = dumps(topology)
+            cache.set(key, content)
+        return HttpResponse(content, content_type='application/json')
+
+class LocateView(APIView):
+    """Commune, département et région contenant un point (lat/lon), avec leurs données"""
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        try:
+            lat = float(request.query_params['lat'])
+            lon = float(request.query_params['lon'])
+        except (KeyError, ValueError):
+            return Response({'error': "Paramètres 'lat' et 'lon' numériques requis."}, status=400)
+
+        index = get_commune_index()
+        position = index.locate(lon, lat)
+        if position is None:
+            return Response({'error': "Aucune commune ne contient ce point."}, status=404)
+        result = index.zone(position)
+
+        year = request.query_params.get('year')
+        if year:
+            try:
+                census = Census.objects.filter(year=int(year)).first()
+            except ValueError:
+                return Response({'error': "Paramètre 'year' numérique requis."}, status=400)
+        else:
+            census = Census.objects.order_by('-year').first()
+
+        demographics = {}
+        if census:
+            rows = DemographicData.objects.filter(census=census).select_related('educationlevel').filter(
+                models.Q(level='commune', commune_id=result['commune']['id'])
+                | models.Q(level='department', department_id=result['department']['id'])
+                | models.Q(level='region', region_id=result['region']['id'])
+            )
+            for row in rows:
+                demographics[row.level] = DemographicDataSerializer(row).data
+        for level in ('commune', 'department', 'region'):
+            result[level]['demographic_data'] = demographics.get(level)
+        result['census'] = census.year if census else None
+        return Response(result)
+
+class BatchGeocodeView(APIView):
+    """Rattache un fichier de points (CSV, XLSX, GeoJSON) aux communes, en flux CSV ou NDJSON"""
+    permission_classes = [AllowAny]
+    parser_classes = [MultiPartParser, FormParser]
+
+    def post(self, request):
+        uploaded = request.FILES.get('file')
+        if uploaded is None:
+            return Response({'error': "Fichier 'file' requis."}, status=400)
+
+        file_format = request.data.get('format') or geocoding.detect_format(uploaded.name)
+        output_format = request.data.get('output') or request.query_params.get('output', 'csv')
+        if output_format not in geocoding.OUTPUT_FORMATS:
+            return Response({'error': f"Format de sortie non valide : {output_format}"}, status=400)
+
+        try:
+            headers, rows, lat_column, lon_column = geocoding.read_points(
+                uploaded, file_format,
+                lat_column=request.data.get('lat_column'),
+                lon_column=request.data.get('lon_column'),
+            )
+        except (ValueError, KeyError) as e:
+            return Response({'error': str(e)}, status=400)
+
+        rows = geocoding.geocode_rows(rows, lat_column, lon_column)
+        content_type = 'application/x-ndjson' if output_format == 'ndjson' else 'text/csv'
+        response = StreamingHttpResponse(
+            geocoding.iter_output(headers, rows, output_format),
+            content_type=content_type,
+        )
+        response['Content-Disposition'] = f'attachment; filename="points_communes.{output_format}"'
+        return response
+
+class CensusTreeView(CompressedResponseCacheMixin, ConditionalGetMixin, APIView):
+    """Hiérarchie complète région → département → commune d'un recensement,
+    chaque nœud portant ses données démographiques et niveaux d'études"""
+    permission_classes = [AllowAny]
+
+    def get_data_version(self):
+        state = get_census_state(self.kwargs['year'])
+        if state is None:
+            return None
+        census_id, _, census_version, census_updated_at = state
+        # Les noms et codes des zones font aussi partie de la réponse
+        boundary_version, boundary_updated_at = get_version_state(BOUNDARIES)
+        dates = [date for date in (census_updated_at, boundary_updated_at) if date]
+        return (f'census-tree:{census_id}', f'{census_version}.{boundary_version}', max(dates) if dates else None)
+
+    def get(self, request, year):
+        return self.conditional(self.get_tree, request, year)
+
+    def get_tree(self, request, year):
+        census = Census.objects.filter(year=year).first()
+        if census is None:
+            raise NotFound(f"Aucun recensement pour l'année {year}.")
+        return Response(build_census_tree(census))
+
+class ChoroplethView(APIView):
+    """Un indicateur pour toutes les zones d'un niveau, avec les bornes de classes
+
+    ?level=commune&year=2023&indicator=illiteracy_rate_15_plus[&method=quantile|equal|jenks]
+    [&classes=5][&output=map|geojson][&resolution=low|medium|high|full ou &zoom=]
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        params = request.query_params
+        level = params.get('level', 'commune')
+        if level not in tiles.LEVELS:
+            raise ValidationError({'level': f"Valeurs possibles : {', '.join(tiles.LEVELS)}"})
+        try:
+            indicator = choropleth_maps.validate_indicator(params.get('indicator', ''))
+        except ValueError as e:
+            raise ValidationError({'indicator': str(e)})
+        method = params.get('method', 'quantile')
+        if method not in choropleth_maps.METHODS:
+            raise ValidationError({'method': f"Valeurs possibles : {', '.join(choropleth_maps.METHODS)}"})
+        output = params.get('output', 'map')
+        if output not in choropleth_maps.OUTPUTS:
+            raise ValidationError({'output': f"Valeurs possibles : {', '.join(choropleth_maps.OUTPUTS)}"})
+        try:
+            classes = int(params.get('classes', choropleth_maps.DEFAULT_CLASSES))
+        except ValueError:
+            raise ValidationError({'classes': "Entier attendu."})
+        classes = min(max(classes, choropleth_maps.MIN_CLASSES), choropleth_maps.MAX_CLASSES)
+        try:
+            resolution = parse_resolution(params.get('resolution'), params.get('zoom'))
+        except ValueError as e:
+            raise ValidationError({'resolution': str(e)})
+        year = params.get('year')
+        try:
+            state = get_census_state(int(year) if year else None)
+        except ValueError:
+            raise ValidationError({'year': "Année non valide."})
+        if state is None:
+            raise NotFound("Aucun recensement pour cette année.")
+
+        census_id, _, data_version, _ = state
+        if output == 'map':
+            resolution = None
+        boundary_version = get_version(BOUNDARIES)
+        namespaces = [census_namespace(census_id, data_version), boundaries_namespace(boundary_version)]
+        parts = ['choropleth', level, indicator, method, classes, output, resolution]
+        etag = quote_etag(make_etag(*namespaces, *parts))
+        response = get_conditional_response(request._request, etag=etag)
+        if response is not None:
+            return response
+
+        def compute():
+            snapshot = get_census_snapshot(census_id, data_version, boundary_version)
+            census = snapshot.census if snapshot else Census.objects.get(pk=census_id)
+            return dumps(choropleth_maps.build_choropleth(
+                level, census, indicator, method, classes, output, resolution or FULL_RESOLUTION, snapshot,
+            ))
+
+        content = get_or_compute(namespaces, parts, compute)
+        response = HttpResponse(content, content_type='application/json')
+        response['ETag'] = etag
+        return response
+
+class RankingView(APIView):
+    """Zones d'un niveau classées selon un indicateur
+
+    ?year=2023&level=commune&indicator=illiteracy_rate_15_plus[&order=desc|asc][&limit=10]
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        params = request.query_params
+        level = params.get('level', 'commune')
+        if level not in tiles.LEVELS:
+            raise ValidationError({'level': f"Valeurs possibles : {', '.join(tiles.LEVELS)}"})
+        try:
+            indicator = choropleth_maps.validate_indicator(params.get('indicator', 'total_population'))
+        except ValueError as e:
+            raise ValidationError({'indicator': str(e)})
+        order = params.get('order', 'desc')
+        if order not in rankings.ORDERS:
+            raise ValidationError({'order': f"Valeurs possibles : {', '.join(rankings.ORDERS)}"})
+        try:
+            limit = min(max(int(params.get('limit', rankings.DEFAULT_LIMIT)), 1), rankings.MAX_LIMIT)
+        except ValueError:
+            raise ValidationError({'limit': "Nombre entier attendu."})
+        year = params.get('year')
+        try:
+            state = get_census_state(int(year) if year else None)
+        except ValueError:
+            raise ValidationError({'year': "Année non valide."})
+        if state is None:
+            raise NotFound("Aucun recensement pour cette année.")
+
+        census_id, _, data_version, _ = state
+        snapshot = get_census_snapshot(census_id, data_version)
+        census = snapshot.census if snapshot else Census.objects.get(pk=census_id)
+        return Response(rankings.build_ranking(level, census, indicator, order, limit, snapshot))
+
+class RollupView(APIView):
+    """Agrégation à la demande des données communales
+
+    GET ?year=2023&by=department|region|country : agrégats de toutes les zones du niveau
+    GET ?year=2023&communes=MR01101,MR01102 : agrégat d'un groupe de communes
+    POST {"year": 2023, "groups": {"nom": ["MR01101", ...]}} : plusieurs groupes
+    """
+    permission_classes = [AllowAny]
+
+    def get_census_state(self, year):
+        try:
+            state = get_census_state(int(year) if year not in (None, '') else None)
+        except (TypeError, ValueError):
+            raise ValidationError({'year': "Année non valide."})
+        if state is None:
+            raise NotFound("Aucun recensement pour cette année.")
+        return state
+
+    def get_namespaces(self, state):
+        census_id, _, data_version, _ = state
+        return [census_namespace(census_id, data_version), boundaries_namespace()]
+
+    def rollup_groups(self, state, groups):
+        return get_or_compute(self.get_namespaces(state), ['rollup-groups', groups], lambda: rollup.rollup_groups(
+            rollup.CommuneFrame(Census.objects.get(pk=state[0])), groups,
+        ))
+
+    def get(self, request):
+        state = self.get_census_state(request.query_params.get('year'))
+        year = state[1]
+        communes = request.query_params.get('communes')
+        if communes:
+            groups = {'communes': [pcode.strip() for pcode in communes.split(',') if pcode.strip()]}
+            return Response({'year': year, 'groups': self.rollup_groups(state, groups)})
+
+        level = request.query_params.get('by', 'department')
+        if level not in rollup.LEVELS:
+            raise ValidationError({'by': f"Valeurs possibles : {', '.join(rollup.LEVELS)}"})
+
+        def compute():
+            codes = rollup.zone_codes(level)
+            zones = rollup.rollup_census(Census.objects.get(pk=state[0]), [level])[level]
+            return {codes.get(pk, pk): values for pk, values in zones.items()}
+
+        return Response({
+            'year': year,
+            'level': level,
+            'zones': get_or_compute(self.get_namespaces(state), ['rollup', level], compute),
+        })
+
+    def post(self, request):
+        if not isinstance(request.data, dict):
+            raise ValidationError("Objet JSON {year, groups} attendu.")
+        state = self.get_census_state(request.data.get('year'))
+        groups = request.data.get('groups')
+        if not isinstance(groups, dict) or not all(
+            isinstance(codes, list) and all(isinstance(code, str) for code in codes) for codes in groups.values()
+        ):
+            raise ValidationError({'groups': "Objet {nom: [codes adm3]} attendu."})
+        return Response({'year': state[1], 'groups': self.rollup_groups(state, groups)})
+
+class TimeSeriesView(APIView):
+    """Séries d'indicateurs sur tous les recensements (projections comprises) pour des zones
+
+    ?pcodes=MR01,MR0101,MR010101&indicators=total_population,illiteracy_rate_15_plus
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        pcodes = list(dict.fromkeys(parse_field_list(request.query_params.get('pcodes', ''))))
+        if not pcodes:
+            raise ValidationError({'pcodes': "Au moins un code de zone est requis."})
+        if len(pcodes) > MAX_ZONES:
+            raise ValidationError({'pcodes': f"{MAX_ZONES} zones au maximum par requête."})
+        indicators = parse_field_list(request.query_params.get('indicators', '')) or ['total_population']
+        try:
+            return Response(get_or_compute(
+                [all_censuses_namespace(), boundaries_namespace()], ['timeseries', pcodes, indicators],
+                lambda: build_timeseries(pcodes, indicators),
+            ))
+        except ValueError as e:
+            raise ValidationError({'indicators': str(e)})
+
+class CensusDiffView(APIView):
+    """Évolution par zone entre deux recensements (par défaut : les deux plus récents)
+
+    ?from=2013&to=2023&level=commune[&pcodes=MR01101,MR01102]
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        censuses = list(Census.objects.order_by('year'))
+        by_year = {census.year: census for census in censuses}
+        try:
+            to_year = int(request.query_params.get('to') or censuses[-1].year)
+            to_census = by_year[to_year]
+            earlier = [census for census in censuses if census.year < to_year]
+            from_census = by_year[int(request.query_params.get('from') or earlier[-1].year)]
+        except (ValueError, KeyError, IndexError):
+            raise NotFound("Couple de recensements introuvable.")
+        if from_census.year >= to_census.year:
+            raise ValidationError({'from': "L'année de départ doit précéder l'année d'arrivée."})
+
+        level = request.query_params.get('level', 'commune')
+        if level not in dict(CensusDiff.LEVEL_CHOICES):
+            raise ValidationError({'level': f"Valeurs possibles : {', '.join(dict(CensusDiff.LEVEL_CHOICES))}"})
+
+        pcodes = parse_field_list(request.query_params.get('pcodes', ''))
+
+        namespaces = [
+            census_namespace(from_census.pk, from_census.data_version),
+            census_namespace(to_census.pk, to_census.data_version),
+            boundaries_namespace(),
+        ]
+        zones = get_or_compute(
+            namespaces, ['census-diff', level, pcodes], lambda: diff_rows(from_census, to_census, level, pcodes),
+        )
+        return Response({
+            'from': from_census.year,
+            'to': to_census.year,
+            'years': to_census.year - from_census.year,
+            'is_projection': to_census.is_projection or from_census.is_projection,
+            'level': level,
+            'zones': zones,
+        })
+
+class ExportDemographicsStreamView(APIView):
+    """Export en flux des données démographiques (CSV ou NDJSON), niveaux d'études inclus
+
+    ?output=csv|ndjson[&year=2023|all][&level=country|region|department|commune]
+    """
+    permission_classes = [AllowAny]
+
+    def perform_content_negotiation(self, request, force=False):
+        # Le corps est un fichier CSV ou NDJSON : les erreurs restent en JSON
+        return super().perform_content_negotiation(request, force=True)
+
+    def get(self, request):
+        output_format = request.query_params.get('output', 'csv')
+        if output_format not in exports.FORMATS:
+            raise ValidationError({'output': f"Valeurs possibles : {', '.join(exports.FORMATS)}"})
+        level = request.query_params.get('level') or None
+        if level and level not in exports.LEVELS:
+            raise ValidationError({'level': f"Valeurs possibles : {', '.join(exports.LEVELS)}"})
+
+        year = request.query_params.get('year')
+        census = None
+        if year != 'all':
+            try:
+                state = get_census_state(int(year) if year else None)
+            except ValueError:
+                raise ValidationError({'year': "Année non valide."})
+            if state is None:
+                raise NotFound("Aucun recensement pour cette année.")
+            census = Census.objects.get(pk=state[0])
+
+        response = StreamingHttpResponse(
+            exports.iter_export(output_format, census, level),
+            content_type=exports.CONTENT_TYPES[output_format],
+        )
+        filename = '_'.join(['demographics', str(census.year) if census else 'all'] + ([level] if level else []))
+        response['Content-Disposition'] = f'attachment; filename="{filename}.{output_format}"'
+        return response
+
+
+class ExportColumnarView(APIView):
+    """Export Parquet ou Arrow IPC d'un niveau administratif pour un recensement
+
+    ?year=2023&level=commune[&output=parquet|arrow][&geometry=1][&resolution=full|high|medium|low]
+    Le fichier est construit au premier appel puis resservi depuis le disque
+    jusqu'au prochain changement de version des données.
+    """
+    permission_classes = [AllowAny]
+
+    def perform_content_negotiation(self, request, force=False):
+        # Le corps est un fichier Parquet ou Arrow : les erreurs restent en JSON
+        return super().perform_content_negotiation(request, force=True)
+
+    def get(self, request):
+        output_format = request.query_params.get('output', 'parquet')
+        if output_format not in columnar.FORMATS:
+            raise ValidationError({'output': f"Valeurs possibles : {', '.join(columnar.FORMATS)}"})
+        level = request.query_params.get('level', 'commune')
+        if level not in columnar.LEVELS:
+            raise ValidationError({'level': f"Valeurs possibles : {', '.join(columnar.LEVELS)}"})
+        geometry = request.query_params.get('geometry', '').lower() in ('1', 'true', 'wkb')
+        try:
+            resolution = parse_resolution(request.query_params.get('resolution'))
+        except ValueError as e:
+            raise ValidationError({'resolution': str(e)})
+        year = request.query_params.get('year')
+        try:
+            state = get_census_state(int(year) if year else None)
+        except ValueError:
+            raise ValidationError({'year': "Année non valide."})
+        if state is None:
+            raise NotFound("Aucun recensement pour cette année.")
+
+        census = Census.objects.get(pk=state[0])
+        try:
+            path = columnar.get_export(census, level, output_format, geometry, resolution)
+        except ImportError:
+            return Response({'detail': "Export en colonnes indisponible : pyarrow n'est pas installé."}, status=501)
+
+        filename = '_'.join(['demographics', str(census.year), level] + (['geometry'] if geometry else []))
+        extension, content_type = columnar.FORMATS[output_format]
+        return FileResponse(
+            open(path, 'rb'), content_type=content_type, as_attachment=True, filename=f'{filename}.{extension}',
+        )
@@ -96,6 +96,7 @@ X_FRAME_OPTIONS = 'SAMEORIGIN'
 
 
 MIDDLEWARE = [
+    'myapp.instrumentation.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -220,9 +221,71 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.DjangoModelPermissionsOrAnonReadOnly'
-    ]
+    ],
+    # Pagination par curseur (clé primaire) ; ?stream=1 pour tout récupérer en flux
+    'DEFAULT_PAGINATION_CLASS': 'myapp.pagination.KeysetPagination',
+    'PAGE_SIZE': 100,
+    # Rendu et analyse JSON via orjson lorsqu'il est installé (sinon comportement DRF standard)
+    'DEFAULT_RENDERER_CLASSES': [
+        'myapp.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'myapp.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
+# Taille de page maximale acceptée via ?page_size=
+API_MAX_PAGE_SIZE = 1000
+
+# Cache Django (résultats des lectures, topologies, choroplèthes) : 'locmem', 'file' ou 'redis'
+# Les clés portent la version des données (incrémentée à chaque écriture) : l'expiration
+# ne sert qu'à libérer la place des versions périmées. 'locmem' est propre à chaque
+# processus ; avec plusieurs workers, préférer 'file' ou un Redis local
+# (redis-server --port 6379, paquet Python redis requis).
+CACHE_BACKEND = 'locmem'
+CACHE_TIMEOUT = 24 * 60 * 60
+CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'myapp',
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(BASE_DIR, 'cache', 'django'),
+        'OPTIONS': {'MAX_ENTRIES': 20000},
+    },
+    'redis': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': 'redis://127.0.0.1:6379/1',
+    },
+}
+CACHES = {
+    'default': {**CACHE_BACKENDS[CACHE_BACKEND], 'TIMEOUT': CACHE_TIMEOUT, 'KEY_PREFIX': 'myapp'},
+}
+
+# Cache des réponses pré-compressées (gzip/brotli) : 'file', 'memory' ou None pour le désactiver
+RESPONSE_CACHE_BACKEND = 'file'
+RESPONSE_CACHE_DIR = os.path.join(BASE_DIR, 'cache', 'responses')
+# Brotli rapide au premier accès, recompressé en arrière-plan au niveau maximal (None : pas de recompression)
+RESPONSE_CACHE_BROTLI_QUALITY = 5
+RESPONSE_CACHE_BROTLI_UPGRADE_QUALITY = 11
+
+# Instantanés NumPy des recensements en mémoire de chaque processus pour les lectures
+# (données démographiques en flux, choroplèthes, classements), reconstruits au changement de version
+CENSUS_SNAPSHOT_ENABLED = False
+
+# Exports Parquet / Arrow IPC par recensement (reconstruits quand la version des données change)
+EXPORT_CACHE_DIR = os.path.join(BASE_DIR, 'cache', 'exports')
+
+# Mesures par vue (tableau de bord admin /admin/request-metrics/)
+INSTRUMENTATION_ENABLED = True
+INSTRUMENTATION_WINDOW = 1000  # dernières requêtes conservées par vue
+INSTRUMENTATION_SLOW_REQUEST_MS = None  # ex. 1000 pour journaliser le SQL des requêtes lentes
+
 
 LOGGING = {
     'version': 1,
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'myproject.settings')
 
 application = get_wsgi_application()
+
+# Construire l'index spatial des communes avant la première requête
+from myapp.spatial_index import warm_up_commune_index  # noqa: E402
+
+warm_up_commune_index()